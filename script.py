@@ -11,18 +11,38 @@ import json
 import time
 import logging
 import argparse
+import asyncio
+import bisect
+import ctypes
+import ctypes.util
 import shutil
 import glob
+import itertools
 import gc
 import re
+import stat
+import errno
+import queue
+import select
+import struct
+import tempfile
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, Executor, Future, InvalidStateError, wait, FIRST_COMPLETED
+from typing import Dict, List, Tuple, Optional, Iterator
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import sqlite3
+except ImportError:  # Python compilé sans sqlite3: cache de vérification désactivé
+    sqlite3 = None
+
 # Version du script
 SCRIPT_VERSION = "2.0.3"
 
@@ -31,7 +51,38 @@ current_user = os.environ.get('USER', os.environ.get('USERNAME', 'user'))
 
 # Configuration adaptée aux serveurs Linux
 SERVER_CONFIG = {
-    'max_workers': 8,  # Optimisé pour serveurs multi-cœurs
+    'max_workers': 8,  # Workers au démarrage (ajustés pendant le scan, voir ConcurrencyController)
+    'max_workers_ceiling': min(64, max(8, (os.cpu_count() or 2) * 4)),  # Plafond de l'ajustement (phase 1)
+    'min_workers': 2,  # Plancher de l'ajustement (phase 1)
+    'adjust_interval': 2.0,  # Secondes entre deux ajustements de la concurrence
+    'load_per_cpu_limit': 1.0,  # Charge moyenne (1 min) par cœur au-delà de laquelle on réduit
+    'iowait_limit': 0.25,  # Part d'iowait CPU au-delà de laquelle on réduit
+    'discovery_queue_size': 10000,  # File bornée entre découverte et vérification
+    'in_flight_per_worker': 4,  # Vérifications soumises en attente par worker
+    'ffprobe_workers': max(1, (os.cpu_count() or 2) // 2),  # Processus ffprobe simultanés (phase 2)
+    'cache_max_entries': 2000000,  # Taille max du cache de vérification (éviction LRU)
+    'target_dir_listings': 2048,  # Listings de répertoires cibles gardés en mémoire (phase 1)
+    'mount_probe_timeout': 10,  # Secondes avant de déclarer un montage réseau/FUSE indisponible
+    'mount_memory_days': 7,  # Un montage connu absent de /proc/mounts est considéré tombé pendant N jours
+    'check_timeout': 30,  # Délai max d'une vérification phase 1 avant statut TIMEOUT
+    'circuit_breaker_threshold': 3,  # TIMEOUT sous un même préfixe avant de l'ignorer
+    'circuit_breaker_depth': 3,  # Composants du chemin cible formant le préfixe (/mnt/rclone/Films)
+    'header_probe_bytes': 16384,  # Octets lus en début et fin de fichier par la validation native
+    'ffprobe_batch_size': 16,  # Fichiers sondés par processus ffmpeg en phase 2 (1 = un ffprobe par fichier)
+    'link_counts_max_age': 86400,  # Âge (secondes) au-delà duquel les comptes du menu sont signalés anciens
+    'arr_requests_per_second': 5,  # Requêtes HTTP max par seconde et par serveur média
+    'arr_command_timeout': 30,  # Secondes d'attente de la fin des commandes de scan (suivies via /api/v3/command/{id})
+    'arr_poll_interval': 1.0,  # Secondes entre deux relevés de l'état des commandes
+    'arr_poll_max_interval': 5.0,  # Intervalle max entre deux relevés (doublé tant que rien ne change)
+    'arr_refresh_batch': 100,  # Identifiants par commande RefreshSeries/RefreshMovie groupée
+    'arr_rescan_batch': 10,  # Mode ciblé: commandes RescanSeries/RescanMovie envoyées avant d'attendre leur fin
+    'arr_index_ttl': 3600,  # Secondes avant de recharger la bibliothèque Sonarr/Radarr (mode --watch)
+    'config_check_interval': 5,  # Secondes entre deux vérifications de ~/.symguard_config.json (date de modification)
+    'checkpoint_interval': 30,  # Secondes entre deux écritures du point de reprise
+    'checkpoint_max_age': 86400,  # Âge max (secondes) d'un point de reprise accepté par --resume
+    'watch_batch_seconds': 5,  # Mode --watch: liens modifiés regroupés pendant N secondes avant vérification
+    'watch_mount_interval': 300,  # Mode --watch: secondes entre deux revérifications des montages
+    'ffprobe_file_timeout': 15,  # Délai ffprobe par fichier (secondes), multiplié par la taille du lot
     'user': current_user,
     'home_dir': os.environ.get('HOME', f'/home/{current_user}'),
     'settings_source': os.environ.get('SETTINGS_SOURCE', f'/home/{current_user}/seedbox-compose'),
@@ -39,9 +90,33 @@ SERVER_CONFIG = {
     'python_executable': f'{os.environ.get("VIRTUAL_ENV", f"/home/{current_user}/seedbox-compose/venv")}/bin/python3'
 }
 
+# Extensions considérées comme fichiers médias (estimation et phase 2)
+MEDIA_EXTENSIONS = {'.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv',
+                    '.m4v', '.webm', '.mp3', '.flac', '.wav', '.aac'}
+
+# Boîtes MP4/MOV pouvant ouvrir un fichier
+MP4_TOP_LEVEL_BOXES = {b'ftyp', b'moov', b'mdat', b'free', b'skip', b'wide', b'pnot', b'uuid'}
+
+# Débits (kbit/s) et fréquences des trames MPEG audio Layer III, par version (bits 19-20)
+MP3_BITRATES = {
+    3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_BITRATES[0] = MP3_BITRATES[2]
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+# Statuts jamais supprimés: la cible n'a pas pu être vérifiée
+PROTECTED_STATUSES = {'MOUNT_DOWN', 'TIMEOUT'}
+
 # Configuration du logging avec rotation et gestion d'espace disque
 log_file = os.path.join(SERVER_CONFIG['home_dir'], 'symlink_maintenance.log')
 
+# Cache persistant des verdicts de vérification (SYMGUARD_CACHE_FILE: autre emplacement)
+cache_file = os.environ.get('SYMGUARD_CACHE_FILE') or os.path.join(SERVER_CONFIG['home_dir'], '.symguard_cache.db')
+
+# Point de reprise du scan en cours (--resume), supprimé à la fin d'un scan complet
+checkpoint_file = os.path.join(SERVER_CONFIG['home_dir'], '.symguard_checkpoint.db')
+
 # Configuration du handler de fichier avec rotation optimisée
 from logging.handlers import RotatingFileHandler
 import gc
@@ -59,10 +134,1566 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _read_ebml_vint(buf: bytes, pos: int) -> Tuple[Optional[int], int]:
+    """Entier EBML de taille variable: (valeur, longueur), valeur -1 si taille inconnue, None si illisible"""
+    if pos >= len(buf):
+        return None, 0
+    first = buf[pos]
+    length, mask = 1, 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8 or pos + length > len(buf):
+        return None, 0
+    value = first & (mask - 1)
+    for byte in buf[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    if value == (1 << (7 * length)) - 1:
+        return -1, length
+    return value, length
+
+def _mp3_frame_length(buf: bytes, pos: int) -> int:
+    """Longueur de la trame MPEG audio Layer III commençant à pos, 0 si l'en-tête est invalide"""
+    if pos + 4 > len(buf) or buf[pos] != 0xFF or buf[pos + 1] & 0xE0 != 0xE0:
+        return 0
+    version = (buf[pos + 1] >> 3) & 0x03
+    layer = (buf[pos + 1] >> 1) & 0x03
+    bitrate_index = buf[pos + 2] >> 4
+    rate_index = (buf[pos + 2] >> 2) & 0x03
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return 0
+    padding = (buf[pos + 2] >> 1) & 0x01
+    bitrate = MP3_BITRATES[version][bitrate_index] * 1000
+    return (144 if version == 3 else 72) * bitrate // MP3_SAMPLE_RATES[version][rate_index] + padding
+
+# Commandes de scan lancées sur chaque serveur média
+MEDIA_SCAN_COMMANDS = {
+    'sonarr': [
+        {'name': 'RescanSeries', 'desc': 'Scan séries'},
+        {'name': 'MissingEpisodeSearch', 'desc': 'Recherche épisodes manquants'}
+    ],
+    'radarr': [
+        {'name': 'RescanMovie', 'desc': 'Scan films'},
+        {'name': 'MissingMoviesSearch', 'desc': 'Recherche films manquants'}
+    ],
+    'bazarr': [
+        {'name': 'SeriesSearchMissing', 'desc': 'Recherche sous-titres séries'},
+        {'name': 'MoviesSearchMissing', 'desc': 'Recherche sous-titres films'}
+    ],
+    'prowlarr': [
+        {'name': 'IndexerSearch', 'desc': 'Test indexeurs'}
+    ]
+}
+
+# Rafraîchissement ciblé après suppression: bibliothèque et commande groupée par service
+ARR_REFRESH_COMMANDS = {
+    'sonarr': {'library': 'series', 'command': 'RefreshSeries', 'ids': 'seriesIds', 'id': 'seriesId', 'bulk_since': 4,
+               'rescan': 'RescanSeries', 'label': 'Sonarr', 'missing': 'Série non trouvée dans Sonarr'},
+    'radarr': {'library': 'movie', 'command': 'RefreshMovie', 'ids': 'movieIds', 'id': 'movieId', 'bulk_since': 3,
+               'rescan': 'RescanMovie', 'label': 'Radarr', 'missing': 'Film non trouvé dans Radarr'},
+}
+
+# Flux d'un fichier listés par ffprobe (un type de codec par ligne)
+FFPROBE_COMMAND = ["ffprobe", "-v", "error", "-show_entries", "stream=codec_type", "-of", "csv=p=0"]
+
+def _ffprobe_output_valid(output: str) -> bool:
+    """Un fichier est lisible si ffprobe y trouve au moins un flux audio ou vidéo"""
+    return "video" in output or "audio" in output
+
+# Lignes d'ffmpeg -i décrivant chaque entrée ouverte et ses flux
+FFMPEG_INPUT_RE = re.compile(r'^Input #(\d+),', re.MULTILINE)
+FFMPEG_STREAM_RE = re.compile(r'^\s*Stream #(\d+):\d+\S*: (Video|Audio):', re.MULTILINE)
+
+def _parse_ffmpeg_inputs(output: str) -> Tuple[set, set]:
+    """Sortie d'ffmpeg multi-entrées: (indices ouverts, indices avec un flux audio ou vidéo)"""
+    opened = {int(index) for index in FFMPEG_INPUT_RE.findall(output)}
+    media = {int(index) for index, _ in FFMPEG_STREAM_RE.findall(output)}
+    return opened, media & opened
+
+class ResultStore:
+    """Résultats de phase 1 rangés en colonnes plutôt qu'un dict par lien
+    
+    Les répertoires des liens et des cibles sont internés (chaque chemin commun
+    stocké une fois), les statuts sont des codes d'un octet et les tailles un
+    array ; le nom de la cible n'est gardé que s'il diffère de celui du lien.
+    Les champs rares (error, mount...) vont dans un dict creux. Un
+    enregistrement complet n'est reconstruit qu'à la lecture (store[i], itération).
+    """
+    
+    BASE_FIELDS = ('path', 'target', 'status', 'phase', 'size')
+    
+    def __init__(self):
+        self._dirs: List[str] = []
+        self._dir_ids: Dict[str, int] = {}
+        self._statuses: List[str] = ['OK', 'BROKEN', 'INACCESSIBLE', 'SMALL_FILE', 'IO_ERROR',
+                                     'TIMEOUT', 'MOUNT_DOWN', 'ERROR', 'CORRUPTED']
+        self._status_ids = {status: code for code, status in enumerate(self._statuses)}
+        self._link_dirs = array('I')
+        self._names: List[str] = []
+        self._target_dirs = array('I')
+        self._target_names: List[Optional[str]] = []  # None: même nom que le lien
+        self._status = array('B')
+        self._sizes = array('q')
+        self._extra: Dict[int, Dict] = {}
+    
+    @classmethod
+    def from_records(cls, records) -> 'ResultStore':
+        store = cls()
+        for record in records:
+            store.append(record)
+        return store
+    
+    def _intern_dir(self, directory: str) -> int:
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._dir_ids[directory] = len(self._dirs)
+            self._dirs.append(directory)
+        return dir_id
+    
+    def append(self, result: Dict):
+        link_dir, name = os.path.split(result['path'])
+        target_dir, target_name = os.path.split(result.get('target', ''))
+        status = result['status']
+        if status not in self._status_ids:
+            self._status_ids[status] = len(self._statuses)
+            self._statuses.append(status)
+        
+        index = len(self._names)
+        self._link_dirs.append(self._intern_dir(link_dir))
+        self._names.append(name)
+        self._target_dirs.append(self._intern_dir(target_dir))
+        self._target_names.append(None if target_name == name else target_name)
+        self._status.append(self._status_ids[status])
+        self._sizes.append(result.get('size', 0))
+        extra = {key: value for key, value in result.items() if key not in self.BASE_FIELDS}
+        if result.get('phase', 1) != 1:
+            extra['phase'] = result['phase']
+        if extra:
+            self._extra[index] = extra
+    
+    def path(self, index: int) -> str:
+        return os.path.join(self._dirs[self._link_dirs[index]], self._names[index])
+    
+    def status(self, index: int) -> str:
+        return self._statuses[self._status[index]]
+    
+    def status_counts(self) -> Dict[str, int]:
+        counts = {}
+        for code in self._status:
+            status = self._statuses[code]
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+    
+    def __len__(self) -> int:
+        return len(self._names)
+    
+    def __getitem__(self, index: int) -> Dict:
+        name = self._names[index]
+        target_name = self._target_names[index]
+        record = {
+            'path': os.path.join(self._dirs[self._link_dirs[index]], name),
+            'target': os.path.join(self._dirs[self._target_dirs[index]], name if target_name is None else target_name),
+            'status': self._statuses[self._status[index]],
+            'phase': 1,
+            'size': self._sizes[index],
+        }
+        record.update(self._extra.get(index, ()))
+        return record
+    
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(len(self._names)):
+            yield self[index]
+
+class ReportWriter:
+    """Rapport NDJSON écrit au fil du scan
+    
+    Une ligne d'en-tête, puis une ligne par problème ou fichier supprimé dès qu'il
+    est connu, et une ligne de pied avec les statistiques en fin d'exécution. Si
+    le script s'arrête en route, les lignes déjà écrites restent lisibles ; seul
+    le pied manque (rapport marqué incomplet à la relecture).
+    """
+    
+    def __init__(self, report_file: str, mode: str):
+        self.report_file = report_file
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._file = open(report_file, 'w', encoding='utf-8')
+        self._write({'type': 'header', 'scan_date': datetime.now().isoformat(), 'mode': mode,
+                     'version': SCRIPT_VERSION})
+    
+    def _write(self, entry: Dict):
+        line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()  # Une ligne par écriture: rien à perdre en cas d'arrêt brutal
+            self.counts[entry['type']] = self.counts.get(entry['type'], 0) + 1
+    
+    def problem(self, record: Dict):
+        self._write({'type': 'problem', **record})
+    
+    def deleted(self, record: Dict):
+        self._write({'type': 'deleted', **record})
+    
+    def close(self, mode: Optional[str] = None, statistics: Optional[Dict] = None):
+        """Écrit le pied (mode final et statistiques) puis ferme ; sans argument, ferme sans pied"""
+        if mode is not None:
+            self._write({'type': 'footer', 'end_date': datetime.now().isoformat(), 'mode': mode,
+                         'statistics': statistics or {}, 'problems': self.counts.get('problem', 0),
+                         'deleted': self.counts.get('deleted', 0)})
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def read_report(report_file: str) -> Iterator[Dict]:
+    """Relit un rapport ligne par ligne, sans le charger en mémoire
+    
+    Les anciens rapports JSON (un seul objet) sont convertis à la volée dans le
+    même format d'entrées. Une dernière ligne tronquée (arrêt pendant
+    l'écriture) est ignorée.
+    """
+    if report_file.endswith('.json'):
+        with open(report_file, encoding='utf-8') as f:
+            report = json.load(f)
+        yield {'type': 'header', 'scan_date': report.get('scan_date'), 'mode': report.get('mode')}
+        for record in report.get('problems_found', []):
+            yield {'type': 'problem', **record}
+        for record in report.get('deleted_files', []):
+            yield {'type': 'deleted', **record}
+        yield {'type': 'footer', 'mode': report.get('mode'), 'statistics': report.get('statistics', {})}
+        return
+    
+    with open(report_file, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Ligne {line_number} illisible dans {report_file} (écriture interrompue ?)")
+
+class VerificationCache:
+    """Cache persistant (SQLite) des verdicts de phase 1 et phase 2
+    
+    Clé: (device, inode, taille, mtime) de la cible résolue. Un fichier modifié
+    ou remplacé change de clé et sera revérifié ; seuls les verdicts positifs
+    sont enregistrés, les problèmes sont toujours revérifiés.
+    
+    Mémorise aussi le contenu des répertoires parcourus et leur mtime pour le
+    mode --incremental, et le nombre de liens par répertoire pour le menu de
+    sélection.
+    """
+    PHASES = ('phase1', 'phase2')
+    FLUSH_EVERY = 1000
+    DIRECTORY_RETENTION = 30 * 86400  # Répertoires non revus depuis 30 jours purgés
+    
+    def __init__(self, db_path: str, max_entries: int):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = {phase: 0 for phase in self.PHASES}
+        self.hits['directories'] = 0
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_dirs = []
+        self._conn = None
+        self._disabled = sqlite3 is None
+    
+    @staticmethod
+    def key_from_stat(st: os.stat_result) -> Tuple[int, int, int, int]:
+        """Clé de cache à partir du stat de la cible"""
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    
+    def _connect(self):
+        """Ouvre la base à la première utilisation (verrou déjà pris)"""
+        if self._conn is None and not self._disabled:
+            try:
+                self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute("""CREATE TABLE IF NOT EXISTS verdicts (
+                    dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER,
+                    phase1 TEXT, phase2 TEXT, last_used REAL,
+                    PRIMARY KEY (dev, ino, size, mtime_ns))""")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS verdicts_last_used ON verdicts (last_used)")
+                self._conn.execute("""CREATE TABLE IF NOT EXISTS directories (
+                    path TEXT PRIMARY KEY, mtime_ns INTEGER,
+                    links TEXT, subdirs TEXT, last_used REAL)""")
+                self._conn.execute("""CREATE TABLE IF NOT EXISTS mounts (
+                    path TEXT PRIMARY KEY, fstype TEXT, last_seen REAL)""")
+                self._conn.execute("""CREATE TABLE IF NOT EXISTS link_counts (
+                    path TEXT PRIMARY KEY, count INTEGER, updated REAL)""")
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._fail(e)
+        return self._conn
+    
+    def _fail(self, error: Exception):
+        """Désactive le cache sans interrompre le scan"""
+        logger.warning(f"Cache de vérification désactivé ({self.db_path}): {error}")
+        self._disabled = True
+        self._pending = []
+        self._pending_dirs = []
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+    
+    def get(self, key: Tuple[int, int, int, int], phase: str) -> Optional[str]:
+        """Verdict en cache pour cette cible, ou None"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(f"SELECT {phase} FROM verdicts "
+                                   f"WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?", key).fetchone()
+            except sqlite3.Error as e:
+                self._fail(e)
+                return None
+            if not row or not row[0]:
+                return None
+            
+            self.hits[phase] += 1
+            # Réécrire le verdict rafraîchit last_used pour l'éviction
+            self._queue(phase, key, row[0])
+            return row[0]
+    
+    def put(self, key: Tuple[int, int, int, int], phase: str, verdict: str):
+        """Enregistre un verdict (écriture différée par lots)"""
+        with self._lock:
+            if not self._disabled:
+                self._queue(phase, key, verdict)
+    
+    def get_directory(self, path: str, mtime_ns: int) -> Optional[Tuple[List[str], List[str]]]:
+        """Contenu mémorisé d'un répertoire (noms des liens, sous-répertoires) si son mtime est inchangé"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute("SELECT mtime_ns, links, subdirs FROM directories WHERE path = ?",
+                                   (path,)).fetchone()
+            except sqlite3.Error as e:
+                self._fail(e)
+                return None
+            if not row or row[0] != mtime_ns:
+                return None
+            
+            links, subdirs = json.loads(row[1]), json.loads(row[2])
+            self.hits['directories'] += 1
+            self._queue_directory(path, mtime_ns, links, subdirs)
+            return links, subdirs
+    
+    def put_directory(self, path: str, mtime_ns: int, links: List[str], subdirs: List[str]):
+        """Mémorise le contenu d'un répertoire après listing"""
+        with self._lock:
+            if not self._disabled:
+                self._queue_directory(path, mtime_ns, links, subdirs)
+    
+    def get_mounts(self, max_age: float) -> Dict[str, str]:
+        """Montages réseau/FUSE vus en bonne santé depuis moins de max_age secondes"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return {}
+            try:
+                rows = conn.execute("SELECT path, fstype FROM mounts WHERE last_seen >= ?",
+                                    (time.time() - max_age,)).fetchall()
+            except sqlite3.Error as e:
+                self._fail(e)
+                return {}
+            return dict(rows)
+    
+    def put_mount(self, path: str, fstype: str):
+        """Mémorise un montage réseau/FUSE trouvé en bonne santé"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO mounts (path, fstype, last_seen) VALUES (?, ?, ?)",
+                                 (path, fstype, time.time()))
+            except sqlite3.Error as e:
+                self._fail(e)
+    
+    def get_link_counts(self, paths: List[str]) -> Dict[str, Tuple[int, float]]:
+        """Nombre de liens mémorisé par répertoire: chemin -> (nombre, date du comptage)"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None or not paths:
+                return {}
+            try:
+                rows = []
+                for start in range(0, len(paths), 500):  # Limite de paramètres SQLite
+                    chunk = paths[start:start + 500]
+                    rows.extend(conn.execute(
+                        f"SELECT path, count, updated FROM link_counts WHERE path IN ({','.join('?' * len(chunk))})",
+                        chunk).fetchall())
+            except sqlite3.Error as e:
+                self._fail(e)
+                return {}
+            return {path: (count, updated) for path, count, updated in rows}
+    
+    def put_link_counts(self, counts: Dict[str, int]):
+        """Mémorise le nombre de liens des répertoires entièrement parcourus"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None or not counts:
+                return
+            now = time.time()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO link_counts (path, count, updated) VALUES (?, ?, ?)",
+                                     [(path, count, now) for path, count in counts.items()])
+            except sqlite3.Error as e:
+                self._fail(e)
+    
+    def _queue(self, phase: str, key: Tuple[int, int, int, int], verdict: str):
+        self._pending.append((phase, key, verdict))
+        if len(self._pending) >= self.FLUSH_EVERY:
+            self._flush_locked()
+    
+    def _queue_directory(self, path: str, mtime_ns: int, links: List[str], subdirs: List[str]):
+        self._pending_dirs.append((path, mtime_ns, json.dumps(links), json.dumps(subdirs)))
+        if len(self._pending_dirs) >= self.FLUSH_EVERY:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        pending, self._pending = self._pending, []
+        pending_dirs, self._pending_dirs = self._pending_dirs, []
+        conn = self._connect()
+        if conn is None or not (pending or pending_dirs):
+            return
+        
+        now = time.time()
+        try:
+            with conn:
+                if pending_dirs:
+                    conn.executemany("INSERT OR REPLACE INTO directories (path, mtime_ns, links, subdirs, last_used) "
+                                     "VALUES (?, ?, ?, ?, ?)", [row + (now,) for row in pending_dirs])
+                for phase in self.PHASES:
+                    rows = [key + (verdict, now) for p, key, verdict in pending if p == phase]
+                    if rows:
+                        conn.executemany(
+                            f"INSERT INTO verdicts (dev, ino, size, mtime_ns, {phase}, last_used) "
+                            f"VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (dev, ino, size, mtime_ns) "
+                            f"DO UPDATE SET {phase} = excluded.{phase}, last_used = excluded.last_used",
+                            rows)
+        except sqlite3.Error as e:
+            self._fail(e)
+    
+    def flush(self):
+        """Écrit les verdicts en attente"""
+        with self._lock:
+            self._flush_locked()
+    
+    def close(self):
+        """Écrit les verdicts en attente, applique l'éviction et ferme la base"""
+        with self._lock:
+            self._flush_locked()
+            if self._conn is None:
+                return
+            try:
+                count = self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    with self._conn:
+                        self._conn.execute("DELETE FROM verdicts WHERE rowid IN "
+                                           "(SELECT rowid FROM verdicts ORDER BY last_used ASC LIMIT ?)", (excess,))
+                    logger.info(f"Cache de vérification: {excess:,} entrées évincées")
+                with self._conn:
+                    self._conn.execute("DELETE FROM directories WHERE last_used < ?",
+                                       (time.time() - self.DIRECTORY_RETENTION,))
+                self._conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Erreur fermeture cache {self.db_path}: {e}")
+            self._conn = None
+
+class ScanCheckpoint:
+    """Point de reprise d'un scan long (SQLite), pour --resume
+    
+    Enregistre les paramètres du scan, les répertoires dont tous les liens ont
+    été vérifiés avec leurs résultats de phase 1, puis les verdicts de phase 2.
+    Les écritures sont groupées et validées au plus toutes les `interval`
+    secondes dans une même transaction: un répertoire n'est marqué terminé
+    qu'avec ses résultats. Comme le cache, une erreur SQLite désactive le point
+    de reprise sans interrompre le scan.
+    """
+    
+    def __init__(self, db_path: str, interval: float):
+        self.db_path = db_path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disabled = sqlite3 is None
+        self._pending_results = []
+        self._pending_dirs = []
+        self._pending_phase2 = []
+        self._last_flush = time.monotonic()
+    
+    def _connect(self):
+        """Ouvre la base à la première utilisation (verrou déjà pris)"""
+        if self._conn is None and not self._disabled:
+            try:
+                self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+                self._conn.execute("CREATE TABLE IF NOT EXISTS phase1 (path TEXT PRIMARY KEY, record TEXT)")
+                self._conn.execute("CREATE TABLE IF NOT EXISTS done_dirs (path TEXT PRIMARY KEY)")
+                self._conn.execute("CREATE TABLE IF NOT EXISTS phase2 (path TEXT PRIMARY KEY, record TEXT)")
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._fail(e)
+        return self._conn
+    
+    def _fail(self, error: Exception):
+        logger.warning(f"Point de reprise désactivé ({self.db_path}): {error}")
+        self._disabled = True
+        self._pending_results, self._pending_dirs, self._pending_phase2 = [], [], []
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+    
+    def load(self) -> Optional[Dict]:
+        """Paramètres du scan enregistré, ou None s'il n'y a pas de point de reprise"""
+        if not os.path.exists(self.db_path):
+            return None
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                meta = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM meta")}
+            except sqlite3.Error as e:
+                self._fail(e)
+                return None
+        return meta if meta.get('paths') else None
+    
+    def start(self, meta: Dict):
+        """Nouveau scan: remplace tout point de reprise existant"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    for table in ('meta', 'phase1', 'done_dirs', 'phase2'):
+                        conn.execute(f"DELETE FROM {table}")
+                    conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                                     [(key, json.dumps(value)) for key, value in meta.items()])
+            except sqlite3.Error as e:
+                self._fail(e)
+    
+    def set_meta(self, key: str, value):
+        with self._lock:
+            self._flush_locked()
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+            except sqlite3.Error as e:
+                self._fail(e)
+    
+    def add_result(self, result: Dict):
+        with self._lock:
+            if not self._disabled:
+                self._pending_results.append((result['path'], json.dumps(result, ensure_ascii=False)))
+    
+    def dir_done(self, dir_path: str):
+        with self._lock:
+            if not self._disabled:
+                self._pending_dirs.append((dir_path,))
+    
+    def add_phase2(self, path: str, corrupted: Optional[Dict]):
+        """Verdict de phase 2: None si valide, l'enregistrement CORRUPTED sinon"""
+        with self._lock:
+            if not self._disabled:
+                self._pending_phase2.append((path, json.dumps(corrupted, ensure_ascii=False) if corrupted else None))
+    
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+    
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        results, self._pending_results = self._pending_results, []
+        dirs, self._pending_dirs = self._pending_dirs, []
+        phase2, self._pending_phase2 = self._pending_phase2, []
+        conn = self._connect()
+        if conn is None or not (results or dirs or phase2):
+            return
+        try:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO phase1 (path, record) VALUES (?, ?)", results)
+                conn.executemany("INSERT OR IGNORE INTO done_dirs (path) VALUES (?)", dirs)
+                conn.executemany("INSERT OR REPLACE INTO phase2 (path, record) VALUES (?, ?)", phase2)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('updated', ?)",
+                             (json.dumps(datetime.now().isoformat()),))
+        except sqlite3.Error as e:
+            self._fail(e)
+    
+    def done_dirs(self) -> set:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return set()
+            try:
+                return {row[0] for row in conn.execute("SELECT path FROM done_dirs")}
+            except sqlite3.Error as e:
+                self._fail(e)
+                return set()
+    
+    def iter_results(self, done_dirs: Optional[set] = None) -> Iterator[Dict]:
+        """Résultats de phase 1 enregistrés (limités aux répertoires terminés si done_dirs est donné)"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                cursor = conn.execute("SELECT path, record FROM phase1")
+            except sqlite3.Error as e:
+                self._fail(e)
+                return
+        while True:
+            with self._lock:
+                try:
+                    rows = cursor.fetchmany(5000)
+                except sqlite3.Error as e:
+                    self._fail(e)
+                    return
+            if not rows:
+                return
+            for path, record in rows:
+                if done_dirs is None or os.path.dirname(path) in done_dirs:
+                    yield json.loads(record)
+    
+    def phase2_verdicts(self) -> Dict[str, Optional[Dict]]:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return {}
+            try:
+                rows = conn.execute("SELECT path, record FROM phase2").fetchall()
+            except sqlite3.Error as e:
+                self._fail(e)
+                return {}
+        return {path: json.loads(record) if record else None for path, record in rows}
+    
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except sqlite3.Error:
+                    pass
+                self._conn = None
+    
+    def clear(self):
+        """Scan terminé: supprime le point de reprise"""
+        with self._lock:
+            self._pending_results, self._pending_dirs, self._pending_phase2 = [], [], []
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except sqlite3.Error:
+                    pass
+                self._conn = None
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.remove(self.db_path + suffix)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"Suppression du point de reprise impossible: {e}")
+
+class TargetDirectoryIndex:
+    """Listings partagés des répertoires cibles des liens (phase 1)
+    
+    Les liens pointent massivement vers quelques répertoires de montages
+    rclone/mergerfs: chaque répertoire cible est listé une seule fois avec
+    os.scandir et ses entrées servent à tous les liens qui y pointent. Un seul
+    thread liste un répertoire donné, les autres attendent son résultat.
+    """
+    
+    def __init__(self, max_listings: int):
+        self.max_listings = max_listings
+        self._lock = threading.Lock()
+        self._listings = OrderedDict()
+        self._loading: Dict[str, threading.Event] = {}
+    
+    def listing(self, dir_path: str) -> Optional[Dict[str, os.DirEntry]]:
+        """Entrées du répertoire par nom, ou None s'il ne peut pas être listé"""
+        with self._lock:
+            if dir_path in self._listings:
+                self._listings.move_to_end(dir_path)
+                return self._listings[dir_path]
+            event = self._loading.get(dir_path)
+            owner = event is None
+            if owner:
+                event = self._loading[dir_path] = threading.Event()
+        
+        if not owner:
+            event.wait()
+            with self._lock:
+                return self._listings.get(dir_path)
+        
+        entries = None
+        try:
+            with os.scandir(dir_path) as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError:
+            entries = None
+        finally:
+            with self._lock:
+                self._listings[dir_path] = entries
+                while len(self._listings) > self.max_listings:
+                    self._listings.popitem(last=False)
+                del self._loading[dir_path]
+            event.set()
+        return entries
+
+class MountHealthChecker:
+    """Santé des points de montage derrière les cibles des liens
+    
+    Chaque montage réseau/FUSE est sondé une seule fois (statvfs + listing, avec
+    timeout) avant de vérifier le premier lien qui y pointe. Un montage connu
+    (vu sain lors d'un scan précédent) mais absent de /proc/mounts est considéré
+    tombé: ses liens apparaîtraient sinon comme cassés sur le disque racine.
+    """
+    REMOTE_FSTYPES = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'sshfs', '9p',
+                      'ceph', 'glusterfs', 'davfs', 'afs'}
+    
+    def __init__(self, cache: VerificationCache, timeout: float, memory_days: int):
+        self.cache = cache
+        self.timeout = timeout
+        self.memory_seconds = memory_days * 86400
+        self._lock = threading.Lock()
+        self._mount_locks: Dict[str, threading.Lock] = {}
+        self._mounts: Optional[Dict[str, str]] = None
+        self._missing: Dict[str, str] = {}
+        self._health: Dict[str, Tuple[bool, str]] = {}
+    
+    @staticmethod
+    def read_mount_table() -> Dict[str, str]:
+        """Points de montage actuels et leur type (/proc/self/mounts)"""
+        mounts = {}
+        try:
+            with open('/proc/self/mounts', 'r') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 3:
+                        # Les espaces et tabulations sont encodés en octal
+                        mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), parts[1])
+                        mounts[mount_point] = parts[2]
+        except OSError as e:
+            logger.debug(f"Lecture /proc/self/mounts impossible: {e}")
+        return mounts
+    
+    def is_remote(self, fstype: str) -> bool:
+        """Montage réseau/FUSE susceptible de tomber ou de bloquer"""
+        return fstype.startswith('fuse') or fstype in self.REMOTE_FSTYPES
+    
+    def refresh(self):
+        """Relit la table des montages et oublie les sondages précédents"""
+        mounts = self.read_mount_table()
+        known = self.cache.get_mounts(self.memory_seconds)
+        with self._lock:
+            self._mounts = mounts
+            self._missing = {path: fstype for path, fstype in known.items() if path not in mounts}
+            self._health = {}
+        for path, fstype in self._missing.items():
+            logger.warning(f"Montage {path} ({fstype}) absent de /proc/mounts")
+    
+    def mount_for(self, path: str) -> Tuple[str, str, bool]:
+        """(point de montage, type, absent) du chemin donné"""
+        if self._mounts is None:
+            self.refresh()
+        current = path
+        while True:
+            if current in self._missing:
+                return current, self._missing[current], True
+            if current in self._mounts:
+                return current, self._mounts[current], False
+            parent = os.path.dirname(current)
+            if parent == current:
+                return current, '', False
+            current = parent
+    
+    def _probe(self, mount_point: str) -> Tuple[bool, str]:
+        """Sonde un montage dans un thread séparé pour ne pas rester bloqué sur un FUSE figé"""
+        outcome = {}
+        
+        def run():
+            try:
+                os.statvfs(mount_point)
+                with os.scandir(mount_point) as entries:
+                    outcome['empty'] = next(entries, None) is None
+            except OSError as e:
+                outcome['error'] = str(e)
+        
+        probe = threading.Thread(target=run, daemon=True)
+        probe.start()
+        probe.join(self.timeout)
+        if probe.is_alive():
+            return False, f"aucune réponse après {self.timeout}s"
+        if 'error' in outcome:
+            return False, outcome['error']
+        if outcome.get('empty'):
+            # Racine vide: montage décroché qui servirait une arborescence vide
+            return False, "racine du montage vide"
+        return True, "ok"
+    
+    def check(self, path: str) -> Tuple[bool, str]:
+        """(disponible, montage) pour la cible donnée ; sonde le montage à la première demande"""
+        mount_point, fstype, missing = self.mount_for(path)
+        if missing:
+            return False, mount_point
+        if not self.is_remote(fstype):
+            return True, mount_point
+        
+        with self._lock:
+            mount_lock = self._mount_locks.setdefault(mount_point, threading.Lock())
+        with mount_lock:
+            if mount_point not in self._health:
+                healthy, reason = self._probe(mount_point)
+                self._health[mount_point] = (healthy, reason)
+                if healthy:
+                    self.cache.put_mount(mount_point, fstype)
+                else:
+                    print(f"🔌 Montage indisponible: {mount_point} ({reason}) - liens marqués MOUNT_DOWN")
+                    logger.error(f"Montage {mount_point} ({fstype}) indisponible: {reason}")
+            return self._health[mount_point][0], mount_point
+    
+    def recheck(self) -> Dict[str, bool]:
+        """Relit la table et resonde les montages déjà vus ; retourne ceux dont l'état a changé"""
+        with self._lock:
+            previous = {path: healthy for path, (healthy, _) in self._health.items()}
+            previous.update({path: False for path in self._missing})
+        self.refresh()
+        changed = {}
+        for mount_point, was_healthy in previous.items():
+            healthy, _ = self.check(mount_point)
+            if healthy != was_healthy:
+                changed[mount_point] = healthy
+        return changed
+    
+    def down_mounts(self) -> Dict[str, str]:
+        """Montages indisponibles détectés: point de montage -> raison"""
+        down = {path: "absent de /proc/mounts" for path in self._missing}
+        down.update({path: reason for path, (healthy, reason) in self._health.items() if not healthy})
+        return down
+
+class CheckTimeout(Exception):
+    """Vérification abandonnée après dépassement de son délai"""
+
+class DeadlineExecutor(Executor):
+    """Pool de threads démons avec délai par tâche
+    
+    expire() résout en CheckTimeout les tâches qui dépassent leur délai (lecture
+    bloquée sur un montage figé) ; le thread bloqué est abandonné et remplacé par
+    un nouveau worker pour que le scan continue. Les threads étant démons, un
+    thread resté bloqué n'empêche pas le script de se terminer.
+    
+    set_limit() borne le nombre de tâches exécutées simultanément sous
+    max_workers: les workers au-delà de la limite attendent sans consommer.
+    
+    En sortie de bloc `with` (fin normale, exception, Ctrl-C, générateur fermé),
+    les tâches pas encore démarrées sont annulées et les workers ne sont pas
+    attendus: expire() n'étant plus appelé, un worker bloqué retiendrait la sortie.
+    """
+    
+    def __init__(self, max_workers: int, timeout: float):
+        self.timeout = timeout
+        self.replaced = 0
+        self.limit = max_workers
+        self._active = 0
+        self._tasks = queue.Queue()
+        self._lock = threading.Lock()
+        self._slots = threading.Condition(self._lock)
+        self._workers = set()
+        self._running: Dict[threading.Thread, Tuple[Future, float]] = {}
+        for _ in range(max_workers):
+            self._spawn()
+    
+    def set_limit(self, limit: int):
+        with self._slots:
+            self.limit = max(1, limit)
+            self._slots.notify_all()
+    
+    def _spawn(self):
+        worker = threading.Thread(target=self._work, daemon=True)
+        with self._lock:
+            self._workers.add(worker)
+        worker.start()
+    
+    def _work(self):
+        me = threading.current_thread()
+        while True:
+            with self._slots:
+                self._slots.wait_for(lambda: self._active < self.limit)
+                self._active += 1
+            task = self._tasks.get()
+            if task is None:
+                with self._slots:
+                    self._active -= 1
+                    self._slots.notify()
+                return
+            future, fn, args, kwargs = task
+            if not future.set_running_or_notify_cancel():
+                with self._slots:
+                    self._active -= 1
+                    self._slots.notify()
+                continue
+            
+            with self._lock:
+                self._running[me] = (future, time.monotonic())
+            try:
+                result = fn(*args, **kwargs)
+                error = None
+            except BaseException as e:
+                result, error = None, e
+            
+            with self._slots:
+                self._running.pop(me, None)
+                abandoned = me not in self._workers
+                if not abandoned:  # Le créneau d'un worker abandonné a été rendu par expire()
+                    self._active -= 1
+                    self._slots.notify()
+            try:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+            except InvalidStateError:
+                pass  # Déjà résolue en CheckTimeout
+            if abandoned:
+                return  # Un remplaçant a pris la place de ce worker
+    
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        self._tasks.put((future, fn, args, kwargs))
+        return future
+    
+    def expire(self) -> int:
+        """Résout les tâches hors délai en CheckTimeout et remplace leurs workers"""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for worker, (future, started) in list(self._running.items()):
+                if now - started > self.timeout:
+                    del self._running[worker]
+                    self._workers.discard(worker)
+                    self._active -= 1
+                    expired.append(future)
+            if expired:
+                self._slots.notify_all()
+        
+        for future in expired:
+            try:
+                future.set_exception(CheckTimeout(f"délai de {self.timeout}s dépassé"))
+            except InvalidStateError:
+                pass
+            self._spawn()
+            self.replaced += 1
+        return len(expired)
+    
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False, **kwargs):
+        """Arrête les workers ; wait: attente bornée au délai par tâche (un worker bloqué est abandonné)"""
+        if cancel_futures:
+            while True:
+                try:
+                    task = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if task is not None:
+                    task[0].cancel()
+        with self._lock:
+            workers = list(self._workers)
+        for _ in workers:
+            self._tasks.put(None)
+        if wait:
+            deadline = time.monotonic() + self.timeout
+            for worker in workers:
+                worker.join(max(0.0, deadline - time.monotonic()))
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown(wait=False, cancel_futures=True)
+        return False
+
+class CircuitBreaker:
+    """Coupe-circuit par préfixe de chemin cible
+    
+    Après `threshold` TIMEOUT sous un même préfixe (ex: /mnt/rclone/Films), les
+    liens suivants vers ce préfixe ne sont plus vérifiés pour le reste du scan.
+    """
+    
+    def __init__(self, threshold: int, depth: int):
+        self.threshold = threshold
+        self.depth = depth
+        self._lock = threading.Lock()
+        self._timeouts: Dict[str, int] = {}
+        self.open_prefixes = set()
+    
+    def prefix(self, target_path: str) -> str:
+        parts = target_path.split(os.sep)
+        return os.sep.join(parts[:self.depth + 1]) or os.sep
+    
+    def is_open(self, prefix: str) -> bool:
+        return prefix in self.open_prefixes
+    
+    def record_timeout(self, prefix: str) -> bool:
+        """Compte un TIMEOUT, retourne True si le coupe-circuit vient de s'ouvrir"""
+        with self._lock:
+            self._timeouts[prefix] = self._timeouts.get(prefix, 0) + 1
+            if self._timeouts[prefix] >= self.threshold and prefix not in self.open_prefixes:
+                self.open_prefixes.add(prefix)
+                return True
+        return False
+
+class ConcurrencyController:
+    """Ajustement du nombre de vérifications simultanées pendant le scan
+    
+    Augmentation additive tant que la latence médiane par vérification reste
+    proche de sa référence et que la machine est peu chargée ; réduction d'un
+    quart dès que la latence double, que la charge par cœur dépasse la limite
+    ou que l'iowait monte (Plex qui transcode, disque saturé).
+    """
+    
+    def __init__(self, name: str, initial: int, minimum: int, maximum: int,
+                 latency_floor: float = 0.01, enabled: bool = True):
+        self.name = name
+        self.minimum = max(1, min(minimum, maximum))
+        self.maximum = max(self.minimum, maximum)
+        self.limit = max(self.minimum, min(initial, self.maximum))
+        self.latency_floor = latency_floor  # En dessous, la latence n'est pas un signal
+        self.enabled = enabled
+        self.initial = self.limit
+        self.peak = self.limit
+        self.lowest = self.limit
+        self.adjustments = 0
+        self.baseline: Optional[float] = None
+        self._samples: List[float] = []
+        self._lock = threading.Lock()
+        self._last_adjust = time.monotonic()
+        self._cpu_times = self._read_cpu_times()
+    
+    @staticmethod
+    def _read_cpu_times() -> Optional[Tuple[int, int]]:
+        """(total, iowait) en jiffies depuis /proc/stat, None hors Linux"""
+        try:
+            with open('/proc/stat') as f:
+                fields = [int(value) for value in f.readline().split()[1:]]
+            return sum(fields), fields[4]
+        except (OSError, ValueError, IndexError):
+            return None
+    
+    def _iowait(self) -> float:
+        cpu_times = self._read_cpu_times()
+        previous, self._cpu_times = self._cpu_times, cpu_times
+        if not cpu_times or not previous or cpu_times[0] <= previous[0]:
+            return 0.0
+        return (cpu_times[1] - previous[1]) / (cpu_times[0] - previous[0])
+    
+    @staticmethod
+    def _load_per_cpu() -> float:
+        try:
+            return os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (OSError, AttributeError):
+            return 0.0
+    
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def timed(self, func, *args):
+        """Exécute func(*args) en mesurant sa latence"""
+        start = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            self.record(time.monotonic() - start)
+    
+    def adjust(self) -> int:
+        """Recalcule la limite au plus une fois par intervalle, retourne la limite courante"""
+        now = time.monotonic()
+        if not self.enabled or now - self._last_adjust < SERVER_CONFIG['adjust_interval']:
+            return self.limit
+        self._last_adjust = now
+        
+        with self._lock:
+            samples, self._samples = self._samples, []
+        median = sorted(samples)[len(samples) // 2] if samples else None
+        load = self._load_per_cpu()
+        iowait = self._iowait()
+        
+        slow = (median is not None and self.baseline is not None
+                and median > self.latency_floor and median > 2 * self.baseline)
+        if load > SERVER_CONFIG['load_per_cpu_limit'] or iowait > SERVER_CONFIG['iowait_limit'] or slow:
+            new_limit = max(self.minimum, self.limit * 3 // 4)
+            reason = f"charge {load:.2f}/cœur, iowait {iowait:.0%}" + (f", latence {median * 1000:.0f}ms" if slow else "")
+        elif median is not None and len(samples) >= self.limit:
+            # Tous les workers ont travaillé pendant l'intervalle: on en essaie un de plus
+            new_limit = min(self.maximum, self.limit + 1)
+            reason = f"latence {median * 1000:.1f}ms"
+        else:
+            new_limit, reason = self.limit, ""
+        
+        # Référence: plus basse latence observée, qui remonte lentement (5% par intervalle)
+        if median is not None and not slow:
+            self.baseline = median if self.baseline is None else min(median, self.baseline * 1.05)
+        
+        if new_limit != self.limit:
+            logger.info(f"[{self.name}] concurrence {self.limit} -> {new_limit} ({reason})")
+            self.limit = new_limit
+            self.adjustments += 1
+            self.peak = max(self.peak, new_limit)
+            self.lowest = min(self.lowest, new_limit)
+        return self.limit
+    
+    def summary(self) -> str:
+        return (f"{self.initial} → {self.limit} (min {self.lowest}, max {self.peak}, "
+                f"{self.adjustments} ajustements)")
+
+class InotifyWatcher:
+    """Surveillance inotify des répertoires (mode --watch)
+    
+    Appels directs à la libc par ctypes (Linux, sans dépendance). Un watch par
+    répertoire, ajouté par add_watch() ; read_events() renvoie les entrées créées
+    ou déplacées dans les répertoires surveillés. Un débordement de la file du
+    noyau est signalé par overflowed: des événements ont été perdus.
+    """
+    IN_ATTRIB = 0x00000004
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_DONT_FOLLOW = 0x02000000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_CREATE | IN_MOVED_TO | IN_ATTRIB | IN_ONLYDIR | IN_DONT_FOLLOW
+    EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, longueur du nom
+    
+    def __init__(self):
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            init = self._libc.inotify_init1
+        except (OSError, AttributeError) as e:
+            raise OSError(errno.ENOSYS, f"inotify indisponible: {e}")
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_init1: {os.strerror(error)}")
+        self._dirs: Dict[int, str] = {}
+        self.overflowed = False
+        self.limit_reached = False
+    
+    def __len__(self) -> int:
+        return len(self._dirs)
+    
+    def add_watch(self, dir_path: str) -> bool:
+        """Surveille un répertoire (un répertoire déplacé garde son watch, son chemin est mis à jour)"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dir_path), self.WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                if not self.limit_reached:
+                    self.limit_reached = True
+                    print("⚠️ Limite de watches inotify atteinte: augmentez fs.inotify.max_user_watches")
+                    logger.error(f"Limite inotify atteinte à {len(self._dirs):,} répertoires surveillés")
+            elif error != errno.ENOENT:
+                logger.warning(f"Surveillance impossible de {dir_path}: {os.strerror(error)}")
+            return False
+        self._dirs[wd] = dir_path
+        return True
+    
+    def read_events(self, timeout: float) -> List[Tuple[str, bool]]:
+        """(chemin, est un répertoire) des entrées apparues, [] si rien avant timeout"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        
+        events = []
+        offset = 0
+        header_size = self.EVENT_HEADER.size
+        while offset + header_size <= len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + header_size:offset + header_size + length].rstrip(b'\0')
+            offset += header_size + length
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & self.IN_IGNORED:  # Répertoire supprimé ou démonté
+                self._dirs.pop(wd, None)
+                continue
+            dir_path = self._dirs.get(wd)
+            if dir_path is None or not name:
+                continue
+            events.append((os.path.join(dir_path, os.fsdecode(name)), bool(mask & self.IN_ISDIR)))
+        return events
+    
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class RateLimiter:
+    """Espacement minimal entre deux requêtes vers un même serveur (au lieu de pauses fixes)
+    
+    Partagé entre threads: chaque appel à wait() réserve le créneau suivant.
+    """
+    
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+    
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+# États finaux d'une commande Sonarr/Radarr (/api/v3/command/{id})
+ARR_COMMAND_FINAL_STATES = {'completed', 'failed', 'aborted', 'cancelled', 'orphaned'}
+ARR_COMMAND_PRUNED = 'pruned'  # Commande déjà purgée de la file du serveur (HTTP 404)
+
+class ArrCommandTracker:
+    """Suivi des commandes envoyées aux serveurs média (identifiants renvoyés par /api/v3/command)
+    
+    record() note chaque commande et son heure d'envoi, update() son dernier état
+    relevé ; la latence est le temps entre l'envoi et le relevé qui la voit
+    terminée. summary() donne par service latences, échecs et commandes encore
+    en cours, pour le résumé final et le pied du rapport. prune() (mode --watch)
+    cumule les commandes terminées dans ces totaux puis les oublie.
+    
+    Une commande que le serveur a déjà purgée de sa file (HTTP 404) est
+    terminée sans latence connue: ni échec, ni mesure.
+    """
+    
+    def __init__(self):
+        self.commands: Dict[Tuple[str, int], Dict] = {}
+        self.endpoints: Dict[str, Tuple[str, Dict]] = {}  # Service -> (URL, en-têtes) pour les relevés
+        self._done: Dict[str, Dict] = {}  # Service -> totaux des commandes terminées oubliées par prune()
+        self._lock = threading.Lock()
+    
+    def __bool__(self) -> bool:
+        return bool(self.commands or self._done)
+    
+    def record(self, service: str, url: str, headers: Dict, command_id: int, description: str):
+        with self._lock:
+            self.endpoints[service] = (url, headers)
+            self.commands[(service, command_id)] = {'description': description, 'state': 'queued',
+                                                    'sent': time.monotonic(), 'latency': None, 'done': False}
+    
+    def pending(self, service: str) -> Dict[int, Dict]:
+        """Commandes du service pas encore vues terminées"""
+        with self._lock:
+            return {command_id: record for (owner, command_id), record in self.commands.items()
+                    if owner == service and not record['done']}
+    
+    def update(self, service: str, command_id: int, state: str, final: Optional[bool] = None) -> bool:
+        """Enregistre l'état relevé (final par défaut si état terminal de l'API), True s'il a changé"""
+        with self._lock:
+            record = self.commands[(service, command_id)]
+            changed = state != record['state']
+            record['state'] = state
+            if final is None:
+                final = state in ARR_COMMAND_FINAL_STATES
+            if final and not record['done']:
+                record['done'] = True
+                if state != ARR_COMMAND_PRUNED:
+                    record['latency'] = time.monotonic() - record['sent']
+            return changed
+    
+    def states(self, service: str, command_ids: List[int]) -> Dict[str, str]:
+        """Description -> dernier état des commandes données (encore suivies)"""
+        with self._lock:
+            records = [self.commands.get((service, command_id)) for command_id in command_ids]
+            return {record['description']: record['state'] for record in records if record}
+    
+    def prune(self) -> int:
+        """Cumule les commandes terminées dans les totaux par service et les oublie ; retourne leur nombre"""
+        with self._lock:
+            finished = [key for key, record in self.commands.items() if record['done']]
+            for service, command_id in finished:
+                record = self.commands.pop((service, command_id))
+                done = self._done.setdefault(service, self._empty_totals())
+                self._add_finished(done, command_id, record)
+            return len(finished)
+    
+    @staticmethod
+    def _empty_totals() -> Dict:
+        return {'commands': 0, 'completed': 0, 'failed': [], 'pending': 0,
+                'latency_sum': 0.0, 'latency_count': 0, 'latency_max': None}
+    
+    @staticmethod
+    def _add_finished(totals: Dict, command_id: int, record: Dict):
+        totals['commands'] += 1
+        if record['state'] in ('completed', ARR_COMMAND_PRUNED):
+            totals['completed'] += 1
+        else:
+            totals['failed'].append({'id': command_id, 'command': record['description'], 'state': record['state']})
+        if record['latency'] is not None:
+            totals['latency_sum'] += record['latency']
+            totals['latency_count'] += 1
+            totals['latency_max'] = max(totals['latency_max'] or 0.0, record['latency'])
+    
+    def summary(self) -> Dict[str, Dict]:
+        """Par service: commandes, terminées, échecs (commande, état), en cours, latences en secondes"""
+        with self._lock:
+            totals = {service: dict(done, failed=list(done['failed'])) for service, done in self._done.items()}
+            for (service, command_id), record in sorted(self.commands.items()):
+                entry = totals.setdefault(service, self._empty_totals())
+                if record['done']:
+                    self._add_finished(entry, command_id, record)
+                else:
+                    entry['commands'] += 1
+                    entry['pending'] += 1
+        summary = {}
+        for service, entry in sorted(totals.items()):
+            count = entry.pop('latency_count')
+            latency_sum = entry.pop('latency_sum')
+            entry['latency_avg'] = round(latency_sum / count, 2) if count else None
+            entry['latency_max'] = round(entry['latency_max'], 2) if count else None
+            summary[service] = entry
+        return summary
+
+def _normalize_title(title: str) -> str:
+    """Titre comparable: minuscules, sans accents ni ponctuation ("Show.Name" == "Show: Name")"""
+    decomposed = unicodedata.normalize('NFKD', title.lower())
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(re.findall(r'[a-z0-9]+', stripped))
+
+class ArrLibraryIndex:
+    """Index d'une bibliothèque Sonarr (séries) ou Radarr (films), construit une fois
+    
+    Titre normalisé (et année) -> identifiant, chemin -> identifiant. find()
+    cherche le titre exact, puis un titre commençant par le nom cherché dans la
+    liste triée des titres (bisect) au lieu de parcourir toute la bibliothèque.
+    find_path() rattache un fichier au dossier de sa série ou de son film par
+    recherche dichotomique dans la liste triée des dossiers.
+    """
+    
+    def __init__(self, items: List[Dict]):
+        self.built = time.monotonic()
+        self.titles: Dict[int, str] = {}
+        self.by_title: Dict[str, List[int]] = {}
+        self.by_title_year: Dict[Tuple[str, int], int] = {}
+        self.by_path: Dict[str, int] = {}
+        for item in items:
+            item_id = item.get('id')
+            if item_id is None:
+                continue
+            self.titles[item_id] = item.get('title', str(item_id))
+            title = _normalize_title(item.get('title') or '')
+            names = {title, re.sub(r' (19|20)\d{2}$', '', title)}  # "Show (2019)" -> "show"
+            for name in filter(None, names):
+                self.by_title.setdefault(name, []).append(item_id)
+                if item.get('year'):
+                    self.by_title_year[(name, item['year'])] = item_id
+            if item.get('path'):
+                self.by_path[os.path.normpath(item['path'])] = item_id
+        self._sorted_titles = sorted(self.by_title)
+        self._sorted_paths = sorted(self.by_path)
+    
+    def __len__(self) -> int:
+        return len(self.titles)
+    
+    def find(self, name: str, year: Optional[int] = None) -> Optional[int]:
+        """Identifiant de l'élément correspondant au nom (et à l'année) extraits du chemin"""
+        key = _normalize_title(name)
+        if not key:
+            return None
+        if year and (key, year) in self.by_title_year:
+            return self.by_title_year[(key, year)]
+        if key in self.by_title:
+            return self.by_title[key][0]
+        
+        # Titre plus long que le nom extrait ("the office" -> "the office us")
+        position = bisect.bisect_left(self._sorted_titles, key)
+        if position < len(self._sorted_titles) and self._sorted_titles[position].startswith(key + ' '):
+            return self.by_title[self._sorted_titles[position]][0]
+        return None
+    
+    def find_path(self, path: str) -> Optional[int]:
+        """Identifiant de l'élément dont le dossier contient le chemin donné
+        
+        Le plus grand dossier <= chemin dans l'ordre trié est le dossier parent
+        s'il en existe un ; sinon ("/tv/Show 2" < "/tv/Show/S01"), la recherche
+        reprend sur le préfixe commun, plus court à chaque tour.
+        """
+        path = os.path.normpath(path)
+        probe = path
+        while probe:
+            position = bisect.bisect_right(self._sorted_paths, probe) - 1
+            if position < 0:
+                return None
+            candidate = self._sorted_paths[position]
+            if path == candidate or path.startswith(candidate.rstrip(os.sep) + os.sep):
+                return self.by_path[candidate]
+            common = os.path.commonprefix([probe, candidate])
+            probe = common if common != probe else probe[:-1]
+        return None
+
+# Configuration par défaut des serveurs média (complétée par ~/.symguard_config.json)
+DEFAULT_MEDIA_CONFIG = {
+    'sonarr': {'url': 'http://localhost:8989', 'api_key': None, 'enabled': True},
+    'radarr': {'url': 'http://localhost:7878', 'api_key': None, 'enabled': True},
+    'bazarr': {'url': 'http://localhost:6767', 'api_key': None, 'enabled': True},
+    'prowlarr': {'url': 'http://localhost:9696', 'api_key': None, 'enabled': True}
+}
+
+class MediaConfigStore:
+    """Configuration des serveurs média chargée une fois et partagée
+    
+    load() renvoie toujours le même dictionnaire ; le fichier n'est relu que si
+    sa date de modification ou sa taille ont changé, vérifiées au plus toutes
+    les check_interval secondes. save() écrit un fichier temporaire du même
+    répertoire puis le renomme : un lecteur ne voit jamais de JSON tronqué. Les
+    clés API détectées dans les config.xml (ou leur absence) restent mémorisées
+    jusqu'au prochain rechargement du fichier.
+    """
+    
+    def __init__(self, config_file: str, check_interval: float = 5.0):
+        self.config_file = config_file
+        self.check_interval = check_interval
+        self.detected_keys: Dict[str, Optional[str]] = {}
+        self._config: Optional[Dict[str, Dict]] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._lock = threading.RLock()
+    
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.config_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    @staticmethod
+    def _merge(loaded: Dict) -> Dict[str, Dict]:
+        config = {service: dict(defaults) for service, defaults in DEFAULT_MEDIA_CONFIG.items()}
+        for service in config:
+            if isinstance(loaded.get(service), dict):
+                config[service].update(loaded[service])
+        return config
+    
+    def _replace(self, config: Dict[str, Dict]):
+        # Mise à jour sur place: les références déjà distribuées restent valides
+        if self._config is None:
+            self._config = config
+        elif config is not self._config:
+            self._config.clear()
+            self._config.update(config)
+    
+    def load(self) -> Dict[str, Dict]:
+        with self._lock:
+            now = time.monotonic()
+            if self._config is not None and now - self._checked < self.check_interval:
+                return self._config
+            self._checked = now
+            signature = self._file_signature()
+            if self._config is not None and signature == self._signature:
+                return self._config
+            
+            loaded = {}
+            if signature is not None:
+                try:
+                    with open(self.config_file, 'r') as f:
+                        loaded = json.load(f)
+                    logger.info(f"Configuration chargée depuis {self.config_file}")
+                except Exception as e:
+                    logger.warning(f"Erreur lecture config {self.config_file}: {e}")
+            self._signature = signature
+            self.detected_keys.clear()
+            self._replace(self._merge(loaded if isinstance(loaded, dict) else {}))
+            return self._config
+    
+    def save(self, config: Dict[str, Dict]):
+        """Écriture atomique (fichier temporaire + os.replace), droits du fichier existant conservés"""
+        directory = os.path.dirname(self.config_file) or '.'
+        with self._lock:
+            fd, temp_path = tempfile.mkstemp(prefix='.symguard_config.', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(config, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                try:
+                    os.chmod(temp_path, stat.S_IMODE(os.stat(self.config_file).st_mode))
+                except OSError:
+                    pass  # Nouveau fichier: droits de mkstemp (0600), la config contient des clés API
+                os.replace(temp_path, self.config_file)
+            except BaseException:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+                raise
+            self._signature = self._file_signature()
+            self._checked = time.monotonic()
+            self._replace(self._merge(config))
+
 class AdvancedSymlinkChecker:
-    def __init__(self, max_workers: int = None):
+    def __init__(self, max_workers: int = None, ffprobe_workers: int = None, rescan_all: bool = False,
+                 incremental: bool = False, check_timeout: float = None, ffprobe_batch: int = None,
+                 max_workers_ceiling: int = None, adaptive: bool = True, cache_path: str = None):
         # Utilise la config serveur ou la valeur par défaut optimisée
         self.max_workers = max_workers or SERVER_CONFIG['max_workers']
+        self.ffprobe_workers = ffprobe_workers or SERVER_CONFIG['ffprobe_workers']
+        
+        # Concurrence ajustée pendant le scan entre un plancher et un plafond (--fixed-jobs: désactivé)
+        self.adaptive = adaptive
+        self.max_workers_ceiling = max(self.max_workers, max_workers_ceiling or SERVER_CONFIG['max_workers_ceiling'])
+        self.controllers: Dict[str, ConcurrencyController] = {}
+        
+        # Phase 2 groupée: plusieurs fichiers par processus ffmpeg (ffprobe seul sinon)
+        self.ffprobe_batch = max(1, ffprobe_batch or SERVER_CONFIG['ffprobe_batch_size'])
+        self.ffmpeg_path = shutil.which('ffmpeg')
+        
+        # Cache des verdicts (--rescan-all: ignore les verdicts existants mais les met à jour)
+        self.rescan_all = rescan_all
+        self.cache_path = cache_path or cache_file
+        self.verification_cache = VerificationCache(self.cache_path, SERVER_CONFIG['cache_max_entries'])
+        
+        # Mode incrémental: les répertoires dont le mtime n'a pas changé ne sont pas relistés
+        self.incremental = incremental and not rescan_all
+        
+        # Santé des montages derrière les cibles (sondés une fois chacun)
+        self.mount_health = MountHealthChecker(self.verification_cache, SERVER_CONFIG['mount_probe_timeout'],
+                                               SERVER_CONFIG['mount_memory_days'])
+        
+        # Délai par vérification et coupe-circuit des préfixes qui ne répondent plus
+        self.check_timeout = check_timeout or SERVER_CONFIG['check_timeout']
+        self.circuit_breaker = CircuitBreaker(SERVER_CONFIG['circuit_breaker_threshold'],
+                                              SERVER_CONFIG['circuit_breaker_depth'])
+        self._active_targets: Dict[str, str] = {}  # lien en cours -> préfixe de sa cible
+        
+        # Résolution groupée par répertoire cible (phase 1)
+        self.target_index = TargetDirectoryIndex(SERVER_CONFIG['target_dir_listings'])
+        self._euid = os.geteuid()
+        self._groups = set(os.getgroups()) | {os.getegid()}
         self.user = SERVER_CONFIG['user']
         self.home_dir = SERVER_CONFIG['home_dir']
         self.settings_source = SERVER_CONFIG['settings_source']
@@ -74,9 +1705,15 @@ class AdvancedSymlinkChecker:
             'phase1_inaccessible': 0,
             'phase1_small': 0,
             'phase1_io_error': 0,
+            'phase1_mount_down': 0,
+            'phase1_timeout': 0,
+            'phase1_unreadable_dirs': 0,
             'phase2_analyzed': 0,
             'phase2_corrupted': 0,
+            'phase2_timeout': 0,
+            'phase2_tiers': {},
             'files_deleted': 0,
+            'cache_hits': self.verification_cache.hits,
             'server_info': {
                 'hostname': os.uname().nodename,
                 'architecture': os.uname().machine,
@@ -86,8 +1723,33 @@ class AdvancedSymlinkChecker:
         }
         self.deleted_files = []
         self.all_problems = []
-        
-        # Configuration des serveurs média adaptée au serveur
+        self.report: Optional[ReportWriter] = None  # Rapport NDJSON écrit au fil du scan
+        
+        # Point de reprise (--resume): répertoires terminés et verdicts déjà obtenus
+        self.checkpoint: Optional[ScanCheckpoint] = None
+        self.resume_meta: Optional[Dict] = None  # Paramètres du scan repris
+        self.interrupted = False
+        self._dir_pending: Dict[str, int] = {}
+        self._dir_lock = threading.Lock()
+        
+        # Index des liens par répertoire parcouru (un seul parcours par exécution)
+        self._symlink_index: Dict[str, List[str]] = {}
+        self.unreadable_dirs: Dict[str, str] = {}  # Répertoire illisible au dernier parcours -> erreur
+        
+        # Comptes du menu de sélection: âge des comptes mémorisés et rafraîchissement en arrière-plan
+        self.link_count_ages: Dict[str, float] = {}
+        self._count_refresh: Optional[threading.Thread] = None
+        self._count_refresh_stop = threading.Event()
+        
+        # Bibliothèques Sonarr/Radarr indexées à la première notification
+        self._arr_indexes: Dict[str, ArrLibraryIndex] = {}
+        self._arr_bulk: Dict[str, bool] = {}  # Service -> liste d'identifiants (seriesIds/movieIds) prise en compte
+        self._rate_limiters: Dict[str, RateLimiter] = {}
+        self.command_tracker = ArrCommandTracker()  # Commandes envoyées: état, latence, échecs
+        
+        # Configuration des serveurs média adaptée au serveur (chargée une fois, voir MediaConfigStore)
+        self.config_store = MediaConfigStore(os.path.join(self.home_dir, '.symguard_config.json'),
+                                             SERVER_CONFIG['config_check_interval'])
         self.media_config = self.load_media_config()
         self.session = self._create_session()
         
@@ -135,8 +1797,9 @@ class AdvancedSymlinkChecker:
         """Nettoie les anciens logs et rapports avec optimisation mémoire"""
         print("🧹 Nettoyage des anciens fichiers...")
         
-        # Rotation des rapports JSON (garder 3)
+        # Rotation des rapports JSON/NDJSON (garder 3)
         self.rotate_old_files("symlink_report_*.json", 3)
+        self.rotate_old_files("symlink_report_*.ndjson", 3)
         
         # Rotation des logs de suppression (garder 3)
         self.rotate_old_files("deleted_files_*.log", 3)
@@ -171,33 +1834,201 @@ class AdvancedSymlinkChecker:
                 print("\n❌ Opération annulée")
                 exit(0)
     
+    def _scan_directory(self, dir_path: str) -> Tuple[List[str], List[str]]:
+        """Liste un répertoire avec os.scandir: (liens symboliques, sous-répertoires)
+        
+        DirEntry.is_symlink() et is_dir(follow_symlinks=False) s'appuient sur le
+        type renvoyé par readdir, sans lstat supplémentaire par entrée. Les liens
+        vers des répertoires, que la phase 1 ne vérifie pas, sont écartés ici pour
+        que les comptes du menu correspondent aux liens vérifiés.
+        """
+        symlinks = []
+        subdirs = []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_symlink():
+                    if not self._is_directory_link(entry.path):
+                        symlinks.append(entry.path)
+                elif entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+        return symlinks, subdirs
+    
+    def _is_directory_link(self, path: str) -> bool:
+        """Lien vers un répertoire, vu comme par check_symlink_basic (listing groupé de la cible)
+        
+        Un lien illisible, cassé ou vers un montage indisponible n'est pas écarté:
+        la phase 1 lui donne un verdict.
+        """
+        try:
+            target = os.readlink(path)
+        except OSError:
+            return False
+        resolved = os.path.normpath(os.path.join(os.path.dirname(path), target))
+        if not self.mount_health.check(resolved)[0]:
+            return False
+        target_stat = self._stat_target(path, target)
+        return target_stat is not None and stat.S_ISDIR(target_stat.st_mode)
+    
+    def _list_directory(self, dir_path: str) -> Tuple[List[str], List[str]]:
+        """Liste un répertoire, ou reprend son contenu mémorisé si son mtime est inchangé (--incremental)
+        
+        Le mtime d'un répertoire ne change qu'avec ses entrées directes: chaque
+        sous-répertoire est donc tout de même stat() pour détecter les changements
+        en profondeur, mais aucun listing n'est fait pour les répertoires inchangés.
+        """
+        if not self.incremental:
+            return self._scan_directory(dir_path)
+        
+        # stat avant le listing: un changement pendant le listing sera vu au prochain passage
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+        known = self.verification_cache.get_directory(dir_path, mtime_ns)
+        if known is not None:
+            links, subdirs = known
+            return ([os.path.join(dir_path, name) for name in links],
+                    [os.path.join(dir_path, name) for name in subdirs])
+        
+        links, subdirs = self._scan_directory(dir_path)
+        # Les mtimes trop récents (granularité seconde sur certains FUSE) ne sont pas mémorisés
+        if time.time() - mtime_ns / 1e9 > 2:
+            self.verification_cache.put_directory(dir_path, mtime_ns,
+                                                  [os.path.basename(link) for link in links],
+                                                  [os.path.basename(subdir) for subdir in subdirs])
+        return links, subdirs
+    
+    def iter_symlinks(self, paths: List[str]) -> Iterator[Tuple[str, str, List[str]]]:
+        """Parcours parallèle des arborescences, diffusé au fil de l'eau
+        
+        Chaque répertoire est une tâche du pool (taille -j/--jobs) ; produit des
+        tuples (racine, répertoire, liens) dès qu'un répertoire a été listé.
+        """
+        roots = [os.path.abspath(path) for path in paths]
+        if not roots:
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(self._list_directory, root): (root, root) for root in roots}
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        root, dir_path = pending.pop(future)
+                        try:
+                            links, subdirs = future.result()
+                        except OSError as e:
+                            logger.warning(f"Erreur lecture {dir_path}: {e}")
+                            self.unreadable_dirs[dir_path] = str(e)
+                            continue
+                        self.unreadable_dirs.pop(dir_path, None)
+                        for subdir in subdirs:
+                            pending[executor.submit(self._list_directory, subdir)] = (root, subdir)
+                        yield root, dir_path, links
+            finally:
+                # Arrêt anticipé du consommateur: ne pas lister le reste de l'arborescence
+                for future in pending:
+                    future.cancel()
+    
+    def index_symlinks(self, paths: List[str]):
+        """Indexe en un seul parcours parallèle les racines pas encore parcourues"""
+        roots = [os.path.abspath(path) for path in paths]
+        missing = [root for root in dict.fromkeys(roots) if root not in self._symlink_index]
+        if not missing:
+            return
+        
+        collected = {root: [] for root in missing}
+        for root, _, links in self.iter_symlinks(missing):
+            collected[root].extend(links)
+        self._symlink_index.update(collected)
+    
+    def collect_symlinks(self, path: str) -> List[str]:
+        """Liens d'une arborescence, partagés par le comptage, l'estimation et la phase 1"""
+        self.index_symlinks([path])
+        return self._symlink_index[os.path.abspath(path)]
+    
     def list_directories_with_counts(self, base_path: str) -> Dict[str, int]:
-        """Liste les répertoires avec le nombre de liens symboliques"""
+        """Liste les répertoires avec le nombre de liens symboliques
+        
+        Les comptes mémorisés lors des scans précédents sont affichés tout de
+        suite et rafraîchis en arrière-plan ; seuls les répertoires jamais
+        comptés sont parcourus avant l'affichage. L'âge de chaque compte est
+        gardé dans link_count_ages.
+        """
         print(f"\n📊 Analyse des répertoires dans: {base_path}")
         directory_counts = {}
+        self.link_count_ages = {}
         
         if not os.path.exists(base_path):
             print(f"❌ Répertoire inexistant: {base_path}")
             return {}
         
-        for item in os.listdir(base_path):
-            item_path = os.path.join(base_path, item)
-            if os.path.isdir(item_path) and not item.startswith('.'):
-                link_count = 0
-                try:
-                    for root, dirs, files in os.walk(item_path):
-                        for name in files:
-                            full_path = os.path.join(root, name)
-                            if os.path.islink(full_path):
-                                link_count += 1
-                except Exception as e:
-                    logger.warning(f"Erreur dans {item}: {e}")
-                    link_count = -1
-                
-                directory_counts[item] = link_count
+        with os.scandir(base_path) as entries:
+            subdirs = {entry.name: os.path.abspath(entry.path) for entry in entries
+                       if not entry.name.startswith('.') and entry.is_dir()}
+        
+        known = {} if self.rescan_all else self.verification_cache.get_link_counts(list(subdirs.values()))
+        missing = [path for path in subdirs.values() if path not in known]
+        
+        # Un seul pool pour tous les répertoires de premier niveau jamais comptés
+        if missing:
+            self.index_symlinks(missing)
+        
+        now = time.time()
+        for name, path in subdirs.items():
+            if path in known:
+                directory_counts[name], updated = known[path]
+                self.link_count_ages[name] = now - updated
+                continue
+            try:
+                directory_counts[name] = len(self.collect_symlinks(path))
+            except Exception as e:
+                logger.warning(f"Erreur dans {name}: {e}")
+                directory_counts[name] = -1
+        
+        if missing:
+            self.verification_cache.put_link_counts(
+                {path: directory_counts[name] for name, path in subdirs.items()
+                 if path in missing and directory_counts[name] >= 0})
+        if known:
+            self.start_count_refresh([path for path in subdirs.values() if path in known])
         
         return directory_counts
     
+    def start_count_refresh(self, paths: List[str]):
+        """Recompte en arrière-plan les liens des répertoires affichés avec un compte mémorisé"""
+        self.stop_count_refresh()
+        self._count_refresh_stop = threading.Event()
+        self._count_refresh = threading.Thread(target=self._refresh_link_counts,
+                                               args=(paths, self._count_refresh_stop), daemon=True)
+        self._count_refresh.start()
+    
+    def stop_count_refresh(self):
+        """Abandonne le rafraîchissement en cours: le scan qui démarre recomptera lui-même"""
+        self._count_refresh_stop.set()
+    
+    def _refresh_link_counts(self, paths: List[str], stop: threading.Event):
+        counts = dict.fromkeys(paths, 0)
+        walk = self.iter_symlinks(paths)
+        try:
+            for root, _, links in walk:
+                if stop.is_set():
+                    return
+                counts[root] += len(links)
+        except Exception as e:
+            logger.warning(f"Rafraîchissement des comptes de liens interrompu: {e}")
+            return
+        finally:
+            walk.close()
+        self.verification_cache.put_link_counts(counts)
+        logger.info(f"Comptes de liens rafraîchis pour {len(counts)} répertoires")
+    
+    @staticmethod
+    def _format_age(seconds: float) -> str:
+        """Durée lisible: 45 min, 6 h, 3 j"""
+        if seconds < 3600:
+            return f"{max(1, int(seconds // 60))} min"
+        if seconds < 86400:
+            return f"{int(seconds // 3600)} h"
+        return f"{int(seconds // 86400)} j"
+    
     def interactive_directory_selection(self, base_path: str) -> List[str]:
         """Sélection interactive des répertoires à scanner"""
         directory_counts = self.list_directories_with_counts(base_path)
@@ -211,6 +2042,7 @@ class AdvancedSymlinkChecker:
         
         sorted_dirs = sorted(directory_counts.items(), key=lambda x: x[1], reverse=True)
         total_links = sum(count for count in directory_counts.values() if count > 0)
+        max_age = SERVER_CONFIG['link_counts_max_age']
         
         for i, (dirname, count) in enumerate(sorted_dirs, 1):
             if count == -1:
@@ -224,10 +2056,17 @@ class AdvancedSymlinkChecker:
             else:
                 status = f"🔴 {count:,} liens"
             
+            age = self.link_count_ages.get(dirname)
+            if age is not None and age > max_age:
+                status += f" ⏳ compté il y a {self._format_age(age)}"
+            
             print(f"{i:2d}. {dirname:<30} {status}")
         
         print("-" * 60)
         print(f"📈 Total: {total_links:,} liens symboliques")
+        if self.link_count_ages:
+            print(f"🕒 Comptes du dernier scan (⏳ = plus de {self._format_age(max_age)}), "
+                  f"rafraîchis en arrière-plan pour la prochaine fois")
         
         print(f"\n🎯 OPTIONS DE SÉLECTION:")
         print("  'all' ou 'a'     → Tout scanner")
@@ -246,100 +2085,138 @@ class AdvancedSymlinkChecker:
                     print("❌ Scan annulé")
                     return []
                 
-                if choice in ['all', 'a']:
-                    selected_dirs = [dirname for dirname, count in sorted_dirs if count > 0]
-                    break
-                
-                elif choice == 'big':
-                    selected_dirs = [dirname for dirname, count in sorted_dirs if count > 1000]
-                    break
-                
-                elif choice == 'small':
-                    selected_dirs = [dirname for dirname, count in sorted_dirs if 0 < count < 100]
-                    break
-                
-                elif choice == 'medium':
-                    selected_dirs = [dirname for dirname, count in sorted_dirs if 100 <= count <= 1000]
-                    break
-                
-                elif '-' in choice:
-                    start, end = map(int, choice.split('-'))
-                    selected_indices = list(range(start-1, min(end, len(sorted_dirs))))
-                    selected_dirs = [sorted_dirs[i][0] for i in selected_indices if sorted_dirs[i][1] > 0]
-                    break
-                
-                elif ',' in choice:
-                    indices = [int(x.strip()) - 1 for x in choice.split(',')]
-                    selected_dirs = []
-                    for idx in indices:
-                        if 0 <= idx < len(sorted_dirs) and sorted_dirs[idx][1] > 0:
-                            selected_dirs.append(sorted_dirs[idx][0])
-                    break
-                
-                elif choice.isdigit():
-                    idx = int(choice) - 1
-                    if 0 <= idx < len(sorted_dirs) and sorted_dirs[idx][1] > 0:
-                        selected_dirs = [sorted_dirs[idx][0]]
-                        break
-                    else:
-                        raise ValueError("Numéro invalide")
-                
-                else:
-                    raise ValueError("Format non reconnu")
+                selected_dirs = self._parse_selection(choice, sorted_dirs)
+                break
                     
             except (ValueError, IndexError):
                 print("❌ Choix invalide. Utilisez le format indiqué (ex: 1,3,5 ou 1-5 ou 'all')")
                 continue
         
+        return self._print_selection(base_path, selected_dirs, directory_counts)
+    
+    def _parse_selection(self, choice: str, sorted_dirs: List[Tuple[str, int]]) -> List[str]:
+        """Répertoires désignés par un choix de sélection (ValueError/IndexError si invalide)
+        
+        sorted_dirs: (nom, nombre de liens) par nombre de liens décroissant, comme le menu
+        """
+        if choice in ['all', 'a']:
+            return [dirname for dirname, count in sorted_dirs if count > 0]
+        
+        elif choice == 'big':
+            return [dirname for dirname, count in sorted_dirs if count > 1000]
+        
+        elif choice == 'small':
+            return [dirname for dirname, count in sorted_dirs if 0 < count < 100]
+        
+        elif choice == 'medium':
+            return [dirname for dirname, count in sorted_dirs if 100 <= count <= 1000]
+        
+        elif '-' in choice:
+            start, end = map(int, choice.split('-'))
+            selected_indices = list(range(start-1, min(end, len(sorted_dirs))))
+            return [sorted_dirs[i][0] for i in selected_indices if sorted_dirs[i][1] > 0]
+        
+        elif ',' in choice:
+            indices = [int(x.strip()) - 1 for x in choice.split(',')]
+            selected_dirs = []
+            for idx in indices:
+                if 0 <= idx < len(sorted_dirs) and sorted_dirs[idx][1] > 0:
+                    selected_dirs.append(sorted_dirs[idx][0])
+            return selected_dirs
+        
+        elif choice.isdigit():
+            idx = int(choice) - 1
+            if 0 <= idx < len(sorted_dirs) and sorted_dirs[idx][1] > 0:
+                return [sorted_dirs[idx][0]]
+            raise ValueError("Numéro invalide")
+        
+        raise ValueError("Format non reconnu")
+    
+    def _print_selection(self, base_path: str, selected_dirs: List[str],
+                         directory_counts: Optional[Dict[str, int]]) -> List[str]:
+        """Affiche la sélection et retourne les chemins complets (comptes inconnus: None)"""
         if not selected_dirs:
             print("❌ Aucun répertoire sélectionné")
             return []
         
         # Construire les chemins complets et afficher la sélection
-        base_path = f"{self.home_dir}/Medias"  # Adapté au serveur
         selected_paths = [os.path.join(base_path, dirname) for dirname in selected_dirs]
-        total_selected_links = sum(directory_counts[dirname] for dirname in selected_dirs)
         
         print(f"\n✅ Répertoires sélectionnés ({len(selected_dirs)}):")
         for dirname in selected_dirs:
-            count = directory_counts[dirname]
-            print(f"   📁 {dirname} ({count:,} liens)")
+            if directory_counts is None:
+                print(f"   📁 {dirname}")
+            else:
+                print(f"   📁 {dirname} ({directory_counts[dirname]:,} liens)")
         
-        print(f"\n📊 Total à scanner: {total_selected_links:,} liens symboliques")
+        if directory_counts is not None:
+            total_selected_links = sum(directory_counts[dirname] for dirname in selected_dirs)
+            print(f"\n📊 Total à scanner: {total_selected_links:,} liens symboliques")
         
         return selected_paths
     
+    def select_directories(self, base_path: str, selection: str) -> List[str]:
+        """Sélection non interactive (--select), même syntaxe que le menu
+        
+        'all' se contente des sous-répertoires de premier niveau, sans le comptage
+        des liens: seules les sélections par taille ou par numéro en ont besoin.
+        """
+        choice = selection.strip().lower()
+        if choice in ['all', 'a']:
+            try:
+                with os.scandir(base_path) as entries:
+                    selected_dirs = sorted(entry.name for entry in entries
+                                           if not entry.name.startswith('.') and entry.is_dir())
+            except OSError as e:
+                print(f"❌ Lecture impossible de {base_path}: {e}")
+                return []
+            if not selected_dirs:
+                return [base_path]
+            return self._print_selection(base_path, selected_dirs, None)
+        
+        directory_counts = self.list_directories_with_counts(base_path)
+        if not directory_counts:
+            return [base_path]
+        sorted_dirs = sorted(directory_counts.items(), key=lambda x: x[1], reverse=True)
+        try:
+            selected_dirs = self._parse_selection(choice, sorted_dirs)
+        except (ValueError, IndexError):
+            print(f"❌ Sélection invalide: {selection} (ex: big, all, 1,3,5 ou 1-5)")
+            return []
+        return self._print_selection(base_path, selected_dirs, directory_counts)
+    
+    def is_ffprobe_available(self) -> bool:
+        """ffprobe installé et exécutable"""
+        try:
+            subprocess.run(['ffprobe', '-version'], 
+                           stdout=subprocess.DEVNULL, 
+                           stderr=subprocess.DEVNULL, 
+                           check=True, timeout=5)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+            return False
+    
     def check_ffprobe_and_estimate(self, selected_paths: List[str]) -> Tuple[bool, int, str]:
         """Vérifie ffprobe et estime le nombre de fichiers médias"""
         # Vérification de ffprobe
-        try:
-            result = subprocess.run(['ffprobe', '-version'], 
-                                  stdout=subprocess.DEVNULL, 
-                                  stderr=subprocess.DEVNULL, 
-                                  check=True, timeout=5)
-            ffprobe_available = True
+        ffprobe_available = self.is_ffprobe_available()
+        if ffprobe_available:
             print("✅ ffprobe trouvé")
-        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
-            ffprobe_available = False
+        else:
             print("❌ ffprobe non trouvé")
             return False, 0, "unavailable"
         
-        # Estimation du nombre de fichiers médias
-        media_extensions = {'.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', 
-                          '.m4v', '.webm', '.mp3', '.flac', '.wav', '.aac'}
+        # Estimation du nombre de fichiers médias (réutilise le parcours en cache)
         media_count = 0
+        self.stop_count_refresh()
         
         print("📊 Estimation des fichiers médias...")
+        self.index_symlinks(selected_paths)
         for path in selected_paths:
-            for root, dirs, files in os.walk(path):
-                for name in files:
-                    full_path = os.path.join(root, name)
-                    if os.path.islink(full_path):
-                        if Path(name).suffix.lower() in media_extensions:
-                            media_count += 1
-        
-        # Estimation du temps (environ 1-2 secondes par fichier média)
-        estimated_minutes = max(1, media_count // 30)  # 30 fichiers par minute
+            media_count += sum(1 for link in self.collect_symlinks(path) if self.is_media_file(link))
+        
+        # Estimation du temps (environ 1-2 secondes par fichier média et par processus ffprobe)
+        estimated_minutes = max(1, media_count // (30 * self.ffprobe_workers))  # 30 fichiers par minute et par processus
         time_str = f"~{estimated_minutes} min" if estimated_minutes < 60 else f"~{estimated_minutes//60}h{estimated_minutes%60}m"
         
         print(f"📊 ~{media_count:,} fichiers médias estimés ({time_str})")
@@ -352,35 +2229,110 @@ class AdvancedSymlinkChecker:
         print(f"1) Basique seulement (30 sec)")
         
         if ffprobe_available:
-            print(f"2) Basique + ffprobe complet ({time_estimate})")
-            max_choice = 2
+            print(f"2) Basique + en-têtes + ffprobe si indécis ({time_estimate} au plus)")
         else:
             print("2) [INDISPONIBLE] ffprobe non installé")
-            max_choice = 1
+        print(f"3) Basique + en-têtes des conteneurs seulement (rapide, sans ffprobe)")
+        valid_choices = ['1', '2', '3'] if ffprobe_available else ['1', '3']
         
         while True:
             try:
-                choice = input(f"\n👉 Choix (1-{max_choice}): ").strip()
+                choice = input(f"\n👉 Choix ({'/'.join(valid_choices)}): ").strip()
                 if choice == '1':
                     return 'basic'
                 elif choice == '2' and ffprobe_available:
                     return 'full'
+                elif choice == '3':
+                    return 'fast'
                 else:
-                    print(f"❌ Choix invalide. Utilisez 1{' ou 2' if ffprobe_available else ''}")
+                    print(f"❌ Choix invalide. Utilisez {' ou '.join(valid_choices)}")
             except KeyboardInterrupt:
                 print("\n❌ Opération annulée")
                 exit(0)
     
+    def _stat_target(self, path: str, target: str) -> Optional[os.stat_result]:
+        """stat de la cible d'un lien, via le listing groupé de son répertoire
+        
+        Retourne None si la cible n'existe pas. Repli sur un stat individuel si
+        la cible est absente du listing (confirmation avant BROKEN), si son
+        répertoire n'a pas pu être listé ou si le chemin contient '..'.
+        """
+        # normpath n'est fiable qu'en l'absence de '..' (répertoires intermédiaires liés)
+        if '..' not in target.split(os.sep):
+            resolved = os.path.normpath(os.path.join(os.path.dirname(path), target))
+            entries = self.target_index.listing(os.path.dirname(resolved))
+            entry = entries.get(os.path.basename(resolved)) if entries else None
+            if entry is not None:
+                try:
+                    return entry.stat()
+                except OSError:
+                    return None
+        
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
+    
+    def _is_readable(self, path: str, st: os.stat_result, confirm: bool = False) -> bool:
+        """Droit de lecture d'après les bits de mode, confirmé par access() s'ils le refusent ou si confirm
+        
+        Les bits de mode ignorent les ACL POSIX, le root_squash NFS et les FUSE
+        en default_permissions: un refus est vérifié par access() (une ACL peut
+        accorder la lecture) ; sans confirm, l'ouverture qui suit confirme un accord.
+        """
+        if self._euid == 0:
+            allowed = True
+        elif st.st_uid == self._euid:
+            allowed = bool(st.st_mode & stat.S_IRUSR)
+        elif st.st_gid in self._groups:
+            allowed = bool(st.st_mode & stat.S_IRGRP)
+        else:
+            allowed = bool(st.st_mode & stat.S_IROTH)
+        if allowed and not confirm:
+            return True
+        return os.access(path, os.R_OK)
+    
     def check_symlink_basic(self, path: str) -> Optional[Dict]:
         """Phase 1: Vérification basique d'un lien symbolique"""
         try:
-            if not os.path.islink(path):
-                return None
-                
-            target = os.readlink(path)
+            # readlink échoue avec EINVAL si ce n'est pas un lien (évite un lstat dédié)
+            try:
+                target = os.readlink(path)
+            except OSError as e:
+                if e.errno in (errno.EINVAL, errno.ENOENT):
+                    return None
+                raise
+            
+            resolved = os.path.normpath(os.path.join(os.path.dirname(path), target))
+            
+            # Préfixe qui ne répond plus: ne plus lui envoyer de travail
+            prefix = self.circuit_breaker.prefix(resolved)
+            if self.circuit_breaker.is_open(prefix):
+                return {
+                    'path': path,
+                    'target': target,
+                    'status': 'TIMEOUT',
+                    'phase': 1,
+                    'size': 0,
+                    'error': f"coupe-circuit ouvert sur {prefix}"
+                }
+            self._active_targets[path] = prefix
+            
+            # Montage de la cible indisponible: ne rien conclure sur le lien
+            mount_ok, mount_point = self.mount_health.check(resolved)
+            if not mount_ok:
+                return {
+                    'path': path,
+                    'target': target,
+                    'status': 'MOUNT_DOWN',
+                    'phase': 1,
+                    'size': 0,
+                    'mount': mount_point
+                }
             
-            # Test d'existence
-            if not os.path.exists(path):
+            # Test d'existence et taille depuis le listing partagé du répertoire cible
+            target_stat = self._stat_target(path, target)
+            if target_stat is None:
                 return {
                     'path': path,
                     'target': target,
@@ -389,8 +2341,24 @@ class AdvancedSymlinkChecker:
                     'size': 0
                 }
             
-            # Test d'accès
-            if not os.access(path, os.R_OK):
+            # Les liens vers des répertoires ne sont pas vérifiés (comme os.walk auparavant)
+            if stat.S_ISDIR(target_stat.st_mode):
+                return None
+            
+            # Cible inchangée depuis une vérification réussie: pas de relecture, droit de lecture confirmé
+            cache_key = VerificationCache.key_from_stat(target_stat)
+            if (not self.rescan_all and self.verification_cache.get(cache_key, 'phase1') == 'OK'
+                    and self._is_readable(path, target_stat, confirm=True)):
+                return {
+                    'path': path,
+                    'target': target,
+                    'status': 'OK',
+                    'phase': 1,
+                    'size': target_stat.st_size
+                }
+            
+            # Test d'accès (bits de mode ou access() ; l'ouverture ci-dessous confirme)
+            if not self._is_readable(path, target_stat):
                 return {
                     'path': path,
                     'target': target,
@@ -401,7 +2369,7 @@ class AdvancedSymlinkChecker:
             
             # Test de taille et lecture
             try:
-                file_size = os.path.getsize(path)
+                file_size = target_stat.st_size
                 if file_size < 1024:  # < 1KB suspect
                     return {
                         'path': path,
@@ -415,6 +2383,14 @@ class AdvancedSymlinkChecker:
                 with open(path, 'rb') as f:
                     f.read(1024)  # Lecture test
                     
+            except PermissionError:
+                return {
+                    'path': path,
+                    'target': target,
+                    'status': 'INACCESSIBLE',
+                    'phase': 1,
+                    'size': 0
+                }
             except OSError as e:
                 return {
                     'path': path,
@@ -426,6 +2402,7 @@ class AdvancedSymlinkChecker:
                 }
             
             # Fichier OK pour la phase 1
+            self.verification_cache.put(cache_key, 'phase1', 'OK')
             return {
                 'path': path,
                 'target': target,
@@ -447,104 +2424,648 @@ class AdvancedSymlinkChecker:
     def check_ffprobe_validity(self, path: str) -> bool:
         """Phase 2: Vérification ffprobe d'un fichier média"""
         try:
-            result = subprocess.run([
-                "ffprobe", "-v", "error", "-show_entries", "stream=codec_type",
-                "-of", "csv=p=0", path
-            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=15)
-            
-            output = result.stdout.decode("utf-8").strip()
-            if not output:
-                return False
-            if "video" not in output and "audio" not in output:
-                return False
-            return True
+            result = subprocess.run(FFPROBE_COMMAND + [path], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    timeout=SERVER_CONFIG['ffprobe_file_timeout'])
+            return _ffprobe_output_valid(result.stdout.decode("utf-8").strip())
         except:
             return False
     
+    def check_ffprobe_batch(self, paths: List[str]) -> Dict[str, Optional[bool]]:
+        """Phase 2 groupée: un seul processus ffmpeg sonde plusieurs fichiers
+        
+        `ffmpeg -i a -i b ...` sans sortie ouvre chaque entrée dans l'ordre et décrit
+        ses flux, ce qui équivaut à ffprobe sans payer un fork/exec par fichier.
+        ffmpeg s'arrête sur la première entrée illisible: elle est déclarée invalide
+        et le lot reprend après elle. En cas de dépassement du délai (15 s par
+        fichier du lot), les entrées déjà décrites dans la sortie partielle gardent
+        leur verdict, l'entrée bloquée reste sans verdict (None, TIMEOUT) et le lot
+        reprend après elle.
+        """
+        results = {}
+        remaining = list(paths)
+        file_timeout = SERVER_CONFIG['ffprobe_file_timeout']
+        
+        while remaining:
+            if len(remaining) == 1 or not self.ffmpeg_path:
+                results.update((path, self.check_ffprobe_validity(path)) for path in remaining)
+                break
+            
+            command = [self.ffmpeg_path, "-hide_banner", "-nostdin"]
+            for path in remaining:
+                command += ["-i", "file:" + path]  # file: évite l'interprétation des ':' comme protocole
+            try:
+                result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                        timeout=file_timeout * len(remaining))
+            except subprocess.TimeoutExpired as e:
+                stderr, timed_out = e.stderr or b'', True
+            except OSError as e:
+                logger.warning(f"ffmpeg indisponible pour la vérification groupée: {e}")
+                self.ffmpeg_path = None
+                continue
+            else:
+                stderr, timed_out = result.stderr, False
+            
+            opened, media = _parse_ffmpeg_inputs(stderr.decode('utf-8', errors='replace'))
+            failed = next((index for index in range(len(remaining)) if index not in opened), None)
+            for index in range(len(remaining) if failed is None else failed):
+                results[remaining[index]] = index in media
+            if failed is None:
+                break
+            if timed_out:
+                logger.warning(f"ffmpeg bloqué sur {remaining[failed]} (lot de {len(remaining)} fichiers hors délai)")
+                results[remaining[failed]] = None
+            else:
+                results[remaining[failed]] = False
+            remaining = remaining[failed + 1:]
+        
+        return results
+    
+    def benchmark_ffprobe(self, base_path: str, sample_size: int = 200) -> Dict[str, float]:
+        """Compare un processus ffprobe par fichier et les lots ffmpeg sur un échantillon"""
+        print(f"\n⏱️ Banc d'essai ffprobe sur {base_path}")
+        sample = []
+        for link in self.collect_symlinks(base_path):
+            if self.is_media_file(link) and os.path.isfile(link):
+                sample.append(link)
+                if len(sample) >= sample_size:
+                    break
+        if not sample:
+            print("ℹ️ Aucun fichier média à mesurer")
+            return {}
+        
+        print(f"📊 Échantillon: {len(sample):,} fichiers, {self.ffprobe_workers} processus en parallèle")
+        with ThreadPoolExecutor(max_workers=self.ffprobe_workers) as executor:
+            start = time.time()
+            single = dict(zip(sample, executor.map(self.check_ffprobe_validity, sample)))
+            single_time = time.time() - start
+            
+            batches = [sample[i:i + self.ffprobe_batch] for i in range(0, len(sample), self.ffprobe_batch)]
+            start = time.time()
+            batched = {}
+            for batch_result in executor.map(self.check_ffprobe_batch, batches):
+                batched.update(batch_result)
+            batch_time = time.time() - start
+        
+        mismatches = [path for path in sample if single[path] != batched.get(path)]
+        print(f"🐢 Un processus par fichier: {single_time:.1f}s ({len(sample) / max(single_time, 0.001):.1f} fichiers/s)")
+        print(f"🚀 Lots de {self.ffprobe_batch} ({'ffmpeg' if self.ffmpeg_path else 'ffmpeg absent, ffprobe'}): "
+              f"{batch_time:.1f}s ({len(sample) / max(batch_time, 0.001):.1f} fichiers/s)")
+        if mismatches:
+            print(f"⚠️ {len(mismatches)} verdicts différents, par exemple: {mismatches[0]}")
+        else:
+            print("✅ Verdicts identiques")
+        return {'single': single_time, 'batched': batch_time, 'mismatches': len(mismatches)}
+    
+    def check_container_header(self, path: str) -> Tuple[Optional[bool], str]:
+        """Tier rapide avant ffprobe: validation native de la structure du conteneur
+        
+        Lit seulement le début et la fin du fichier (MKV/WebM, MP4/MOV, AVI/WAV,
+        FLAC, MP3). Retourne (True, format) si la structure est cohérente,
+        (False, raison) si le fichier est tronqué ou commence par des zéros, et
+        (None, raison) si le format n'est pas reconnu ou pas décidable. Une fin
+        remplie de zéros n'est pas une preuve (silence PCM, remplissage MP4/MKV) :
+        elle est seulement signalée quand la structure ne tranche pas.
+        """
+        probe_bytes = SERVER_CONFIG['header_probe_bytes']
+        try:
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                head = f.read(probe_bytes)
+                if size > probe_bytes:
+                    f.seek(max(probe_bytes, size - probe_bytes))
+                    tail = f.read(probe_bytes)
+                else:
+                    tail = head
+                
+                if head.count(0) == len(head):
+                    return False, "début du fichier rempli de zéros"
+                
+                if head[:4] == b'\x1a\x45\xdf\xa3':
+                    valid, detail = self._validate_matroska(head, size)
+                elif head[4:8] in MP4_TOP_LEVEL_BOXES:
+                    valid, detail = self._validate_mp4(f, size)
+                elif head[:4] == b'RIFF' and head[8:12] in (b'AVI ', b'WAVE'):
+                    return self._validate_riff(head, size)  # Silence PCM final: fin à zéro normale
+                elif head[:4] == b'fLaC':
+                    valid, detail = self._validate_flac(head)
+                elif head[:3] == b'ID3' or _mp3_frame_length(head, 0):
+                    valid, detail = self._validate_mp3(head, tail)
+                else:
+                    valid, detail = None, "format non reconnu"
+                
+                # Indice de copie incomplète, tranché par ffprobe
+                if valid is None and tail.count(0) == len(tail):
+                    return None, f"{detail}, fin du fichier remplie de zéros"
+                return valid, detail
+        except OSError as e:
+            return None, str(e)
+    
+    def _validate_matroska(self, head: bytes, size: int) -> Tuple[Optional[bool], str]:
+        """EBML: la taille déclarée du Segment doit tenir dans le fichier"""
+        header_size, length = _read_ebml_vint(head, 4)
+        if header_size is None or header_size < 0:
+            return None, "en-tête EBML illisible"
+        pos = 4 + length + header_size
+        if head[pos:pos + 4] != b'\x18\x53\x80\x67':
+            return None, "Segment Matroska hors de l'en-tête lu"
+        segment_size, length = _read_ebml_vint(head, pos + 4)
+        if segment_size is None:
+            return None, "taille du Segment illisible"
+        if segment_size < 0:
+            return None, "taille du Segment inconnue (flux)"
+        expected = pos + 4 + length + segment_size
+        if expected > size:
+            return False, f"Matroska tronqué ({size:,}/{expected:,} octets)"
+        return True, "Matroska"
+    
+    def _validate_mp4(self, f, size: int) -> Tuple[Optional[bool], str]:
+        """MP4/MOV: les boîtes de premier niveau doivent couvrir le fichier et contenir moov"""
+        offset = 0
+        seen = set()
+        for _ in range(64):
+            if offset == size:
+                break
+            if offset + 8 > size:
+                return False, "MP4 tronqué (en-tête de boîte incomplet)"
+            f.seek(offset)
+            header = f.read(16)
+            box_size = int.from_bytes(header[:4], 'big')
+            box_type = header[4:8]
+            if not box_type.isalnum() and box_type not in MP4_TOP_LEVEL_BOXES:
+                return None, f"boîte MP4 inattendue à l'offset {offset:,}"
+            if box_size == 1:
+                if len(header) < 16:
+                    return False, "MP4 tronqué (taille 64 bits incomplète)"
+                box_size = int.from_bytes(header[8:16], 'big')
+            elif box_size == 0:
+                box_size = size - offset  # Boîte jusqu'à la fin du fichier
+            if box_size < 8:
+                return None, f"taille de boîte MP4 invalide à l'offset {offset:,}"
+            if offset + box_size > size:
+                return False, f"MP4 tronqué (boîte {box_type.decode('latin-1')} incomplète)"
+            seen.add(box_type)
+            offset += box_size
+        else:
+            return None, "trop de boîtes MP4 de premier niveau"
+        
+        if b'moov' not in seen:
+            return False, "MP4 sans boîte moov"
+        return True, "MP4/MOV"
+    
+    def _validate_riff(self, head: bytes, size: int) -> Tuple[Optional[bool], str]:
+        """AVI/WAV: la taille RIFF déclarée doit tenir dans le fichier (AVI OpenDML: chunks AVIX après)"""
+        riff_size = int.from_bytes(head[4:8], 'little')
+        if riff_size in (0, 0xFFFFFFFF):
+            return None, "taille RIFF non renseignée"
+        if riff_size + 8 > size:
+            return False, f"RIFF tronqué ({size:,}/{riff_size + 8:,} octets)"
+        return True, "AVI" if head[8:12] == b'AVI ' else "WAV"
+    
+    def _validate_flac(self, head: bytes) -> Tuple[Optional[bool], str]:
+        """FLAC: STREAMINFO en premier bloc puis synchro de trame après les métadonnées"""
+        pos = 4
+        first = True
+        while True:
+            if pos + 4 > len(head):
+                return None, "métadonnées FLAC plus longues que l'en-tête lu"
+            block_type = head[pos] & 0x7F
+            last = head[pos] & 0x80
+            block_size = int.from_bytes(head[pos + 1:pos + 4], 'big')
+            if first and (block_type != 0 or block_size != 34):
+                return False, "bloc STREAMINFO FLAC absent"
+            first = False
+            pos += 4 + block_size
+            if last:
+                break
+        
+        if pos + 2 > len(head):
+            return None, "métadonnées FLAC plus longues que l'en-tête lu"
+        if head[pos] != 0xFF or head[pos + 1] & 0xFE != 0xF8:
+            return False, "synchro de trame FLAC absente"
+        return True, "FLAC"
+    
+    def _validate_mp3(self, head: bytes, tail: bytes) -> Tuple[Optional[bool], str]:
+        """MP3: deux trames consécutives valides après l'éventuel tag ID3v2, et fin de fichier audio"""
+        pos = 0
+        if head[:3] == b'ID3':
+            if len(head) < 10:
+                return None, "tag ID3 incomplet"
+            tag_size = ((head[6] & 0x7F) << 21) | ((head[7] & 0x7F) << 14) | ((head[8] & 0x7F) << 7) | (head[9] & 0x7F)
+            pos = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+            if pos + 4 > len(head):
+                return None, "tag ID3 plus long que l'en-tête lu"
+        
+        for start in range(pos, min(len(head) - 4, pos + 4096)):
+            frame_length = _mp3_frame_length(head, start)
+            if frame_length and (start + frame_length + 4 > len(head) or _mp3_frame_length(head, start + frame_length)):
+                break
+        else:
+            return None, "aucune trame MPEG audio au début du fichier"
+        
+        # Fin de fichier: tag ID3v1 ou trame audio
+        if tail[-128:-125] == b'TAG' or any(_mp3_frame_length(tail, i) for i in range(max(0, len(tail) - 4096), len(tail) - 4)):
+            return True, "MP3"
+        return None, "fin de fichier MP3 non reconnue"
+    
+    def _probe_media_file(self, path: str, use_ffprobe: bool = True,
+                          defer_ffprobe: bool = False) -> Tuple[Optional[bool], str, str]:
+        """Phase 2 d'un fichier: (valide, étape décisive, détail)
+        
+        Étapes: cache des verdicts, validation native des en-têtes, puis ffprobe
+        seulement pour les fichiers que la validation native ne sait pas trancher.
+        Avec defer_ffprobe, ces fichiers sont retournés avec valide=None pour
+        être sondés en lot par check_ffprobe_batch.
+        """
+        try:
+            cache_key = VerificationCache.key_from_stat(os.stat(path))
+        except OSError:
+            cache_key = None
+        
+        if cache_key and not self.rescan_all and self.verification_cache.get(cache_key, 'phase2') == 'VALID':
+            return True, 'cache', ''
+        
+        valid, detail = self.check_container_header(path)
+        tier = 'header'
+        if valid is None:
+            if not use_ffprobe:
+                return True, 'undecided', detail
+            if defer_ffprobe:
+                return None, 'ffprobe', detail
+            valid, tier, detail = self.check_ffprobe_validity(path), 'ffprobe', 'ffprobe'
+        
+        if cache_key and valid:
+            self.verification_cache.put(cache_key, 'phase2', 'VALID')
+        return valid, tier, detail
+    
     def is_media_file(self, path: str) -> bool:
         """Vérifie si le fichier est un média par extension"""
-        media_extensions = {'.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', 
-                          '.m4v', '.webm', '.mp3', '.flac', '.wav', '.aac'}
-        return Path(path).suffix.lower() in media_extensions
+        return os.path.splitext(path)[1].lower() in MEDIA_EXTENSIONS
+    
+    def _discover_symlinks(self, paths: List[str], link_queue: queue.Queue, stop_event: threading.Event,
+                           skip_dirs: frozenset = frozenset()):
+        """Producteur de la phase 1: alimente la file bornée pendant le parcours
+        
+        Un parcours allé jusqu'au bout mémorise le nombre de liens de chaque racine
+        et de ses sous-répertoires directs (comptes du menu de sélection).
+        """
+        self.stop_count_refresh()
+        counts: Dict[str, int] = {}
+        
+        def count(root: str, dir_path: str, links: int):
+            counts[root] = counts.get(root, 0) + links
+            if dir_path != root:
+                child = os.path.join(root, dir_path[len(root):].lstrip(os.sep).split(os.sep, 1)[0])
+                counts[child] = counts.get(child, 0) + links
+        
+        def put(item) -> bool:
+            # put() avec timeout pour ne pas rester bloqué si le consommateur s'arrête
+            while not stop_event.is_set():
+                try:
+                    link_queue.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def put_directory(dir_path: str, links: List[str]) -> bool:
+            if dir_path in skip_dirs:
+                return True  # Répertoire terminé avant l'interruption (--resume)
+            if self.checkpoint:
+                with self._dir_lock:
+                    self._dir_pending[dir_path] = self._dir_pending.get(dir_path, 0) + len(links)
+            for link in links:
+                if not put(link):
+                    return False
+            return True
+        
+        try:
+            roots = [os.path.abspath(path) for path in paths]
+            to_walk = []
+            for root in roots:
+                if root in self._symlink_index:
+                    for dir_path, links in itertools.groupby(self._symlink_index[root], key=os.path.dirname):
+                        links = list(links)
+                        count(root, dir_path, len(links))
+                        if not put_directory(dir_path, links):
+                            return
+                else:
+                    to_walk.append(root)
+            
+            for root, dir_path, links in self.iter_symlinks(to_walk):
+                count(root, dir_path, len(links))
+                if not put_directory(dir_path, links):
+                    return
+            self.verification_cache.put_link_counts(counts)
+            # Lu par le consommateur après la fin de la découverte (None dans la file)
+            self.stats['phase1_unreadable_dirs'] = sum(
+                1 for dir_path in list(self.unreadable_dirs)
+                if any(dir_path == root or dir_path.startswith(root + os.sep) for root in roots))
+        except Exception as e:
+            logger.error(f"Erreur lors de la découverte des liens: {e}")
+        finally:
+            put(None)  # Fin de la découverte
     
-    def phase1_scan(self, paths: List[str]) -> Tuple[List[Dict], List[Dict]]:
-        """Phase 1: Scan basique de tous les liens"""
+    def _new_controller(self, phase: str) -> ConcurrencyController:
+        """Contrôleur de concurrence d'une phase (phase 2: processus ffprobe, plafond = nombre de cœurs)"""
+        if phase == 'phase 1':
+            initial, minimum, maximum, floor = (self.max_workers, SERVER_CONFIG['min_workers'],
+                                                self.max_workers_ceiling, 0.01)
+        else:
+            initial, minimum, maximum, floor = (self.ffprobe_workers, 1,
+                                                max(self.ffprobe_workers, os.cpu_count() or 1), 0.5)
+        if not self.adaptive:
+            minimum = maximum = initial
+        controller = ConcurrencyController(phase, initial, minimum, maximum, floor, enabled=self.adaptive)
+        self.controllers[phase] = controller
+        return controller
+    
+    def _cache_phase2_valid(self, path: str):
+        """Enregistre un verdict ffprobe groupé dans le cache des verdicts"""
+        try:
+            self.verification_cache.put(VerificationCache.key_from_stat(os.stat(path)), 'phase2', 'VALID')
+        except OSError:
+            pass
+    
+    def _record_phase1_result(self, result: Optional[Dict], ok_files: ResultStore, problem_files: ResultStore,
+                              restored: bool = False) -> bool:
+        """Comptabilise un résultat de phase 1, retourne True si un lien a été analysé
+        
+        restored: résultat relu depuis le point de reprise (ni réenregistré ni réaffiché)
+        """
+        if not result:
+            return False
+        
+        self.stats['total_analyzed'] += 1
+        if self.checkpoint and not restored:
+            self.checkpoint.add_result(result)
+        
+        if result['status'] == 'OK':
+            ok_files.append(result)
+            self.stats['phase1_ok'] += 1
+        else:
+            problem_files.append(result)
+            if self.report:
+                self.report.problem(result)
+            if result['status'] == 'BROKEN':
+                self.stats['phase1_broken'] += 1
+            elif result['status'] == 'INACCESSIBLE':
+                self.stats['phase1_inaccessible'] += 1
+            elif result['status'] == 'SMALL_FILE':
+                self.stats['phase1_small'] += 1
+            elif result['status'] == 'IO_ERROR':
+                self.stats['phase1_io_error'] += 1
+            elif result['status'] == 'TIMEOUT':
+                self.stats['phase1_timeout'] += 1
+            elif result['status'] == 'MOUNT_DOWN':
+                self.stats['phase1_mount_down'] += 1
+                return True  # Signalé une fois par montage, pas lien par lien
+            
+            if not restored:
+                print(f"[{result['status']}] {os.path.basename(result['path'])}")
+        
+        return True
+    
+    def _link_done(self, link: str):
+        """Un lien traité: son répertoire est terminé pour le point de reprise quand c'est le dernier"""
+        if not self.checkpoint:
+            return
+        dir_path = os.path.dirname(link)
+        with self._dir_lock:
+            remaining = self._dir_pending.get(dir_path, 0) - 1
+            if remaining > 0:
+                self._dir_pending[dir_path] = remaining
+                return
+            self._dir_pending.pop(dir_path, None)
+        self.checkpoint.dir_done(dir_path)
+        self.checkpoint.maybe_flush()
+    
+    def _restore_phase1(self, ok_files: ResultStore, problem_files: ResultStore) -> Tuple[frozenset, bool]:
+        """Reprise: recharge les résultats déjà obtenus, retourne (répertoires terminés, phase 1 complète)"""
+        if not (self.checkpoint and self.resume_meta):
+            return frozenset(), False
+        
+        complete = self.resume_meta.get('phase') == 'phase2'
+        done_dirs = frozenset(self.checkpoint.done_dirs())
+        suspects = []
+        for result in self.checkpoint.iter_results(None if complete else done_dirs):
+            if result['status'] == 'OK' or result['status'] in PROTECTED_STATUSES:
+                self._record_phase1_result(result, ok_files, problem_files, restored=True)
+            else:
+                suspects.append(result['path'])
+        print(f"♻️ Reprise: {self.stats['total_analyzed']:,} liens déjà vérifiés"
+              + (" (phase 1 terminée)" if complete else f" dans {len(done_dirs):,} répertoires"))
+        
+        # Verdicts supprimables revérifiés: le lien ou sa cible ont pu changer depuis l'interruption
+        if suspects:
+            print(f"🔁 Revérification des {len(suspects):,} problèmes enregistrés avant suppression")
+            for result in self.check_links_with_deadline(suspects):
+                self._record_phase1_result(result, ok_files, problem_files)
+        return done_dirs, complete
+    
+    def check_links_with_deadline(self, links: List[str]) -> Iterator[Dict]:
+        """Phase 1 d'une liste de liens hors scan complet (délai par vérification, TIMEOUT au-delà)"""
+        with DeadlineExecutor(max(1, min(len(links), self.max_workers)), self.check_timeout) as executor:
+            futures = {executor.submit(self.check_symlink_basic, link): link for link in links}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                executor.expire()
+                for future in done:
+                    link = futures[future]
+                    prefix = self._active_targets.pop(link, None)
+                    try:
+                        result = future.result()
+                    except CheckTimeout as e:
+                        result = self._timeout_result(link, prefix, str(e))
+                    except Exception as e:
+                        logger.error(f"Erreur lors du traitement de {link}: {e}")
+                        continue
+                    yield result
+    
+    def probe_media_with_deadline(self, ok_files: ResultStore, indices: List[int],
+                                  use_ffprobe: bool) -> Iterator[Tuple[int, Optional[bool], str, str]]:
+        """Phase 2 d'une liste de fichiers hors scan complet: (indice, valide, étape, détail)
+        
+        Délai par fichier: check_timeout pour la lecture des en-têtes, plus
+        ffprobe_file_timeout avec ffprobe. Une lecture bloquée sur un montage
+        figé donne valide=None (TIMEOUT) au lieu de bloquer l'appelant.
+        """
+        timeout = self.check_timeout + (SERVER_CONFIG['ffprobe_file_timeout'] if use_ffprobe else 0)
+        with DeadlineExecutor(max(1, min(len(indices), self.ffprobe_workers)), timeout) as executor:
+            futures = {executor.submit(self._probe_media_file, ok_files.path(index), use_ffprobe): index
+                       for index in indices}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                executor.expire()
+                for future in done:
+                    index = futures[future]
+                    try:
+                        valid, tier, detail = future.result()
+                    except CheckTimeout:
+                        valid, tier, detail = None, 'ffprobe' if use_ffprobe else 'header', 'lecture'
+                    except Exception as e:
+                        logger.error(f"Erreur phase 2 sur {ok_files.path(index)}: {e}")
+                        continue
+                    yield index, valid, tier, detail
+    
+    def _timeout_result(self, link: str, prefix: Optional[str], error: str) -> Dict:
+        """Résultat TIMEOUT d'une vérification abandonnée ; alimente le coupe-circuit"""
+        if prefix and self.circuit_breaker.record_timeout(prefix):
+            print(f"⛔ Coupe-circuit ouvert sur {prefix}: liens suivants ignorés")
+            logger.error(f"Coupe-circuit ouvert sur {prefix} après "
+                         f"{self.circuit_breaker.threshold} dépassements de délai")
+        return {
+            'path': link,
+            'target': '',
+            'status': 'TIMEOUT',
+            'phase': 1,
+            'size': 0,
+            'error': error
+        }
+    
+    def phase1_scan(self, paths: List[str]) -> Tuple[ResultStore, ResultStore]:
+        """Phase 1: Scan basique de tous les liens
+        
+        Pipeline producteur/consommateur: la découverte alimente une file bornée
+        que les workers consomment pendant le parcours, avec un nombre limité de
+        vérifications en vol pour garder une mémoire constante.
+        """
         print(f"\n🔍 PHASE 1 - SCAN BASIQUE")
         print("="*50)
         
-        all_symlinks = []
         for path in paths:
             print(f"📂 Collecte des liens dans: {os.path.basename(path)}")
-            for root, dirs, files in os.walk(path):
-                for name in files:
-                    full_path = os.path.join(root, name)
-                    if os.path.islink(full_path):
-                        all_symlinks.append(full_path)
         
-        print(f"📊 {len(all_symlinks):,} liens symboliques trouvés")
+        ok_files = ResultStore()
+        problem_files = ResultStore()
+        
+        # Reprise: résultats des répertoires terminés avant l'interruption
+        done_dirs, phase1_complete = self._restore_phase1(ok_files, problem_files)
+        if phase1_complete:
+            self._print_phase1_summary(len(ok_files) + len(problem_files), ok_files, problem_files, 0)
+            return ok_files, problem_files
         
-        if not all_symlinks:
-            return [], []
+        # Table des montages relue à chaque scan (sondage paresseux par montage)
+        self.mount_health.refresh()
         
-        # Traitement parallèle
-        ok_files = []
-        problem_files = []
+        link_queue = queue.Queue(maxsize=SERVER_CONFIG['discovery_queue_size'])
+        stop_event = threading.Event()
+        producer = threading.Thread(target=self._discover_symlinks, name='symguard-discovery',
+                                    args=(paths, link_queue, stop_event, done_dirs), daemon=True)
+        # Threads créés jusqu'au plafond ; le contrôleur fixe combien travaillent simultanément
+        controller = self._new_controller('phase 1')
+        
+        discovered = completed = self.stats['total_analyzed']
+        discovery_done = False
+        in_flight = {}
         
         print("⚡ Vérification en cours...")
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_symlink = {executor.submit(self.check_symlink_basic, link): link for link in all_symlinks}
-            
-            completed = 0
-            for future in as_completed(future_to_symlink):
-                try:
-                    result = future.result()
-                    if result:
-                        self.stats['total_analyzed'] += 1
-                        completed += 1
-                        
-                        if result['status'] == 'OK':
-                            ok_files.append(result)
-                            self.stats['phase1_ok'] += 1
-                        else:
-                            problem_files.append(result)
-                            if result['status'] == 'BROKEN':
-                                self.stats['phase1_broken'] += 1
-                            elif result['status'] == 'INACCESSIBLE':
-                                self.stats['phase1_inaccessible'] += 1
-                            elif result['status'] == 'SMALL_FILE':
-                                self.stats['phase1_small'] += 1
-                            elif result['status'] == 'IO_ERROR':
-                                self.stats['phase1_io_error'] += 1
-                            
-                            print(f"[{result['status']}] {os.path.basename(result['path'])}")
+        producer.start()
+        # Délai par vérification: un worker bloqué est abandonné et remplacé
+        with DeadlineExecutor(controller.maximum, self.check_timeout) as executor:
+            executor.set_limit(controller.limit)
+            try:
+                while not discovery_done or in_flight:
+                    # Soumettre tant que la limite de vérifications en vol n'est pas atteinte
+                    while not discovery_done and len(in_flight) < controller.limit * SERVER_CONFIG['in_flight_per_worker']:
+                        try:
+                            link = link_queue.get(block=not in_flight)
+                        except queue.Empty:
+                            break
+                        if link is None:
+                            discovery_done = True
+                            break
+                        in_flight[executor.submit(controller.timed, self.check_symlink_basic, link)] = link
+                        discovered += 1
+                    
+                    if not in_flight:
+                        continue
+                    
+                    done, _ = wait(in_flight, timeout=0.5 if discovery_done else 0.05,
+                                   return_when=FIRST_COMPLETED)
+                    executor.expire()
+                    executor.set_limit(controller.adjust())
+                    for future in done:
+                        link = in_flight.pop(future)
+                        prefix = self._active_targets.pop(link, None)
+                        try:
+                            result = future.result()
+                        except CheckTimeout as e:
+                            controller.record(self.check_timeout)
+                            result = self._timeout_result(link, prefix, str(e))
+                        except Exception as e:
+                            logger.error(f"Erreur lors du traitement: {e}")
+                            self._link_done(link)
+                            continue
                         
-                        # Progression
-                        if completed % 1000 == 0:
-                            print(f"📈 Progression: {completed:,}/{len(all_symlinks):,}")
-                            
-                except Exception as e:
-                    logger.error(f"Erreur lors du traitement: {e}")
+                        if self._record_phase1_result(result, ok_files, problem_files):
+                            completed += 1
+                            # Progression
+                            if completed % 1000 == 0:
+                                print(f"📈 Progression: {completed:,} vérifiés / {discovered:,} découverts")
+                        self._link_done(link)
+            finally:
+                stop_event.set()
+                for future in in_flight:
+                    future.cancel()
+        
+        if self.checkpoint:
+            self.checkpoint.set_meta('phase', 'phase2')
+        self._print_phase1_summary(discovered, ok_files, problem_files, executor.replaced)
+        if not discovered:
+            return ResultStore(), ResultStore()
+        return ok_files, problem_files
+    
+    def _print_phase1_summary(self, discovered: int, ok_files: ResultStore, problem_files: ResultStore,
+                              replaced_workers: int):
+        """Résumé de la phase 1, commun aux moteurs threads et asyncio"""
+        if replaced_workers:
+            print(f"⏱️ {replaced_workers:,} workers bloqués remplacés (délai {self.check_timeout}s)")
+        if self.adaptive and 'phase 1' in self.controllers:
+            print(f"🎛️ Concurrence adaptative: {self.controllers['phase 1'].summary()}")
+        self.verification_cache.flush()
+        print(f"📊 {discovered:,} liens symboliques trouvés")
+        if self.stats['phase1_unreadable_dirs']:
+            print(f"🚫 Répertoires illisibles (liens non vérifiés): {self.stats['phase1_unreadable_dirs']:,}"
+                  f" - voir {log_file}")
+        if self.incremental:
+            print(f"♻️ Répertoires inchangés non relistés: {self.verification_cache.hits['directories']:,}")
+        
+        if not discovered:
+            return
         
         # Résumé Phase 1
         print(f"\n📊 RÉSULTATS PHASE 1:")
         print(f"✅ OK: {len(ok_files):,}")
         print(f"💔 Problèmes: {len(problem_files):,}")
-        if problem_files:
-            status_count = {}
-            for pf in problem_files:
-                status_count[pf['status']] = status_count.get(pf['status'], 0) + 1
-            for status, count in status_count.items():
-                print(f"   {status}: {count:,}")
-        
-        return ok_files, problem_files
+        for status, count in problem_files.status_counts().items():
+            print(f"   {status}: {count:,}")
+        
+        down_mounts = self.mount_health.down_mounts()
+        if down_mounts:
+            print(f"🔌 Montages indisponibles (liens conservés):")
+            for mount_point, reason in down_mounts.items():
+                print(f"   {mount_point}: {reason}")
     
-    def phase2_scan(self, ok_files: List[Dict]) -> List[Dict]:
-        """Phase 2: Scan ffprobe des fichiers médias OK"""
-        print(f"\n🔍 PHASE 2 - VÉRIFICATION FFPROBE")
+    def phase2_scan(self, ok_files: ResultStore, use_ffprobe: bool = True) -> List[Dict]:
+        """Phase 2: Scan ffprobe des fichiers médias OK
+        
+        Une validation native des en-têtes de conteneur tranche la plupart des
+        fichiers ; seuls les indécis passent par ffprobe (sauf use_ffprobe=False).
+        Les processus ffprobe tournent en parallèle (--ffprobe-jobs, indépendant de -j) ;
+        les résultats sont traités dans l'ordre d'achèvement et conservés en cas de Ctrl-C.
+        Les fichiers sont désignés par leur indice dans ok_files ; seuls les corrompus
+        sont reconstruits en enregistrements complets.
+        """
+        print(f"\n🔍 PHASE 2 - VÉRIFICATION {'FFPROBE' if use_ffprobe else 'DES EN-TÊTES'}")
         print("="*50)
         
+        if not isinstance(ok_files, ResultStore):
+            ok_files = ResultStore.from_records(ok_files)
+        
         # Filtrer les fichiers médias
-        media_files = [f for f in ok_files if self.is_media_file(f['path'])]
+        media_files = array('I', (index for index in range(len(ok_files)) if self.is_media_file(ok_files.path(index))))
         print(f"📊 {len(media_files):,} fichiers médias à vérifier")
         
         if not media_files:
@@ -552,39 +3073,178 @@ class AdvancedSymlinkChecker:
             return []
         
         corrupted_files = []
+        total = len(media_files)
+        media_files = self._restore_phase2(ok_files, media_files)
         
-        print("🔧 Vérification ffprobe en cours...")
-        completed = 0
+        print(f"🔧 Vérification en cours ({self.ffprobe_workers} workers en parallèle)...")
+        batching = use_ffprobe and self.ffprobe_batch > 1 and self.ffmpeg_path is not None
+        if batching:
+            print(f"📦 ffprobe groupé: lots de {self.ffprobe_batch} fichiers par processus ffmpeg")
         
-        for media_file in media_files:
-            try:
-                if not self.check_ffprobe_validity(media_file['path']):
-                    corrupted_file = media_file.copy()
-                    corrupted_file['status'] = 'CORRUPTED'
-                    corrupted_file['phase'] = 2
-                    corrupted_files.append(corrupted_file)
-                    print(f"[CORRUPTED] {os.path.basename(media_file['path'])}")
+        pending_files = iter(media_files)
+        in_flight = {}  # future -> indice du fichier (en-têtes) ou liste d'indices (lot ffmpeg)
+        ffprobe_pending = []
+        controller = self._new_controller('phase 2')
+        executor = ThreadPoolExecutor(max_workers=controller.maximum)
+        
+        files_exhausted = False
+        try:
+            while True:
+                for index in pending_files:
+                    in_flight[executor.submit(controller.timed, self._probe_media_file, ok_files.path(index),
+                                              use_ffprobe, batching)] = index
+                    if len(in_flight) >= controller.limit:
+                        break
+                else:
+                    files_exhausted = True
                 
-                self.stats['phase2_analyzed'] += 1
-                completed += 1
+                # Un lot part quand il est plein, ou à la fin quand plus aucun en-tête n'est en cours
+                last_batches = files_exhausted and not any(isinstance(item, int) for item in in_flight.values())
+                while ffprobe_pending and (len(ffprobe_pending) >= self.ffprobe_batch or last_batches):
+                    batch, ffprobe_pending = ffprobe_pending[:self.ffprobe_batch], ffprobe_pending[self.ffprobe_batch:]
+                    in_flight[executor.submit(self.check_ffprobe_batch, [ok_files.path(index) for index in batch])] = batch
                 
-                # Progression
-                if completed % 100 == 0:
-                    print(f"📈 Progression: {completed:,}/{len(media_files):,}")
-                    
-            except KeyboardInterrupt:
-                print(f"\n⚠️ Interruption utilisateur après {completed}/{len(media_files)} fichiers")
-                break
-            except Exception as e:
-                logger.error(f"Erreur ffprobe sur {media_file['path']}: {e}")
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, timeout=SERVER_CONFIG['adjust_interval'], return_when=FIRST_COMPLETED)
+                controller.adjust()
+                for future in done:
+                    item = in_flight.pop(future)
+                    try:
+                        if isinstance(item, list):
+                            verdicts = future.result()
+                            for index in item:
+                                path = ok_files.path(index)
+                                valid = verdicts.get(path, False)  # None: ffmpeg bloqué, TIMEOUT
+                                if valid:
+                                    self._cache_phase2_valid(path)
+                                self._record_phase2_result(ok_files, index, valid, 'ffprobe', 'ffprobe',
+                                                           corrupted_files, total)
+                            continue
+                        
+                        valid, tier, detail = future.result()
+                        if valid is None:
+                            ffprobe_pending.append(item)
+                        else:
+                            self._record_phase2_result(ok_files, item, valid, tier, detail,
+                                                       corrupted_files, total)
+                            
+                    except Exception as e:
+                        paths = [ok_files.path(index) for index in (item if isinstance(item, list) else [item])]
+                        logger.error(f"Erreur ffprobe sur {', '.join(paths)}: {e}")
+                        
+        except KeyboardInterrupt:
+            self.interrupted = True
+            print(f"\n⚠️ Interruption utilisateur après {self.stats['phase2_analyzed']}/{total} fichiers")
+        finally:
+            # Les ffprobe en cours reçoivent aussi le SIGINT ; on annule ce qui n'a pas démarré
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+            self.verification_cache.flush()
+        
+        self._print_phase2_summary(corrupted_files, total)
+        return corrupted_files
+    
+    def _restore_phase2(self, ok_files: ResultStore, media_files: array) -> array:
+        """Reprise: reprend les verdicts valides de phase 2 enregistrés, retourne les fichiers restant à vérifier"""
+        if not (self.checkpoint and self.resume_meta):
+            return media_files
+        verdicts = self.checkpoint.phase2_verdicts()
+        if not verdicts:
+            return media_files
+        
+        remaining = array('I')
+        tiers = self.stats['phase2_tiers']
+        for index in media_files:
+            path = ok_files.path(index)
+            if path not in verdicts:
+                remaining.append(index)
+                continue
+            if verdicts[path]:
+                remaining.append(index)  # Fichier corrompu: sondé de nouveau avant toute suppression
+                continue
+            tiers['resumed'] = tiers.get('resumed', 0) + 1
+            self.stats['phase2_analyzed'] += 1
         
-        self.stats['phase2_corrupted'] = len(corrupted_files)
+        print(f"♻️ Reprise: {len(media_files) - len(remaining):,} fichiers déjà vérifiés en phase 2"
+              " (fichiers corrompus revérifiés)")
+        return remaining
+    
+    def validate_resume(self, mode: str) -> bool:
+        """Refuse un point de reprise trop ancien ou enregistré en dry-run quand on reprend en mode réel"""
+        meta = self.resume_meta or {}
+        saved = meta.get('updated') or meta.get('started')
+        try:
+            age = (datetime.now() - datetime.fromisoformat(saved)).total_seconds()
+        except (TypeError, ValueError):
+            age = None
+        max_age = SERVER_CONFIG['checkpoint_max_age']
+        if age is None or age > max_age:
+            print(f"❌ Point de reprise trop ancien ou non daté ({saved or '?'}, limite {max_age // 3600:.0f}h): "
+                  f"relancez un scan sans --resume")
+            return False
         
-        print(f"\n📊 RÉSULTATS PHASE 2:")
-        print(f"🔧 Analysés: {completed:,}/{len(media_files):,}")
-        print(f"🔨 Corrompus: {len(corrupted_files):,}")
+        saved_mode = meta.get('mode')
+        if saved_mode and saved_mode != mode:
+            if mode == 'real':
+                print(f"❌ Le scan repris était en mode {saved_mode}: reprenez-le avec --dry-run "
+                      f"ou relancez un scan sans --resume")
+                return False
+            print(f"⚠️ Scan enregistré en mode {saved_mode}, repris en mode {mode}")
+        return True
+    
+    def _record_phase2_result(self, ok_files: ResultStore, index: int, valid: Optional[bool], tier: str,
+                              detail: str, corrupted_files: List[Dict], total: Optional[int] = None):
+        """Comptabilise un verdict de phase 2 (total None: nombre de fichiers inconnu d'avance)
         
-        return corrupted_files
+        valid=None: sonde hors délai, le fichier rejoint les problèmes de phase 2
+        en TIMEOUT (jamais supprimé) et n'est pas enregistré au point de reprise.
+        """
+        tiers = self.stats['phase2_tiers']
+        tiers[tier] = tiers.get(tier, 0) + 1
+        if not valid:
+            corrupted_file = ok_files[index]
+            corrupted_file['status'] = 'CORRUPTED' if valid is False else 'TIMEOUT'
+            corrupted_file['phase'] = 2
+            corrupted_file['error'] = detail if valid is False else f"{detail} hors délai"
+            corrupted_files.append(corrupted_file)
+            if self.report:
+                self.report.problem(corrupted_file)
+            print(f"[{corrupted_file['status']}] {os.path.basename(corrupted_file['path'])} ({corrupted_file['error']})")
+            if valid is None:
+                self.stats['phase2_timeout'] += 1
+        
+        if self.checkpoint and valid is not None:
+            self.checkpoint.add_phase2(ok_files.path(index), None if valid else corrupted_file)
+            self.checkpoint.maybe_flush()
+        
+        self.stats['phase2_analyzed'] += 1
+        
+        # Progression
+        completed = self.stats['phase2_analyzed']
+        if completed % 100 == 0:
+            print(f"📈 Progression: {completed:,}/{total:,}" if total else f"📈 Progression: {completed:,} fichiers")
+    
+    def _print_phase2_summary(self, corrupted_files: List[Dict], total: int):
+        """Résumé de la phase 2, commun aux moteurs threads et asyncio"""
+        tiers = self.stats['phase2_tiers']
+        self.stats['phase2_corrupted'] = sum(1 for problem in corrupted_files if problem['status'] == 'CORRUPTED')
+        if self.adaptive and 'phase 2' in self.controllers:
+            print(f"🎛️ Concurrence adaptative: {self.controllers['phase 2'].summary()}")
+        
+        print(f"\n📊 RÉSULTATS PHASE 2:")
+        print(f"🔧 Analysés: {self.stats['phase2_analyzed']:,}/{total:,}")
+        print(f"🔨 Corrompus: {self.stats['phase2_corrupted']:,}")
+        if self.stats['phase2_timeout']:
+            print(f"⏱️ Sondes hors délai (non supprimés): {self.stats['phase2_timeout']:,}")
+        if tiers.get('cache'):
+            print(f"♻️ Déjà validés (cache): {tiers['cache']:,}")
+        if tiers.get('resumed'):
+            print(f"♻️ Repris du point de reprise: {tiers['resumed']:,}")
+        print(f"📦 Tranchés par les en-têtes: {tiers.get('header', 0):,} | ffprobe: {tiers.get('ffprobe', 0):,}"
+              + (f" | indécis (non vérifiés): {tiers['undecided']:,}" if tiers.get('undecided') else ""))
     
     def confirm_deletion(self, all_problems: List[Dict]) -> Tuple[bool, str]:
         """Confirmation globale avant suppression avec choix du mode de scan"""
@@ -606,7 +3266,9 @@ class AdvancedSymlinkChecker:
                 'INACCESSIBLE': 'fichiers inaccessibles', 
                 'SMALL_FILE': 'fichiers trop petits',
                 'IO_ERROR': 'erreurs I/O',
-                'CORRUPTED': 'fichiers corrompus (ffprobe)'
+                'CORRUPTED': 'fichiers corrompus (ffprobe)',
+                'MOUNT_DOWN': 'liens vers un montage indisponible',
+                'TIMEOUT': 'vérifications hors délai'
             }
             print(f"- {count:,} {status_names.get(status, status.lower())}")
         
@@ -624,11 +3286,12 @@ class AdvancedSymlinkChecker:
         print(f"\n🔄 MODE DE SCAN DES SERVEURS MÉDIA:")
         print("1) Scan en masse (rapide) - Lance un scan global")
         print("2) Scan individuel (lent) - Notifie chaque fichier supprimé")
-        print("3) Pas de scan - Ignorer les serveurs média")
+        print("3) Scan ciblé - Rescan des seules séries/films touchés, par lots")
+        print("4) Pas de scan - Ignorer les serveurs média")
         
         while True:
             try:
-                choice = input(f"\n👉 Votre choix (1-3): ").strip()
+                choice = input(f"\n👉 Votre choix (1-4): ").strip()
                 if choice == '1':
                     print("✅ Mode scan en masse sélectionné")
                     return True, 'mass'
@@ -636,25 +3299,61 @@ class AdvancedSymlinkChecker:
                     print("✅ Mode scan individuel sélectionné (plus lent)")
                     return True, 'individual'
                 elif choice == '3':
+                    print("✅ Mode scan ciblé sélectionné")
+                    return True, 'scoped'
+                elif choice == '4':
                     print("✅ Scan des serveurs média désactivé")
                     return True, 'none'
                 else:
-                    print("❌ Choix invalide. Utilisez 1, 2 ou 3")
+                    print("❌ Choix invalide. Utilisez 1, 2, 3 ou 4")
             except KeyboardInterrupt:
                 print("\n❌ Suppression annulée")
                 return False, 'mass'
     
+    def recheck_problem_mounts(self, problem_files: List[Dict]) -> int:
+        """Avant suppression: resonde le montage des cibles BROKEN/IO_ERROR
+        
+        L'état d'un montage est mémorisé pour tout le scan ; s'il est tombé après
+        son premier sondage, les liens suivants sont apparus cassés. La table des
+        montages est relue et chaque montage concerné resondé une fois ; les liens
+        d'un montage désormais indisponible passent en MOUNT_DOWN. Retourne leur nombre.
+        """
+        suspects = [problem for problem in problem_files if problem['status'] in ('BROKEN', 'IO_ERROR')]
+        if not suspects:
+            return 0
+        self.mount_health.refresh()
+        moved = 0
+        for problem in suspects:
+            resolved = os.path.normpath(os.path.join(os.path.dirname(problem['path']), problem.get('target') or ''))
+            healthy, mount_point = self.mount_health.check(resolved)
+            if healthy:
+                continue
+            self.stats['phase1_broken' if problem['status'] == 'BROKEN' else 'phase1_io_error'] -= 1
+            self.stats['phase1_mount_down'] += 1
+            problem['status'] = 'MOUNT_DOWN'
+            problem['mount'] = mount_point
+            moved += 1
+        if moved:
+            print(f"🔌 {moved:,} liens rattachés à un montage tombé pendant le scan: non supprimés")
+            logger.warning(f"{moved} liens BROKEN/IO_ERROR passés en MOUNT_DOWN avant suppression")
+        return moved
+    
     def delete_files(self, problem_files: List[Dict]) -> List[str]:
         """Supprime les fichiers problématiques et log les suppressions (version robuste)"""
         deleted_files = []
         
         print(f"\n🗑️ Suppression de {len(problem_files):,} fichiers...")
+        self.recheck_problem_mounts(problem_files)
         
         for i, problem in enumerate(problem_files, 1):
             try:
                 file_path = problem['path']
                 file_deleted = False
                 
+                # Garde-fou: une cible non vérifiable (montage tombé) n'est jamais supprimée
+                if problem['status'] in PROTECTED_STATUSES:
+                    continue
+                
                 # Vérifier d'abord si c'est un lien symbolique (cassé ou non)
                 if os.path.islink(file_path):
                     os.unlink(file_path)
@@ -672,6 +3371,8 @@ class AdvancedSymlinkChecker:
                         'size': problem.get('size', 0),
                         'deleted_at': datetime.now().isoformat()
                     })
+                    if self.report:
+                        self.report.deleted(deleted_files[-1])
                     
                     if i % 100 == 0:
                         print(f"📈 Suppression: {i:,}/{len(problem_files):,}")
@@ -681,7 +3382,7 @@ class AdvancedSymlinkChecker:
             except Exception as e:
                 logger.error(f"Erreur suppression {problem['path']}: {e}")
         
-        self.stats['files_deleted'] = len(deleted_files)
+        self.stats['files_deleted'] += len(deleted_files)
         print(f"✅ {len(deleted_files):,} fichiers supprimés")
         
         return deleted_files
@@ -694,7 +3395,8 @@ class AdvancedSymlinkChecker:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         log_file = f"deleted_files_{timestamp}.log"
         
-        with open(log_file, 'w') as f:
+        # Ajout: plusieurs lots du mode --watch peuvent tomber dans la même seconde
+        with open(log_file, 'a') as f:
             f.write(f"# Fichiers supprimés - {datetime.now()}\n")
             f.write(f"# Total: {len(deleted_files)} fichiers\n\n")
             
@@ -704,75 +3406,68 @@ class AdvancedSymlinkChecker:
         print(f"📝 Log de suppression: {log_file}")
         return log_file
     
-    def save_full_report(self, all_problems: List[Dict], mode: str) -> str:
-        """Sauvegarde le rapport complet"""
+    def open_report(self, mode: str) -> str:
+        """Ouvre le rapport NDJSON alimenté pendant le scan"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        report_file = f"symlink_report_{timestamp}.json"
-        
-        report = {
-            'scan_date': datetime.now().isoformat(),
-            'mode': mode,
-            'statistics': self.stats,
-            'problems_found': all_problems,
-            'deleted_files': self.deleted_files if mode == 'real' else []
-        }
-        
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        self.report = ReportWriter(f"symlink_report_{timestamp}.ndjson", mode)
+        return self.report.report_file
+    
+    def save_full_report(self, mode: str) -> str:
+        """Termine le rapport: pied avec le mode final et les statistiques"""
+        if not self.report:
+            return ""
+        report_file = self.report.report_file
+        statistics = dict(self.stats)
+        if self.command_tracker:
+            statistics['media_commands'] = self.command_tracker.summary()
+        self.report.close(mode, statistics)
+        self.report = None
         
         print(f"📄 Rapport complet: {report_file}")
         return report_file
     
+    def print_report(self, report_file: str, status: Optional[str] = None) -> int:
+        """Affiche un rapport existant en le relisant ligne par ligne"""
+        print(f"📄 Rapport: {report_file}")
+        counts: Dict[str, int] = {}
+        deleted = 0
+        footer = None
+        for entry in read_report(report_file):
+            kind = entry.get('type')
+            if kind == 'header':
+                print(f"🕐 Scan du {entry.get('scan_date')} (mode {entry.get('mode')})")
+            elif kind == 'problem':
+                counts[entry['status']] = counts.get(entry['status'], 0) + 1
+                if status is None or entry['status'] == status:
+                    error = f" ({entry['error']})" if entry.get('error') else ""
+                    print(f"[{entry['status']}] {entry['path']} -> {entry.get('target', '')}{error}")
+            elif kind == 'deleted':
+                deleted += 1
+            elif kind == 'footer':
+                footer = entry
+        
+        print(f"\n📊 Problèmes: {sum(counts.values()):,}")
+        for problem_status, count in sorted(counts.items()):
+            print(f"   {problem_status}: {count:,}")
+        print(f"🗑️ Supprimés: {deleted:,}")
+        if footer is None:
+            print("⚠️ Rapport incomplet: exécution interrompue avant la fin")
+        elif footer.get('mode') != 'real':
+            print(f"ℹ️ Mode final: {footer.get('mode')}")
+        if footer and footer.get('statistics', {}).get('media_commands'):
+            print("📡 Commandes des serveurs média:")
+            self._print_command_summary(footer['statistics']['media_commands'])
+        return sum(counts.values())
+    
     def load_media_config(self) -> Dict[str, Dict]:
-        """Charge la configuration des serveurs média depuis un fichier de config ou utilise les valeurs par défaut"""
-        config_file = os.path.join(self.home_dir, '.symguard_config.json')
-        
-        # Configuration par défaut basée sur des URLs standard
-        default_config = {
-            'sonarr': {
-                'url': 'http://localhost:8989',
-                'api_key': None,
-                'enabled': True
-            },
-            'radarr': {
-                'url': 'http://localhost:7878', 
-                'api_key': None,
-                'enabled': True
-            },
-            'bazarr': {
-                'url': 'http://localhost:6767',
-                'api_key': None,
-                'enabled': True
-            },
-            'prowlarr': {
-                'url': 'http://localhost:9696',
-                'api_key': None,
-                'enabled': True
-            }
-        }
-        
-        # Essayer de charger depuis le fichier de config existant
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r') as f:
-                    loaded_config = json.load(f)
-                    # Fusionner avec la config par défaut
-                    for service in default_config:
-                        if service in loaded_config:
-                            default_config[service].update(loaded_config[service])
-                logger.info(f"Configuration chargée depuis {config_file}")
-            except Exception as e:
-                logger.warning(f"Erreur lecture config {config_file}: {e}")
-        
-        return default_config
+        """Configuration des serveurs média (défauts + ~/.symguard_config.json), relue seulement si le fichier a changé"""
+        return self.config_store.load()
     
     def save_media_config(self, config: Dict[str, Dict]):
         """Sauvegarde la configuration des serveurs média"""
-        config_file = os.path.join(self.home_dir, '.symguard_config.json')
         try:
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-            logger.info(f"Configuration sauvegardée dans {config_file}")
+            self.config_store.save(config)
+            logger.info(f"Configuration sauvegardée dans {self.config_store.config_file}")
         except Exception as e:
             logger.error(f"Erreur sauvegarde config: {e}")
     
@@ -804,6 +3499,15 @@ class AdvancedSymlinkChecker:
     
     def _detect_api_key(self, service: str, base_url: str) -> Optional[str]:
         """Essaie de détecter automatiquement l'API key depuis les fichiers de config"""
+        # Résultat mémorisé (même négatif) jusqu'au prochain rechargement de la configuration
+        if service in self.config_store.detected_keys:
+            return self.config_store.detected_keys[service]
+        api_key = self._read_api_key(service)
+        self.config_store.detected_keys[service] = api_key
+        return api_key
+    
+    def _read_api_key(self, service: str) -> Optional[str]:
+        """Cherche <ApiKey> dans les config.xml connus du service"""
         try:
             # Chemins possibles pour les configurations
             config_paths = [
@@ -838,115 +3542,251 @@ class AdvancedSymlinkChecker:
             logger.error(f"Erreur détection API key {service}: {e}")
             return None
     
+    def notify_deleted_files(self, deleted_files: List[Dict], scan_mode: str, wait: bool = True):
+        """Notifie les serveurs média après suppression selon le mode choisi (individual, scoped, mass, none)
+        
+        wait=False (mode --watch): les commandes de rafraîchissement sont suivies
+        mais on n'attend pas leur fin.
+        """
+        if scan_mode == 'none':
+            print("\n⏭️ Notification des serveurs média désactivée pour cette session")
+            return
+        if not deleted_files or not any([self.media_config.get('sonarr'), self.media_config.get('radarr')]):
+            return
+        if scan_mode == 'individual':
+            print("\n🎯 Mode individuel sélectionné - Notification précise par fichier")
+            self.notify_media_servers_individual(deleted_files, wait)
+        elif scan_mode == 'scoped':
+            print("\n📂 Mode ciblé sélectionné - Rescan des dossiers touchés uniquement")
+            self.notify_media_servers_scoped(deleted_files, wait)
+        elif scan_mode == 'mass':
+            print("\n⚡ Mode en masse sélectionné - Scan complet rapide")
+            self.trigger_media_scans()
+    
     def trigger_media_scans(self):
         """Déclenche les scans Sonarr/Radarr/Bazarr/Prowlarr avec configuration améliorée"""
         print(f"\n🔄 Déclenchement des scans serveurs média...")
         print(f"💡 Utilisez --no-media-scan pour ignorer cette étape")
         
-        scan_results = {}
+        # URL et clé de chaque service résolues une seule fois
+        credentials = self._resolve_media_services()
+        if not credentials:
+            return {}
         
-        # Vérifier d'abord si au moins un service a une config valide
-        has_valid_config = False
-        for service in ['sonarr', 'radarr', 'bazarr', 'prowlarr']:
-            url, api_key = self.get_service_url_and_key(service)
-            if url and api_key:
-                has_valid_config = True
-                break
+        # Services traités simultanément, chacun limité par son propre débit de requêtes
+        with ThreadPoolExecutor(max_workers=len(credentials)) as executor:
+            futures = {service: executor.submit(self._scan_service, service, MEDIA_SCAN_COMMANDS[service],
+                                                credentials[service])
+                       for service in credentials}
+            scan_results = {service: future.result() for service, future in futures.items()}
         
-        if not has_valid_config:
+        self._print_scan_summary(scan_results)
+        return scan_results
+    
+    def _resolve_media_services(self) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """(URL, clé API) de chaque service, {} si aucun n'est utilisable"""
+        credentials = {service: self.get_service_url_and_key(service) for service in MEDIA_SCAN_COMMANDS}
+        if not any(url and api_key for url, api_key in credentials.values()):
             print("⚠️ Aucune configuration valide trouvée pour les serveurs média")
             print("💡 Utilisez --config pour configurer ou --create-config pour créer le fichier")
             return {}
+        return credentials
+    
+    def _rate_limiter(self, service: str) -> RateLimiter:
+        """Limiteur de débit partagé par toutes les requêtes vers un service"""
+        if service not in self._rate_limiters:
+            self._rate_limiters[service] = RateLimiter(SERVER_CONFIG['arr_requests_per_second'])
+        return self._rate_limiters[service]
+    
+    def _scan_service(self, service: str, service_commands: List[Dict],
+                      credentials: Tuple[Optional[str], Optional[str]]) -> Dict:
+        """Lance les commandes de scan d'un service puis suit leur exécution, retourne son statut"""
+        scan_result = {'status': 'unknown', 'commands': []}
+        limiter = self._rate_limiter(service)
         
-        # Services disponibles avec leurs commandes
-        services_commands = {
-            'sonarr': [
-                {'name': 'RescanSeries', 'desc': 'Scan séries'},
-                {'name': 'MissingEpisodeSearch', 'desc': 'Recherche épisodes manquants'}
-            ],
-            'radarr': [
-                {'name': 'RescanMovie', 'desc': 'Scan films'},
-                {'name': 'MissingMoviesSearch', 'desc': 'Recherche films manquants'}
-            ],
-            'bazarr': [
-                {'name': 'SeriesSearchMissing', 'desc': 'Recherche sous-titres séries'},
-                {'name': 'MoviesSearchMissing', 'desc': 'Recherche sous-titres films'}
-            ],
-            'prowlarr': [
-                {'name': 'IndexerSearch', 'desc': 'Test indexeurs'}
-            ]
-        }
-        
-        for service in services_commands.keys():
-            scan_results[service] = {'status': 'unknown', 'commands': []}
+        try:
+            url, api_key = credentials
+            
+            if not url:
+                print(f"⚠️ {service}: service désactivé")
+                scan_result['status'] = 'disabled'
+                return scan_result
+            
+            if not api_key:
+                print(f"⚠️ {service}: API key manquante")
+                print(f"   💡 Configurez manuellement dans ~/.symguard_config.json")
+                scan_result['status'] = 'no_api_key'
+                return scan_result
+            
+            # Test de connexion
+            headers = {"Content-Type": "application/json", "X-Api-Key": api_key}
             
             try:
-                # Récupérer URL et API key
-                url, api_key = self.get_service_url_and_key(service)
-                
-                if not url:
-                    print(f"⚠️ {service}: service désactivé")
-                    scan_results[service]['status'] = 'disabled'
-                    continue
-                    
-                if not api_key:
-                    print(f"⚠️ {service}: API key manquante")
-                    print(f"   💡 Configurez manuellement dans ~/.symguard_config.json")
-                    scan_results[service]['status'] = 'no_api_key'
-                    continue
-                
-                # Test de connexion
-                headers = {"Content-Type": "application/json", "X-Api-Key": api_key}
-                
+                limiter.wait()
+                test_response = self.session.get(f"{url}/api/v3/system/status", headers=headers, timeout=10)
+                if test_response.status_code != 200:
+                    print(f"⚠️ {service}: connexion échouée (HTTP {test_response.status_code})")
+                    scan_result['status'] = 'connection_failed'
+                    return scan_result
+            except Exception as e:
+                print(f"⚠️ {service}: connexion impossible ({str(e)})")
+                scan_result['status'] = 'connection_error'
+                return scan_result
+            
+            # Exécuter les commandes (espacées par le limiteur de débit du service)
+            successful_commands = []
+            command_ids = []
+            
+            for command_info in service_commands:
                 try:
-                    test_response = self.session.get(f"{url}/api/v3/system/status", headers=headers, timeout=10)
-                    if test_response.status_code != 200:
-                        print(f"⚠️ {service}: connexion échouée (HTTP {test_response.status_code})")
-                        scan_results[service]['status'] = 'connection_failed'
-                        continue
-                except Exception as e:
-                    print(f"⚠️ {service}: connexion impossible ({str(e)})")
-                    scan_results[service]['status'] = 'connection_error'
-                    continue
-                
-                # Exécuter les commandes
-                successful_commands = []
-                service_commands = services_commands.get(service, [])
-                
-                for command_info in service_commands:
+                    command = command_info['name']
+                    description = command_info['desc']
+                    
+                    data = {"name": command}
+                    limiter.wait()
+                    response = self.session.post(f"{url}/api/v3/command", json=data, headers=headers, timeout=30)
+                    response.raise_for_status()
+                    
+                    print(f"✅ {service}: {description} lancé")
+                    successful_commands.append(command)
                     try:
-                        command = command_info['name']
-                        description = command_info['desc']
-                        
-                        data = {"name": command}
-                        response = self.session.post(f"{url}/api/v3/command", json=data, headers=headers, timeout=30)
-                        response.raise_for_status()
-                        
-                        print(f"✅ {service}: {description} lancé")
-                        successful_commands.append(command)
-                        time.sleep(2)  # Pause entre commandes
-                        
-                    except requests.exceptions.RequestException as e:
-                        print(f"❌ {service} ({command}): {e}")
-                        logger.error(f"Erreur commande {service}/{command}: {e}")
+                        command_id = response.json().get('id')
+                    except ValueError:
+                        command_id = None
+                    if command_id is not None:
+                        self.command_tracker.record(service, url, headers, command_id, description)
+                        command_ids.append(command_id)
                 
-                scan_results[service] = {
-                    'status': 'success' if successful_commands else 'failed',
-                    'commands': successful_commands,
-                    'url': url
-                }
-                    
-            except Exception as e:
-                print(f"❌ {service}: erreur générale - {e}")
-                scan_results[service]['status'] = 'error'
-                logger.error(f"Erreur générale {service}: {e}")
+                except requests.exceptions.RequestException as e:
+                    print(f"❌ {service} ({command}): {e}")
+                    logger.error(f"Erreur commande {service}/{command}: {e}")
+            
+            self._wait_for_commands(service)
+            scan_result = {
+                'status': 'success' if successful_commands else 'failed',
+                'commands': successful_commands,
+                'url': url,
+                'command_states': self.command_tracker.states(service, command_ids)
+            }
+        
+        except Exception as e:
+            print(f"❌ {service}: erreur générale - {e}")
+            scan_result['status'] = 'error'
+            logger.error(f"Erreur générale {service}: {e}")
+        
+        return scan_result
+
+    def _wait_for_commands(self, service: str, timeout: Optional[float] = None):
+        """Relève les commandes en cours du service jusqu'à leur fin ou au délai (arr_command_timeout)
         
-        # Résumé des scans
+        Un relevé groupé par tour ; l'intervalle entre deux tours double tant
+        qu'aucune commande ne change d'état (arr_poll_interval -> arr_poll_max_interval).
+        Une commande encore en cours au délai n'est pas un échec: le serveur
+        continue de la traiter. timeout=0: un seul relevé.
+        """
+        tracker = self.command_tracker
+        timeout = SERVER_CONFIG['arr_command_timeout'] if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        delay = SERVER_CONFIG['arr_poll_interval']
+        
+        pending = tracker.pending(service)
+        while pending:
+            if self._poll_commands(service, pending):
+                delay = SERVER_CONFIG['arr_poll_interval']
+            pending = tracker.pending(service)
+            if not pending or time.monotonic() >= deadline:
+                break
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, SERVER_CONFIG['arr_poll_max_interval'])
+        
+        now = time.monotonic()
+        for record in pending.values():
+            print(f"⏳ {service}: {record['description']} toujours en cours après {now - record['sent']:.0f}s")
+    
+    def _poll_commands(self, service: str, pending: Dict[int, Dict]) -> bool:
+        """Un relevé: liste des commandes du service (GET /api/v3/command), puis une
+        requête par commande absente de la liste ; True si un état a changé"""
+        tracker = self.command_tracker
+        url, headers = tracker.endpoints[service]
+        limiter = self._rate_limiter(service)
+        statuses = {}
+        try:
+            limiter.wait()
+            response = self.session.get(f"{url}/api/v3/command", headers=headers, timeout=10)
+            if response.status_code == 200:
+                statuses = {command.get('id'): command.get('status') for command in response.json()
+                            if isinstance(command, dict)}
+        except (requests.exceptions.RequestException, ValueError, TypeError) as e:
+            logger.debug(f"Liste des commandes {service} indisponible: {e}")
+        
+        changed = False
+        for command_id, record in pending.items():
+            state, final = statuses.get(command_id), None
+            if state is None:
+                try:
+                    limiter.wait()
+                    response = self.session.get(f"{url}/api/v3/command/{command_id}", headers=headers, timeout=10)
+                    if response.status_code == 200:
+                        state = response.json().get('status', 'unknown')
+                    elif response.status_code == 404:
+                        state, final = ARR_COMMAND_PRUNED, True  # Terminée et déjà purgée par le serveur
+                    else:
+                        state, final = f"HTTP {response.status_code}", True
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    logger.warning(f"Suivi de la commande {service}/{command_id} impossible: {e}")
+                    state, final = 'suivi impossible', True
+            changed |= tracker.update(service, command_id, state, final)
+            if state == ARR_COMMAND_PRUNED:
+                print(f"✅ {service}: {record['description']} terminé (déjà purgé par le serveur)")
+            elif record['latency'] is not None:
+                if state == 'completed':
+                    print(f"✅ {service}: {record['description']} terminé ({record['latency']:.1f}s)")
+                else:
+                    print(f"❌ {service}: {record['description']} {state} ({record['latency']:.1f}s)")
+        return changed
+    
+    def wait_for_media_commands(self, timeout: Optional[float] = None):
+        """Relève simultanément les commandes en cours de tous les services"""
+        services = [service for service in self.command_tracker.endpoints if self.command_tracker.pending(service)]
+        if not services:
+            return
+        with ThreadPoolExecutor(max_workers=len(services)) as executor:
+            list(executor.map(lambda service: self._wait_for_commands(service, timeout), services))
+    
+    def poll_media_commands(self):
+        """Un seul relevé, sans attente, des commandes en cours de chaque service (mode --watch)"""
+        tracker = self.command_tracker
+        for service in list(tracker.endpoints):
+            pending = tracker.pending(service)
+            if pending:
+                self._poll_commands(service, pending)
+    
+    def _print_command_summary(self, summary: Dict[str, Dict]):
+        """Latence et échecs des commandes par service ; signale le service le plus lent"""
+        for service, entry in summary.items():
+            latency = (f", latence moy. {entry['latency_avg']:.1f}s / max {entry['latency_max']:.1f}s"
+                       if entry['latency_max'] is not None else "")
+            print(f"{'✅' if not entry['failed'] and not entry['pending'] else '⚠️'} {service}: "
+                  f"{entry['completed']}/{entry['commands']} commandes terminées{latency}")
+            for failure in entry['failed']:
+                print(f"   ❌ {failure['command']}: {failure['state']}")
+            if entry['pending']:
+                print(f"   ⏳ {entry['pending']} toujours en cours")
+        timed = {service: entry['latency_max'] for service, entry in summary.items() if entry['latency_max'] is not None}
+        if len(timed) > 1:
+            slowest = max(timed, key=timed.get)
+            print(f"🐢 Plus lent: {slowest} ({timed[slowest]:.1f}s)")
+    
+    def _print_scan_summary(self, scan_results: Dict[str, Dict]):
+        """Résumé des scans média et instructions de configuration manquante"""
         print(f"\n📊 Résumé des scans média:")
         for service, result in scan_results.items():
             status = result['status']
             if status == 'success':
-                print(f"✅ {service}: {len(result['commands'])} commandes exécutées")
+                states = list(result.get('command_states', {}).values())
+                finished = sum(1 for state in states if state == 'completed')
+                print(f"✅ {service}: {len(result['commands'])} commandes exécutées"
+                      + (f" ({finished}/{len(states)} terminées)" if states else ""))
             elif status == 'disabled':
                 print(f"⏭️ {service}: désactivé")
             elif status == 'no_api_key':
@@ -962,8 +3802,6 @@ class AdvancedSymlinkChecker:
         missing_config = [s for s, r in scan_results.items() if r['status'] == 'no_api_key']
         if missing_config:
             self._show_config_instructions(missing_config)
-        
-        return scan_results
     
     def _show_config_instructions(self, missing_services):
         """Affiche les instructions de configuration"""
@@ -1005,7 +3843,7 @@ class AdvancedSymlinkChecker:
         print(f"🖥️ Serveur: {self.stats['server_info']['hostname']} ({self.stats['server_info']['architecture']})")
         print(f"👤 Utilisateur: {self.stats['server_info']['user']}")
         print(f"🐍 Python: {self.stats['server_info']['python_version']}")
-        print(f"⚙️ Workers: {self.max_workers}")
+        print(f"⚙️ Workers: {self.max_workers} (ffprobe: {self.ffprobe_workers})")
         print(f"📁 Mode: {mode.upper()}")
         
         print(f"\n=== PHASE 1 (tests basiques) ===")
@@ -1015,11 +3853,23 @@ class AdvancedSymlinkChecker:
         print(f"🚫 Inaccessibles: {self.stats['phase1_inaccessible']:,}")
         print(f"📁 Fichiers vides: {self.stats['phase1_small']:,}")
         print(f"⚠️ Erreurs I/O: {self.stats['phase1_io_error']:,}")
+        if self.stats['phase1_timeout']:
+            print(f"⏱️ Hors délai (non supprimés): {self.stats['phase1_timeout']:,}")
+        if self.stats['phase1_mount_down']:
+            print(f"🔌 Montage indisponible (non supprimés): {self.stats['phase1_mount_down']:,}")
+        if self.stats['phase1_unreadable_dirs']:
+            print(f"🚫 Répertoires illisibles (non vérifiés): {self.stats['phase1_unreadable_dirs']:,}")
+        if self.stats['cache_hits']['phase1']:
+            print(f"♻️ Validés par le cache: {self.stats['cache_hits']['phase1']:,}")
         
         if self.stats['phase2_analyzed'] > 0:
             print(f"\n=== PHASE 2 (vérification ffprobe) ===")
             print(f"Analysés: {self.stats['phase2_analyzed']:,}")
             print(f"🔨 Corrompus: {self.stats['phase2_corrupted']:,}")
+            if self.stats['phase2_timeout']:
+                print(f"⏱️ Hors délai (non supprimés): {self.stats['phase2_timeout']:,}")
+            if self.stats['cache_hits']['phase2']:
+                print(f"♻️ Validés par le cache: {self.stats['cache_hits']['phase2']:,}")
             if self.stats['phase2_analyzed'] > 0:
                 corruption_rate = (self.stats['phase2_corrupted'] / self.stats['phase2_analyzed']) * 100
                 print(f"Taux de corruption: {corruption_rate:.1f}%")
@@ -1032,6 +3882,10 @@ class AdvancedSymlinkChecker:
             print(f"\n=== SUPPRESSIONS ===")
             print(f"🗑️ Fichiers supprimés: {self.stats['files_deleted']:,}")
         
+        if self.command_tracker:
+            print(f"\n=== SERVEURS MÉDIA ===")
+            self._print_command_summary(self.command_tracker.summary())
+        
         print(f"\n=== TOTAL ===")
         if total_problems > 0:
             print(f"⚠️ PROBLÈMES TROUVÉS: {total_problems:,}")
@@ -1041,6 +3895,7 @@ class AdvancedSymlinkChecker:
         # Informations système
         print(f"\n=== SYSTÈME ===")
         print(f"💾 Logs: {log_file}")
+        print(f"♻️ Cache: {self.cache_path}")
         print(f"🏠 Home: {self.home_dir}")
         print(f"⚙️ Settings: {self.settings_source}")
     
@@ -1268,8 +4123,7 @@ class AdvancedSymlinkChecker:
         }
         
         try:
-            with open(config_file, 'w') as f:
-                json.dump(default_config, f, indent=2)
+            self.config_store.save(default_config)
             
             print(f"✅ Fichier créé avec succès!")
             print(f"💡 Éditez-le pour ajouter vos clés API:")
@@ -1368,8 +4222,7 @@ class AdvancedSymlinkChecker:
         
         # Sauvegarder
         try:
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            self.config_store.save(config)
             
             print(f"\n✅ Configuration sauvegardée dans {config_file}")
             
@@ -1403,13 +4256,14 @@ class AdvancedSymlinkChecker:
         }
         
         path_str = str(file_path).lower()
+        name_str = os.path.basename(path_str)  # Les motifs SxxExx / année portent sur le nom du fichier
         
         # Détection série (patterns courants)
         import re
         
         # Pattern série avec saison/épisode
         series_pattern = r'(.*?)[\s\.]s(\d{2})e(\d{2})'
-        series_match = re.search(series_pattern, path_str)
+        series_match = re.search(series_pattern, name_str)
         
         if series_match:
             info['type'] = 'series'
@@ -1419,7 +4273,7 @@ class AdvancedSymlinkChecker:
         else:
             # Pattern film avec année
             movie_pattern = r'(.*?)[\s\.](\d{4})[\s\.]'
-            movie_match = re.search(movie_pattern, path_str)
+            movie_match = re.search(movie_pattern, name_str)
             
             if movie_match:
                 info['type'] = 'movie'
@@ -1441,7 +4295,7 @@ class AdvancedSymlinkChecker:
         
         return info
 
-    def notify_media_servers_individual(self, deleted_files: List[Dict]) -> Dict[str, int]:
+    def notify_media_servers_individual(self, deleted_files: List[Dict], wait: bool = True) -> Dict[str, int]:
         """Notifie individuellement les serveurs média pour chaque fichier supprimé"""
         print(f"\n🔄 Notification individuelle des serveurs média...")
         print(f"📊 {len(deleted_files):,} fichiers à traiter")
@@ -1453,32 +4307,21 @@ class AdvancedSymlinkChecker:
             'errors': 0
         }
         
-        # Grouper les fichiers par type et nom
-        series_to_refresh = set()
-        movies_to_refresh = set()
+        connections = {service: self._arr_connection(service, quiet=True) for service in ARR_REFRESH_COMMANDS}
+        item_ids = self._resolve_deleted_items(deleted_files, connections)
         
-        print("🔍 Analyse des fichiers supprimés...")
-        for deleted_file in deleted_files:
-            file_path = deleted_file['path']
-            media_info = self.parse_media_file_info(file_path)
-            
-            if media_info['type'] == 'series' and media_info['series_name']:
-                series_to_refresh.add(media_info['series_name'])
-            elif media_info['type'] == 'movie' and media_info['movie_name']:
-                movies_to_refresh.add(media_info['movie_name'])
-        
-        print(f"📺 {len(series_to_refresh)} séries à rafraîchir")
-        print(f"🎬 {len(movies_to_refresh)} films à rafraîchir")
-        
-        # Notifier Sonarr pour les séries
-        if series_to_refresh:
-            results['sonarr_series_refreshed'] = self._refresh_sonarr_series(series_to_refresh)
+        print(f"📺 {len(item_ids['sonarr'])} séries à rafraîchir")
+        print(f"🎬 {len(item_ids['radarr'])} films à rafraîchir")
         
-        # Notifier Radarr pour les films
-        if movies_to_refresh:
-            results['radarr_movies_refreshed'] = self._refresh_radarr_movies(movies_to_refresh)
+        # Notifier Sonarr pour les séries, Radarr pour les films
+        if item_ids['sonarr']:
+            results['sonarr_series_refreshed'] = self._refresh_arr_ids('sonarr', connections['sonarr'], item_ids['sonarr'])
+        if item_ids['radarr']:
+            results['radarr_movies_refreshed'] = self._refresh_arr_ids('radarr', connections['radarr'], item_ids['radarr'])
         
         results['total_notifications'] = results['sonarr_series_refreshed'] + results['radarr_movies_refreshed']
+        if wait:
+            self.wait_for_media_commands()
         
         print(f"\n📊 Résumé notifications individuelles:")
         print(f"✅ Séries rafraîchies: {results['sonarr_series_refreshed']}")
@@ -1487,132 +4330,717 @@ class AdvancedSymlinkChecker:
         
         return results
 
+    def _resolve_deleted_items(self, deleted_files: List[Dict], connections: Dict[str, Optional[Tuple]]) -> Dict[str, set]:
+        """Identifiants Sonarr/Radarr des séries et films touchés par les suppressions
+        
+        Chaque dossier parent est rattaché une fois (par son chemin) au dossier
+        d'une série ou d'un film ; ses sous-dossiers (saisons) sont alors déjà
+        couverts. Les fichiers hors des dossiers connus sont recherchés par nom.
+        """
+        item_ids = {service: set() for service in ARR_REFRESH_COMMANDS}
+        files_by_folder: Dict[str, List[str]] = {}
+        for deleted_file in deleted_files:
+            files_by_folder.setdefault(os.path.dirname(deleted_file['path']), []).append(deleted_file['path'])
+        
+        print("🔍 Analyse des fichiers supprimés...")
+        unresolved = []
+        covered = set()  # Dossiers rattachés: leurs sous-dossiers le sont aussi
+        for folder in sorted(files_by_folder):
+            if any(str(parent) in covered for parent in Path(folder).parents):
+                continue
+            for service, connection in connections.items():
+                if connection:
+                    item_id = connection[2].find_path(self._to_arr_path(service, folder))
+                    if item_id is not None:
+                        item_ids[service].add(item_id)
+                        covered.add(folder)
+                        break
+            else:
+                unresolved.extend(files_by_folder[folder])
+        
+        # Repli pour les fichiers hors des dossiers connus: nom extrait du nom de fichier
+        if unresolved:
+            print(f"🔎 {len(unresolved):,} fichiers hors des dossiers Sonarr/Radarr: recherche par nom")
+        for file_path in unresolved:
+            media_info = self.parse_media_file_info(file_path)
+            if media_info['type'] == 'series' and media_info['series_name']:
+                service, name, year = 'sonarr', media_info['series_name'], None
+            elif media_info['type'] == 'movie' and media_info['movie_name']:
+                service, name, year = 'radarr', media_info['movie_name'], media_info['year']
+            else:
+                continue
+            if connections[service] is None:
+                connections[service] = self._arr_connection(service)
+            if connections[service]:
+                item_id = connections[service][2].find(name, year)
+                if item_id is None:
+                    print(f"⚠️ {ARR_REFRESH_COMMANDS[service]['missing']}: {name}")
+                else:
+                    item_ids[service].add(item_id)
+        return item_ids
+    
+    def notify_media_servers_scoped(self, deleted_files: List[Dict], wait: bool = True) -> Dict[str, int]:
+        """Rescan disque limité aux séries/films dont un lien a été supprimé (RescanSeries/RescanMovie par élément)"""
+        print(f"\n🔄 Rescan ciblé des serveurs média...")
+        print(f"📊 {len(deleted_files):,} fichiers à traiter")
+        
+        connections = {service: self._arr_connection(service, quiet=True) for service in ARR_REFRESH_COMMANDS}
+        item_ids = self._resolve_deleted_items(deleted_files, connections)
+        print(f"📺 {len(item_ids['sonarr'])} séries à rescanner")
+        print(f"🎬 {len(item_ids['radarr'])} films à rescanner")
+        
+        services = [service for service in ARR_REFRESH_COMMANDS if item_ids[service] and connections[service]]
+        results = {service: 0 for service in ARR_REFRESH_COMMANDS}
+        if services:
+            with ThreadPoolExecutor(max_workers=len(services)) as executor:
+                futures = {service: executor.submit(self._rescan_arr_ids, service, connections[service],
+                                                    item_ids[service], wait)
+                           for service in services}
+                results.update({service: future.result() for service, future in futures.items()})
+        
+        print(f"\n📊 Résumé du rescan ciblé:")
+        print(f"✅ Séries rescannées: {results['sonarr']}")
+        print(f"✅ Films rescannés: {results['radarr']}")
+        return results
+    
+    def _rescan_arr_ids(self, service: str, connection: Tuple[str, Dict, ArrLibraryIndex], item_ids: set,
+                        wait: bool = True) -> int:
+        """Commandes de rescan par lots de arr_rescan_batch, chaque lot attendu avant le suivant
+        
+        wait=False (mode --watch): aucun lot n'est attendu, tous partent au rythme
+        du limiteur de requêtes et leur suivi est laissé aux relevés de la boucle.
+        """
+        spec = ARR_REFRESH_COMMANDS[service]
+        url, headers, index = connection
+        limiter = self._rate_limiter(service)
+        ordered = sorted(item_ids)
+        batch_size = max(1, SERVER_CONFIG['arr_rescan_batch'])
+        sent = 0
+        for start in range(0, len(ordered), batch_size):
+            if start and wait:
+                self._wait_for_commands(service)  # Lot précédent terminé (ou délai écoulé)
+            for item_id in ordered[start:start + batch_size]:
+                try:
+                    limiter.wait()
+                    response = self.session.post(f"{url}/api/v3/command",
+                                                 json={"name": spec['rescan'], spec['id']: item_id},
+                                                 headers=headers, timeout=10)
+                except requests.exceptions.RequestException as e:
+                    print(f"❌ Erreur communication {spec['label']}: {e}")
+                    continue
+                if response.status_code in [200, 201]:
+                    self._track_command(service, url, headers, response, f"{spec['rescan']} {index.titles[item_id]}")
+                    sent += 1
+                else:
+                    print(f"⚠️ {spec['label']}: Erreur rescan {index.titles[item_id]} (HTTP {response.status_code})")
+        print(f"✅ {spec['label']}: {sent}/{len(ordered)} rescan(s) envoyé(s)")
+        if wait:
+            self._wait_for_commands(service)
+        return sent
+    
     def _refresh_sonarr_series(self, series_names: set) -> int:
-        """Rafraîchit individuellement les séries dans Sonarr"""
+        """Rafraîchit dans Sonarr les séries nommées ((nom, année)), en commandes groupées"""
+        return self._refresh_arr_items('sonarr', series_names)
+    
+    def _refresh_radarr_movies(self, movie_names: set) -> int:
+        """Rafraîchit dans Radarr les films nommés ((nom, année)), en commandes groupées"""
+        return self._refresh_arr_items('radarr', movie_names)
+    
+    def _arr_library_index(self, service: str, url: str, headers: Dict) -> Optional[ArrLibraryIndex]:
+        """Index de la bibliothèque du service, téléchargée une fois (rechargée après arr_index_ttl)"""
+        index = self._arr_indexes.get(service)
+        if index is not None and time.monotonic() - index.built < SERVER_CONFIG['arr_index_ttl']:
+            return index
+        
+        library = ARR_REFRESH_COMMANDS[service]['library']
+        response = self.session.get(f"{url}/api/v3/{library}", headers=headers, timeout=30)
+        if response.status_code != 200:
+            print(f"⚠️ Impossible de récupérer la liste {ARR_REFRESH_COMMANDS[service]['label']}")
+            return None
+        index = ArrLibraryIndex(response.json())
+        self._arr_indexes[service] = index
+        logger.info(f"Bibliothèque {service} indexée: {len(index):,} éléments")
+        return index
+    
+    def _arr_connection(self, service: str, quiet: bool = False) -> Optional[Tuple[str, Dict, ArrLibraryIndex]]:
+        """(URL, en-têtes, index de la bibliothèque) du service, None s'il n'est pas joignable"""
+        label = ARR_REFRESH_COMMANDS[service]['label']
+        url, api_key = self.get_service_url_and_key(service)
+        if not url or not api_key:
+            if not quiet:
+                print(f"⚠️ {label} non configuré")
+            return None
+        
+        headers = {"Content-Type": "application/json", "X-Api-Key": api_key}
         try:
-            # Vérifier si requests est disponible
-            try:
-                import requests
-            except ImportError:
-                print("⚠️ Module 'requests' non disponible pour Sonarr")
-                return 0
-            
-            url, api_key = self.get_service_url_and_key('sonarr')
-            if not url or not api_key:
-                print("⚠️ Sonarr non configuré")
-                return 0
-            
-            headers = {"Content-Type": "application/json", "X-Api-Key": api_key}
-            refreshed = 0
-            
-            # Récupérer la liste des séries Sonarr
+            index = self._arr_library_index(service, url, headers)
+        except Exception as e:
+            print(f"❌ Erreur communication {label}: {e}")
+            return None
+        return (url, headers, index) if index is not None else None
+    
+    def _to_arr_path(self, service: str, path: str) -> str:
+        """Chemin tel que le voit le service (path_mappings: préfixe local -> préfixe du service)"""
+        mappings = self.media_config.get(service, {}).get('path_mappings') or {}
+        for local in sorted(mappings, key=len, reverse=True):
+            local_prefix = os.path.normpath(local)
+            if path == local_prefix or path.startswith(local_prefix.rstrip(os.sep) + os.sep):
+                return mappings[local].rstrip(os.sep) + path[len(local_prefix.rstrip(os.sep)):]
+        return path
+    
+    def _refresh_arr_items(self, service: str, names: set) -> int:
+        """Résout les noms via l'index de la bibliothèque puis envoie des commandes groupées dédupliquées"""
+        spec = ARR_REFRESH_COMMANDS[service]
+        connection = self._arr_connection(service)
+        if connection is None:
+            return 0
+        
+        item_ids = set()
+        for name, year in names:
+            item_id = connection[2].find(name, year)
+            if item_id is None:
+                print(f"⚠️ {spec['missing']}: {name}")
+            else:
+                item_ids.add(item_id)
+        return self._refresh_arr_ids(service, connection, item_ids)
+    
+    def _refresh_arr_ids(self, service: str, connection: Tuple[str, Dict, ArrLibraryIndex], item_ids: set) -> int:
+        """Commandes de rafraîchissement groupées par arr_refresh_batch identifiants"""
+        label = ARR_REFRESH_COMMANDS[service]['label']
+        url, headers, index = connection
+        refreshed = 0
+        ordered = sorted(item_ids)
+        batch_size = SERVER_CONFIG['arr_refresh_batch']
+        for start in range(0, len(ordered), batch_size):
+            batch = ordered[start:start + batch_size]
             try:
-                response = self.session.get(f"{url}/api/v3/series", headers=headers, timeout=10)
-                if response.status_code != 200:
-                    print(f"⚠️ Impossible de récupérer la liste Sonarr")
-                    return 0
-                
-                sonarr_series = response.json()
-                
-                for series_name in series_names:
-                    # Chercher la série dans Sonarr
-                    for series in sonarr_series:
-                        if series_name.lower() in series['title'].lower():
-                            # Rafraîchir cette série
-                            refresh_data = {"name": "RefreshSeries", "seriesId": series['id']}
-                            refresh_response = self.session.post(f"{url}/api/v3/command", 
-                                                               json=refresh_data, 
-                                                               headers=headers, 
-                                                               timeout=10)
-                            if refresh_response.status_code in [200, 201]:
-                                print(f"✅ Sonarr: {series['title']} rafraîchi")
-                                refreshed += 1
-                            else:
-                                print(f"⚠️ Sonarr: Erreur rafraîchissement {series['title']}")
-                            break
-                    else:
-                        print(f"⚠️ Série non trouvée dans Sonarr: {series_name}")
-                
+                refreshed += self._post_refresh(service, url, headers, batch, index)
             except Exception as e:
-                print(f"❌ Erreur communication Sonarr: {e}")
-                
-        except Exception as e:
-            print(f"❌ Erreur générale Sonarr: {e}")
-        
+                print(f"❌ Erreur communication {label}: {e}")
         return refreshed
-
-    def _refresh_radarr_movies(self, movie_names: set) -> int:
-        """Rafraîchit individuellement les films dans Radarr"""
+    
+    def _post_refresh(self, service: str, url: str, headers: Dict, item_ids: List[int],
+                      index: ArrLibraryIndex) -> int:
+        """Une commande de rafraîchissement pour plusieurs éléments (un par un si l'API ignore la liste)
+        
+        Sonarr v3 accepte (201) une commande RefreshSeries avec seriesIds mais
+        ignore ce champ inconnu: elle rafraîchirait toute la bibliothèque. La
+        forme groupée n'est donc envoyée qu'aux versions qui la gèrent, et
+        seulement conservée si le corps de la commande acceptée renvoie la liste.
+        """
+        spec = ARR_REFRESH_COMMANDS[service]
+        limiter = self._rate_limiter(service)
+        if self._supports_bulk_refresh(service, url, headers):
+            limiter.wait()
+            response = self.session.post(f"{url}/api/v3/command",
+                                         json={"name": spec['command'], spec['ids']: item_ids},
+                                         headers=headers, timeout=10)
+            if response.status_code in [200, 201] and self._echoes_ids(response, spec['ids'], item_ids):
+                self._track_command(service, url, headers, response, f"{spec['command']} ({len(item_ids)})")
+                print(f"✅ {spec['label']}: {len(item_ids)} élément(s) rafraîchi(s) "
+                      f"({', '.join(index.titles[item_id] for item_id in item_ids[:5])}"
+                      f"{'...' if len(item_ids) > 5 else ''})")
+                return len(item_ids)
+            if response.status_code in [200, 201]:
+                # Liste ignorée: commande globale annulée avant qu'elle ne démarre
+                logger.warning(f"{spec['command']} groupé accepté sans {spec['ids']} par {service}, annulation")
+                self._cancel_command(service, url, headers, response)
+            else:
+                logger.info(f"{spec['command']} groupé refusé par {service} ({response.status_code})")
+            self._arr_bulk[service] = False
+        
+        # Anciennes versions: un identifiant par commande
+        refreshed = 0
+        for item_id in item_ids:
+            limiter.wait()
+            single = self.session.post(f"{url}/api/v3/command",
+                                       json={"name": spec['command'], spec['id']: item_id},
+                                       headers=headers, timeout=10)
+            if single.status_code in [200, 201]:
+                self._track_command(service, url, headers, single, f"{spec['command']} {index.titles[item_id]}")
+                print(f"✅ {spec['label']}: {index.titles[item_id]} rafraîchi")
+                refreshed += 1
+            else:
+                print(f"⚠️ {spec['label']}: Erreur rafraîchissement {index.titles[item_id]}")
+        return refreshed
+    
+    def _supports_bulk_refresh(self, service: str, url: str, headers: Dict) -> bool:
+        """Version du service (/api/v3/system/status) assez récente pour seriesIds/movieIds, relevée une fois"""
+        if service not in self._arr_bulk:
+            spec = ARR_REFRESH_COMMANDS[service]
+            try:
+                self._rate_limiter(service).wait()
+                response = self.session.get(f"{url}/api/v3/system/status", headers=headers, timeout=10)
+                version = response.json().get('version', '') if response.status_code == 200 else ''
+                major = int(str(version).split('.')[0])
+            except (requests.exceptions.RequestException, ValueError, AttributeError):
+                version, major = '?', 0
+            self._arr_bulk[service] = major >= spec['bulk_since']
+            logger.info(f"{spec['label']} {version}: {spec['command']} "
+                        f"{'groupé' if self._arr_bulk[service] else 'un identifiant par commande'}")
+        return self._arr_bulk[service]
+    
+    @staticmethod
+    def _echoes_ids(response, ids_field: str, item_ids: List[int]) -> bool:
+        """Le corps de la commande acceptée contient-il la liste d'identifiants envoyée ?"""
         try:
-            # Vérifier si requests est disponible
+            body = response.json().get('body') or {}
+        except (ValueError, AttributeError):
+            return False
+        return isinstance(body, dict) and sorted(body.get(ids_field) or []) == sorted(item_ids)
+    
+    def _cancel_command(self, service: str, url: str, headers: Dict, response):
+        """Annule une commande encore en file (DELETE /api/v3/command/{id}), sans garantie"""
+        try:
+            command_id = response.json().get('id')
+            if command_id is not None:
+                self._rate_limiter(service).wait()
+                self.session.delete(f"{url}/api/v3/command/{command_id}", headers=headers, timeout=10)
+        except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+            logger.warning(f"Annulation de la commande {service} impossible: {e}")
+    
+    def _track_command(self, service: str, url: str, headers: Dict, response, description: str):
+        """Enregistre la commande acceptée auprès du suivi (si la réponse donne son identifiant)"""
+        try:
+            command_id = response.json().get('id')
+        except (ValueError, AttributeError):
+            command_id = None
+        if command_id is not None:
+            self.command_tracker.record(service, url, headers, command_id, description)
+
+class AsyncScanEngine:
+    """Moteur asyncio (--engine asyncio): une seule boucle pilote les deux phases et les scans
+    
+    Les vérifications de fichiers passent par un exécuteur borné (DeadlineExecutor,
+    mêmes délais et coupe-circuit que le moteur threads), ffprobe par
+    asyncio.create_subprocess_exec et les appels HTTP des serveurs média par
+    l'exécuteur de la boucle. Des sémaphores bornent chaque type de travail, et
+    les fichiers OK de la phase 1 entrent en phase 2 dès leur vérification.
+    """
+    
+    def __init__(self, checker: AdvancedSymlinkChecker):
+        self.checker = checker
+    
+    def scan(self, paths: List[str], verification_depth: str) -> Tuple[ResultStore, ResultStore, List[Dict]]:
+        """Phases 1 et 2 dans une boucle d'événements: (fichiers OK, problèmes phase 1, corrompus)"""
+        return asyncio.run(self._scan(paths, verification_depth))
+    
+    def trigger_media_scans(self) -> Dict[str, Dict]:
+        """Scans des serveurs média lancés simultanément, un service par tâche"""
+        return asyncio.run(self._trigger_media_scans())
+    
+    async def _scan(self, paths: List[str], verification_depth: str) -> Tuple[ResultStore, ResultStore, List[Dict]]:
+        checker = self.checker
+        run_phase2 = verification_depth in ('full', 'fast')
+        use_ffprobe = verification_depth == 'full'
+        
+        print(f"\n🔍 PHASE 1 - SCAN BASIQUE (moteur asyncio)")
+        print("="*50)
+        if run_phase2:
+            print(f"🔍 PHASE 2 - VÉRIFICATION {'FFPROBE' if use_ffprobe else 'DES EN-TÊTES'} (en parallèle de la phase 1)")
+        
+        checker.mount_health.refresh()
+        ok_files, problem_files, corrupted_files = ResultStore(), ResultStore(), []
+        self._discovered = 0
+        
+        link_queue = queue.Queue(maxsize=SERVER_CONFIG['discovery_queue_size'])
+        stop_event = threading.Event()
+        producer = threading.Thread(target=checker._discover_symlinks, name='symguard-discovery',
+                                    args=(paths, link_queue, stop_event), daemon=True)
+        
+        # Vérifications en vol (phase 1, limite ajustée en continu) et processus ffprobe simultanés (phase 2)
+        controller = checker._new_controller('phase 1')
+        check_slots = asyncio.Condition()
+        self._running = 0
+        probe_slots = asyncio.Semaphore(checker.ffprobe_workers)
+        media_queue = asyncio.Queue(maxsize=SERVER_CONFIG['discovery_queue_size'])
+        
+        executor = DeadlineExecutor(controller.maximum, checker.check_timeout)
+        executor.set_limit(controller.limit)
+        header_executor = ThreadPoolExecutor(max_workers=checker.ffprobe_workers)
+        reader = ThreadPoolExecutor(max_workers=1)  # Lecture bloquante de la file de découverte
+        loop = asyncio.get_running_loop()
+        
+        async def expire_stuck_checks():
+            while True:
+                await asyncio.sleep(0.5)
+                executor.expire()
+                executor.set_limit(controller.adjust())
+        
+        async def check(link: str):
             try:
-                import requests
-            except ImportError:
-                print("⚠️ Module 'requests' non disponible pour Radarr")
-                return 0
-            
-            url, api_key = self.get_service_url_and_key('radarr')
-            if not url or not api_key:
-                print("⚠️ Radarr non configuré")
-                return 0
+                try:
+                    result = await asyncio.wrap_future(executor.submit(controller.timed, checker.check_symlink_basic, link))
+                    checker._active_targets.pop(link, None)
+                except CheckTimeout as e:
+                    controller.record(checker.check_timeout)
+                    result = checker._timeout_result(link, checker._active_targets.pop(link, None), str(e))
+                except Exception as e:
+                    checker._active_targets.pop(link, None)
+                    logger.error(f"Erreur lors du traitement: {e}")
+                    return
+                
+                if checker._record_phase1_result(result, ok_files, problem_files):
+                    if checker.stats['total_analyzed'] % 1000 == 0:
+                        print(f"📈 Progression: {checker.stats['total_analyzed']:,} vérifiés / "
+                              f"{self._discovered:,} découverts")
+                    if run_phase2 and result['status'] == 'OK' and checker.is_media_file(result['path']):
+                        await media_queue.put(len(ok_files) - 1)  # Indice dans ok_files
+            finally:
+                self._running -= 1
+                async with check_slots:
+                    check_slots.notify()
+        
+        async def probe_worker():
+            while True:
+                index = await media_queue.get()
+                if index is None:
+                    return
+                path = ok_files.path(index)
+                try:
+                    valid, tier, detail = await loop.run_in_executor(
+                        header_executor, checker._probe_media_file, path, use_ffprobe, True)
+                    if valid is None:
+                        async with probe_slots:
+                            valid = await self._ffprobe(path)
+                        if valid:
+                            await loop.run_in_executor(header_executor, checker._cache_phase2_valid, path)
+                    checker._record_phase2_result(ok_files, index, valid, tier, detail, corrupted_files)
+                except Exception as e:
+                    logger.error(f"Erreur ffprobe sur {path}: {e}")
+        
+        def next_links() -> List[Optional[str]]:
+            # Un aller-retour vers le thread lecteur par paquet de liens, pas par lien
+            while True:
+                try:
+                    links = [link_queue.get(timeout=0.5)]
+                    break
+                except queue.Empty:
+                    if stop_event.is_set():
+                        return [None]
+            while links[-1] is not None and len(links) < 256:
+                try:
+                    links.append(link_queue.get_nowait())
+                except queue.Empty:
+                    break
+            return links
+        
+        print("⚡ Vérification en cours...")
+        producer.start()
+        expiry = asyncio.ensure_future(expire_stuck_checks())
+        probers = [asyncio.ensure_future(probe_worker()) for _ in range(checker.ffprobe_workers * 2)] if run_phase2 else []
+        checks = set()
+        try:
+            discovery_done = False
+            while not discovery_done:
+                for link in await loop.run_in_executor(reader, next_links):
+                    if link is None:
+                        discovery_done = True
+                        break
+                    async with check_slots:
+                        await check_slots.wait_for(
+                            lambda: self._running < controller.limit * SERVER_CONFIG['in_flight_per_worker'])
+                    self._running += 1
+                    task = asyncio.ensure_future(check(link))
+                    checks.add(task)
+                    task.add_done_callback(checks.discard)
+                    self._discovered += 1
             
-            headers = {"Content-Type": "application/json", "X-Api-Key": api_key}
-            refreshed = 0
+            if checks:
+                await asyncio.wait(checks)
+            checker._print_phase1_summary(self._discovered, ok_files, problem_files, executor.replaced)
             
-            # Récupérer la liste des films Radarr
-            try:
-                response = self.session.get(f"{url}/api/v3/movie", headers=headers, timeout=10)
-                if response.status_code != 200:
-                    print(f"⚠️ Impossible de récupérer la liste Radarr")
-                    return 0
-                
-                radarr_movies = response.json()
-                
-                for movie_name in movie_names:
-                    # Chercher le film dans Radarr
-                    for movie in radarr_movies:
-                        if movie_name.lower() in movie['title'].lower():
-                            # Rafraîchir ce film
-                            refresh_data = {"name": "RefreshMovie", "movieId": movie['id']}
-                            refresh_response = self.session.post(f"{url}/api/v3/command", 
-                                                               json=refresh_data, 
-                                                               headers=headers, 
-                                                               timeout=10)
-                            if refresh_response.status_code in [200, 201]:
-                                print(f"✅ Radarr: {movie['title']} rafraîchi")
-                                refreshed += 1
-                            else:
-                                print(f"⚠️ Radarr: Erreur rafraîchissement {movie['title']}")
-                            break
-                    else:
-                        print(f"⚠️ Film non trouvé dans Radarr: {movie_name}")
-                
-            except Exception as e:
-                print(f"❌ Erreur communication Radarr: {e}")
-                
-        except Exception as e:
-            print(f"❌ Erreur générale Radarr: {e}")
+            for _ in probers:
+                await media_queue.put(None)
+            if probers:
+                await asyncio.wait(probers)
+                checker._print_phase2_summary(corrupted_files, checker.stats['phase2_analyzed'])
+        finally:
+            stop_event.set()
+            expiry.cancel()
+            for task in list(checks) + probers:
+                task.cancel()
+            executor.shutdown(wait=False)
+            header_executor.shutdown(wait=True)
+            reader.shutdown(wait=False)
+            checker.verification_cache.flush()
+        
+        return ok_files, problem_files, corrupted_files
+    
+    async def _ffprobe(self, path: str) -> bool:
+        """check_ffprobe_validity sans thread: le processus est attendu par la boucle"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *FFPROBE_COMMAND, path, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+        except OSError:
+            return False
+        try:
+            output, _ = await asyncio.wait_for(process.communicate(), SERVER_CONFIG['ffprobe_file_timeout'])
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return False
+        return _ffprobe_output_valid(output.decode("utf-8", errors="replace").strip())
+    
+    async def _trigger_media_scans(self) -> Dict[str, Dict]:
+        checker = self.checker
+        print(f"\n🔄 Déclenchement des scans serveurs média (moteur asyncio)...")
+        print(f"💡 Utilisez --no-media-scan pour ignorer cette étape")
         
-        return refreshed
+        credentials = checker._resolve_media_services()
+        if not credentials:
+            return {}
+        
+        # requests est bloquant: chaque service tourne dans l'exécuteur de la boucle
+        loop = asyncio.get_running_loop()
+        services = list(credentials)
+        results = await asyncio.gather(*(
+            loop.run_in_executor(None, checker._scan_service, service, MEDIA_SCAN_COMMANDS[service],
+                                 credentials[service])
+            for service in services))
+        scan_results = dict(zip(services, results))
+        
+        checker._print_scan_summary(scan_results)
+        return scan_results
+
+class WatchDaemon:
+    """Mode --watch: scan initial puis surveillance inotify continue des arborescences
+    
+    Les liens créés ou remplacés sont regroupés pendant watch_batch_seconds puis
+    vérifiés (phase 1, puis en-têtes des médias selon la profondeur) ; les
+    problèmes passent par delete_files et la notification des serveurs média
+    comme à la fin d'un scan complet. Toutes les watch_mount_interval secondes,
+    les montages déjà vus sont resondés et les liens MOUNT_DOWN/TIMEOUT revérifiés.
+    Les commandes envoyées aux serveurs média sont relevées sans attente une fois
+    par intervalle de lot, puis oubliées une fois terminées (totaux conservés).
+    """
+    
+    def __init__(self, checker: AdvancedSymlinkChecker, inotify: InotifyWatcher, paths: List[str],
+                 mode: str, verification_depth: str, scan_mode: str):
+        self.checker = checker
+        self.inotify = inotify
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.mode = mode
+        self.verification_depth = verification_depth
+        self.scan_mode = scan_mode
+        self.batch_seconds = SERVER_CONFIG['watch_batch_seconds']
+        self.mount_interval = SERVER_CONFIG['watch_mount_interval']
+        self.batches = 0
+        self._pending: Dict[str, None] = {}  # Liens à vérifier, dans l'ordre d'arrivée
+        self._pending_since = 0.0
+        self._unverified: Dict[str, Dict] = {}  # Liens MOUNT_DOWN/TIMEOUT à revérifier
+        self._next_mount_check = 0.0
+        self._next_command_poll = 0.0
+    
+    def watch_tree(self, dir_path: str) -> List[str]:
+        """Surveille une arborescence (watch posé avant le listing), retourne ses liens"""
+        links = []
+        for _, directory, dir_links in self.checker.iter_symlinks([dir_path]):
+            self.inotify.add_watch(directory)
+            links.extend(dir_links)
+        return links
+    
+    def start(self) -> int:
+        """Pose les watches puis fait le scan initial ; retourne le nombre de problèmes"""
+        print(f"\n👁️ Mise en place de la surveillance inotify...")
+        for path in self.paths:
+            self.watch_tree(path)
+        print(f"👁️ {len(self.inotify):,} répertoires surveillés")
+        
+        ok_files, phase1_problems = self.checker.phase1_scan(self.paths)
+        phase2_problems = []
+        if self.verification_depth in ('full', 'fast') and ok_files:
+            phase2_problems = self.checker.phase2_scan(ok_files, use_ffprobe=self.verification_depth == 'full')
+        problems = list(phase1_problems) + phase2_problems
+        self.handle_problems(problems)
+        self._next_mount_check = time.monotonic() + self.mount_interval
+        return len(problems)
+    
+    def run(self):
+        """Scan initial puis boucle de surveillance jusqu'à Ctrl-C"""
+        self.start()
+        print(f"\n👁️ Surveillance active (lots de {self.batch_seconds}s, montages revérifiés toutes "
+              f"les {self.mount_interval}s) - Ctrl-C pour arrêter")
+        try:
+            while True:
+                self.poll()
+        except KeyboardInterrupt:
+            print(f"\n👋 Surveillance arrêtée après {self.batches:,} lots")
+        # Dernier relevé des rafraîchissements envoyés, pour le résumé et le rapport
+        self.checker.wait_for_media_commands(timeout=0)
+    
+    def poll(self, timeout: float = 1.0):
+        """Un tour de boucle: lit les événements, vérifie le lot s'il est mûr, resonde les montages"""
+        for path, is_dir in self.inotify.read_events(timeout):
+            if is_dir:
+                # Nouveau répertoire: ses liens ont pu arriver avant son watch
+                self._queue(self.watch_tree(path))
+            else:
+                self._queue([path])
+        
+        if self.inotify.overflowed:
+            self.inotify.overflowed = False
+            print("⚠️ File inotify débordée: événements perdus, reparcours des arborescences")
+            logger.warning("Débordement de la file inotify, reparcours complet")
+            for path in self.paths:
+                self._queue(self.watch_tree(path))
+        
+        now = time.monotonic()
+        if self._pending and now - self._pending_since >= self.batch_seconds:
+            links, self._pending = list(self._pending), {}
+            self.process(links)
+        
+        if now >= self._next_mount_check:
+            self._next_mount_check = now + self.mount_interval
+            self.recheck_mounts()
+        
+        if now >= self._next_command_poll:
+            self._next_command_poll = now + self.batch_seconds
+            self.poll_commands()
+    
+    def poll_commands(self):
+        """Relève les commandes en cours des serveurs média puis oublie celles terminées"""
+        self.checker.poll_media_commands()
+        self.checker.command_tracker.prune()
+    
+    def _queue(self, links: List[str]):
+        if links and not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending.update(dict.fromkeys(links))
+    
+    def process(self, links: List[str]) -> List[Dict]:
+        """Vérifie un lot de liens puis traite ses problèmes"""
+        self.batches += 1
+        print(f"\n🔎 Lot {self.batches}: {len(links):,} liens modifiés")
+        self.refresh_target_listings()
+        problems = self.check_links(links)
+        self.handle_problems(problems)
+        self.checker.verification_cache.flush()
+        return problems
+    
+    def refresh_target_listings(self):
+        """Oublie les listings des répertoires cibles (entrées et stat mémorisés) vus par les lots précédents"""
+        self.checker.target_index = TargetDirectoryIndex(SERVER_CONFIG['target_dir_listings'])
+    
+    def check_links(self, links: List[str]) -> List[Dict]:
+        """Phase 1 puis en-têtes (et ffprobe) des médias OK d'un lot, avec délai par vérification"""
+        checker = self.checker
+        ok_files = ResultStore()
+        problem_files = ResultStore()
+        
+        for result in checker.check_links_with_deadline(links):
+            checker._record_phase1_result(result, ok_files, problem_files)
+        
+        corrupted_files = []
+        if self.verification_depth in ('full', 'fast'):
+            media = [index for index in range(len(ok_files)) if checker.is_media_file(ok_files.path(index))]
+            for index, valid, tier, detail in checker.probe_media_with_deadline(
+                    ok_files, media, use_ffprobe=self.verification_depth == 'full'):
+                checker._record_phase2_result(ok_files, index, valid, tier, detail, corrupted_files)
+            checker.stats['phase2_corrupted'] += sum(1 for problem in corrupted_files
+                                                     if problem['status'] == 'CORRUPTED')
+        return list(problem_files) + corrupted_files
+    
+    def handle_problems(self, problems: List[Dict]):
+        """Suppression et notification des problèmes trouvés (cibles non vérifiables mises de côté)"""
+        self.checker.all_problems.extend(problems)
+        deletable = []
+        for problem in problems:
+            if problem['status'] in PROTECTED_STATUSES:
+                self._unverified[problem['path']] = problem
+            else:
+                deletable.append(problem)
+        if not deletable:
+            return
+        if self.mode != 'real':
+            print(f"📋 {len(deletable):,} problèmes signalés (DRY-RUN, aucune suppression)")
+            return
+        
+        deleted_files = self.checker.delete_files(deletable)
+        # Montage tombé depuis le premier sondage: liens revérifiés à son rétablissement
+        self._unverified.update({problem['path']: problem for problem in deletable
+                                 if problem['status'] in PROTECTED_STATUSES})
+        self.checker.deleted_files.extend(deleted_files)
+        self.checker.save_deletion_log(deleted_files)
+        if self.scan_mode != 'none':
+            self.checker.notify_deleted_files(deleted_files, self.scan_mode, wait=False)
+    
+    def recheck_mounts(self):
+        """Resonde les montages ; revérifie les liens restés sans verdict"""
+        changed = self.checker.mount_health.recheck()
+        self.refresh_target_listings()
+        for mount_point, healthy in changed.items():
+            if healthy:
+                print(f"🔌 Montage rétabli: {mount_point}")
+                logger.info(f"Montage {mount_point} rétabli")
+        
+        # Les délais dépassés ont pu venir d'un montage passager: nouvelle chance aux préfixes coupés
+        self.checker.circuit_breaker = CircuitBreaker(SERVER_CONFIG['circuit_breaker_threshold'],
+                                                      SERVER_CONFIG['circuit_breaker_depth'])
+        if self._unverified:
+            links, self._unverified = list(self._unverified), {}
+            print(f"\n🔌 Revérification de {len(links):,} liens sans verdict (montage/délai)")
+            self.process(links)
+
 def main():
     parser = argparse.ArgumentParser(description='Vérificateur avancé de liens symboliques - 2 phases')
     parser.add_argument('path', nargs='?', default=f'{SERVER_CONFIG["home_dir"]}/Medias', 
                        help=f'Répertoire de base à scanner (défaut: {SERVER_CONFIG["home_dir"]}/Medias)')
     parser.add_argument('-j', '--jobs', type=int, default=SERVER_CONFIG['max_workers'], 
-                       help=f'Nombre de workers parallèles (défaut: {SERVER_CONFIG["max_workers"]} - détection automatique)')
+                       help=f'Nombre de workers parallèles au démarrage, ajusté ensuite selon la charge (défaut: {SERVER_CONFIG["max_workers"]})')
+    parser.add_argument('--max-jobs', type=int, default=SERVER_CONFIG['max_workers_ceiling'],
+                       help=f'Plafond de l\'ajustement des workers de vérification (défaut: {SERVER_CONFIG["max_workers_ceiling"]})')
+    parser.add_argument('--fixed-jobs', action='store_true',
+                       help='Désactiver l\'ajustement automatique: -j et --ffprobe-jobs restent fixes')
+    parser.add_argument('--ffprobe-jobs', type=int, default=SERVER_CONFIG['ffprobe_workers'],
+                       help=f'Nombre de processus ffprobe simultanés en phase 2 (défaut: {SERVER_CONFIG["ffprobe_workers"]})')
+    parser.add_argument('--ffprobe-batch', type=int, default=SERVER_CONFIG['ffprobe_batch_size'],
+                       help=f'Fichiers sondés par processus ffmpeg en phase 2, 1 = un ffprobe par fichier (défaut: {SERVER_CONFIG["ffprobe_batch_size"]})')
+    parser.add_argument('--probe-benchmark', action='store_true',
+                       help='Mesurer ffprobe fichier par fichier contre les lots ffmpeg sur un échantillon, puis quitter')
+    parser.add_argument('--engine', choices=['threads', 'asyncio'], default='threads',
+                       help='Moteur de vérification: pools de threads ou boucle asyncio unique (défaut: threads)')
+    parser.add_argument('--read-report', metavar='FICHIER',
+                       help='Relire un rapport (NDJSON ou ancien JSON) en flux, puis quitter')
+    parser.add_argument('--status', help='Avec --read-report: n\'afficher que ce statut (BROKEN, CORRUPTED...)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Reprendre le dernier scan interrompu là où il s\'était arrêté')
+    parser.add_argument('--no-checkpoint', action='store_true',
+                       help=f'Ne pas enregistrer de point de reprise ({checkpoint_file})')
+    parser.add_argument('--watch', action='store_true',
+                       help='Mode démon: scan initial puis surveillance inotify continue (non interactif, DRY-RUN sauf --real)')
+    parser.add_argument('-y', '--yes', '--non-interactive', dest='yes', action='store_true',
+                       help='Aucune question (cron): DRY-RUN sauf --real, suppression sans confirmation, --select all et --depth fast par défaut')
+    parser.add_argument('--select', metavar='CHOIX',
+                       help='Répertoires à scanner sans menu: all, big, medium, small, 1,3,5 ou 1-5 (all évite le comptage des liens)')
+    parser.add_argument('--depth', choices=['basic', 'fast', 'full'],
+                       help='Profondeur sans menu: basic (liens), fast (+ en-têtes), full (+ ffprobe si indécis)')
     parser.add_argument('--dry-run', action='store_true', help='Force le mode dry-run')
     parser.add_argument('--real', action='store_true', help='Force le mode réel')
-    parser.add_argument('--quick', action='store_true', help='Scan basique uniquement')
+    parser.add_argument('--quick', action='store_true', help='Scan basique uniquement (équivaut à --depth basic)')
+    parser.add_argument('--check-timeout', type=float, default=SERVER_CONFIG['check_timeout'],
+                       help=f'Délai max (secondes) d\'une vérification phase 1 avant TIMEOUT (défaut: {SERVER_CONFIG["check_timeout"]})')
+    parser.add_argument('--rescan-all', action='store_true', help='Ignorer le cache de vérification et tout revérifier')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Ne relister que les répertoires modifiés depuis le dernier scan (mtime)')
     parser.add_argument('--no-update-check', action='store_true', help='Ignorer la vérification de mise à jour')
     parser.add_argument('--no-media-scan', action='store_true', help='Ignorer les scans des serveurs média')
+    parser.add_argument('--scan-mode', choices=['individual', 'scoped', 'mass'], default='individual',
+                        help='Notification après suppression avec --yes ou --watch (défaut: individual)')
     parser.add_argument('--config', action='store_true', help='Configuration interactive des serveurs média')
     parser.add_argument('--create-config', action='store_true', help='Créer un fichier de configuration par défaut')
     parser.add_argument('--version', action='version', version=f'SymGuard v{SCRIPT_VERSION}')
     
     args = parser.parse_args()
+    if args.quick and not args.depth:
+        args.depth = 'basic'
+    non_interactive = args.yes or args.watch  # Aucune question posée
     
     # Gestion des commandes spéciales
-    checker = AdvancedSymlinkChecker(max_workers=args.jobs)
+    checker = AdvancedSymlinkChecker(max_workers=args.jobs, ffprobe_workers=args.ffprobe_jobs,
+                                     rescan_all=args.rescan_all, incremental=args.incremental,
+                                     check_timeout=args.check_timeout, ffprobe_batch=args.ffprobe_batch,
+                                     max_workers_ceiling=args.max_jobs, adaptive=not args.fixed_jobs)
     
     if args.create_config:
         if checker.create_default_config():
@@ -1623,11 +5051,61 @@ def main():
         checker.interactive_config_setup()
         return 0
     
+    engine = AsyncScanEngine(checker) if args.engine == 'asyncio' else None
+    
+    if args.read_report:
+        try:
+            checker.print_report(args.read_report, args.status)
+        except (OSError, ValueError) as e:
+            print(f"❌ Rapport illisible: {e}")
+            return 1
+        finally:
+            checker.verification_cache.close()
+        return 0
+    
+    if args.probe_benchmark:
+        try:
+            checker.benchmark_ffprobe(args.path)
+        finally:
+            checker.verification_cache.close()
+        return 0
+    
+    # Mode --watch: inotify vérifié avant tout le reste
+    inotify = None
+    if args.watch:
+        if args.resume:
+            print("❌ --resume et --watch ne peuvent pas être combinés")
+            return 1
+        try:
+            inotify = InotifyWatcher()
+        except OSError as e:
+            print(f"❌ Mode --watch impossible: {e}")
+            return 1
+        if engine:
+            print("⚠️ --watch utilise le moteur threads")
+            engine = None
+    
+    # Point de reprise: relu pour --resume, sinon recréé au lancement du scan (sans objet pour --watch)
+    checkpoint = None
+    if args.resume:
+        checkpoint = ScanCheckpoint(checkpoint_file, SERVER_CONFIG['checkpoint_interval'])
+        checker.resume_meta = checkpoint.load()
+        if not checker.resume_meta:
+            print(f"❌ Aucun point de reprise trouvé ({checkpoint_file})")
+            return 1
+        if engine:
+            print("⚠️ --resume utilise le moteur threads (points de reprise non gérés par le moteur asyncio)")
+            engine = None
+    elif not args.no_checkpoint and not engine and not args.watch:
+        checkpoint = ScanCheckpoint(checkpoint_file, SERVER_CONFIG['checkpoint_interval'])
+    
     print("🚀 Vérificateur avancé de liens symboliques - 2 phases")
     print(f"🖥️ Serveur: {os.uname().nodename} ({os.uname().machine})")
     print(f"👤 Utilisateur: {SERVER_CONFIG['user']}")
     print(f"📁 Répertoire de base: {args.path}")
-    print(f"⚡ Workers parallèles: {args.jobs}")
+    print(f"⚡ Workers parallèles: {args.jobs}" + ("" if args.fixed_jobs else f" (ajustés jusqu'à {checker.max_workers_ceiling})"))
+    print(f"🔧 Processus ffprobe: {args.ffprobe_jobs}")
+    print(f"⚙️ Moteur: {args.engine}")
     print(f"🐍 Python: {SERVER_CONFIG['python_executable']}")
     
     # Vérifications préliminaires
@@ -1641,7 +5119,7 @@ def main():
     
     try:
         # Vérification des mises à jour (sauf si --no-update-check)
-        if not args.no_update_check:
+        if not args.no_update_check and not non_interactive:
             if checker.check_for_updates():
                 return 0  # Script mis à jour, arrêter l'exécution actuelle
         
@@ -1658,11 +5136,29 @@ def main():
         elif args.real:
             mode = 'real'
             print("⚠️ Mode RÉEL forcé par --real")
+        elif non_interactive:
+            mode = 'dry-run'
+            print("✅ Mode DRY-RUN (non interactif, --real pour supprimer)")
         else:
             mode = checker.choose_execution_mode()
+        if checker.resume_meta and not checker.validate_resume(mode):
+            return 1
         
-        # 2. Vérification interactive des répertoires
-        selected_paths = checker.interactive_directory_selection(args.path)
+        # 2. Vérification interactive des répertoires (ceux du scan interrompu avec --resume)
+        if checker.resume_meta:
+            selected_paths = checker.resume_meta['paths']
+            print(f"♻️ Reprise du scan du {checker.resume_meta.get('started', '?')} "
+                  f"(dernière sauvegarde: {checker.resume_meta.get('updated', '?')})")
+            for path in selected_paths:
+                print(f"   📂 {path}")
+        elif args.select:
+            selected_paths = checker.select_directories(args.path, args.select)
+        elif args.watch:
+            selected_paths = [args.path]  # Les répertoires créés à la racine sont aussi surveillés
+        elif args.yes:
+            selected_paths = checker.select_directories(args.path, 'all')
+        else:
+            selected_paths = checker.interactive_directory_selection(args.path)
         if not selected_paths:
             print("❌ Aucun répertoire sélectionné, arrêt")
             return 1
@@ -1679,9 +5175,18 @@ def main():
         print("✅ Permissions vérifiées")
         
         # 3. Vérification ffprobe et choix de profondeur
-        if args.quick:
-            verification_depth = 'basic'
-            print("✅ Scan basique forcé par --quick")
+        if checker.resume_meta:
+            verification_depth = checker.resume_meta['depth']
+            print(f"♻️ Profondeur du scan repris: {verification_depth}")
+        elif args.depth:
+            verification_depth = args.depth
+            if verification_depth == 'full' and not checker.is_ffprobe_available():
+                print("⚠️ ffprobe non trouvé: vérification des en-têtes seulement (fast)")
+                verification_depth = 'fast'
+            print(f"✅ Profondeur: {verification_depth}")
+        elif non_interactive:
+            verification_depth = 'fast'
+            print("✅ Profondeur: fast (liens puis en-têtes des médias, --depth pour changer)")
         else:
             ffprobe_available, media_count, time_estimate = checker.check_ffprobe_and_estimate(selected_paths)
             verification_depth = checker.choose_verification_depth(ffprobe_available, time_estimate)
@@ -1689,51 +5194,72 @@ def main():
         # 4. Vérification de l'état du système et des ressources
         checker.print_system_status()
         
-        start_time = time.time()
+        # Rapport NDJSON: les problèmes y sont écrits dès qu'ils sont trouvés
+        print(f"📄 Rapport en cours: {checker.open_report(mode)}")
         
-        # 5. Phase 1 - Scan basique
-        ok_files, phase1_problems = checker.phase1_scan(selected_paths)
+        if checkpoint:
+            checker.checkpoint = checkpoint
+            if not checker.resume_meta:
+                checkpoint.start({'paths': selected_paths, 'depth': verification_depth, 'mode': mode,
+                                  'started': datetime.now().isoformat(), 'phase': 'phase1'})
         
-        # 6. Phase 2 - Scan ffprobe (si choisi)
-        phase2_problems = []
-        if verification_depth == 'full' and ok_files:
-            phase2_problems = checker.phase2_scan(ok_files)
+        start_time = time.time()
+        
+        # Mode --watch: suppressions et notifications faites lot par lot, sans confirmation
+        if inotify is not None:
+            WatchDaemon(checker, inotify, selected_paths, mode, verification_depth,
+                        'none' if args.no_media_scan else args.scan_mode).run()
+            checker.save_full_report(mode)
+            checker.print_final_summary(mode)
+            return 0
+        
+        # 5-6. Phase 1 puis phase 2 (en-têtes puis ffprobe, si choisie)
+        if engine:
+            ok_files, phase1_problems, phase2_problems = engine.scan(selected_paths, verification_depth)
+        else:
+            ok_files, phase1_problems = checker.phase1_scan(selected_paths)
+            phase2_problems = []
+            if verification_depth in ('full', 'fast') and ok_files:
+                phase2_problems = checker.phase2_scan(ok_files, use_ffprobe=verification_depth == 'full')
         
         # 7. Regroupement de tous les problèmes
-        all_problems = phase1_problems + phase2_problems
+        all_problems = list(phase1_problems) + phase2_problems  # Enregistrements complets pour le rapport
         checker.all_problems = all_problems
         
-        # 8. Traitement selon le mode
-        if mode == 'real' and all_problems:
-            confirmed, scan_mode = checker.confirm_deletion(all_problems)
+        # 8. Traitement selon le mode (les liens vers un montage tombé ne sont jamais supprimés)
+        deletable = [p for p in all_problems if p['status'] not in PROTECTED_STATUSES]
+        if mode == 'real' and deletable:
+            if args.yes:
+                print(f"\n⚠️  MODE RÉEL - {len(deletable):,} fichiers supprimés sans confirmation (--yes)")
+                confirmed, scan_mode = True, args.scan_mode
+            else:
+                confirmed, scan_mode = checker.confirm_deletion(deletable)
             if confirmed:
-                deleted_files = checker.delete_files(all_problems)
+                deleted_files = checker.delete_files(deletable)
                 checker.deleted_files = deleted_files
                 checker.save_deletion_log(deleted_files)
                 
                 # Notification des serveurs média selon le mode choisi
-                if scan_mode and not args.no_media_scan and any([checker.config.get('sonarr'), checker.config.get('radarr')]):
-                    if scan_mode == 'individual':
-                        print("\n🎯 Mode individuel sélectionné - Notification précise par fichier")
-                        checker.notify_media_servers_individual(deleted_files)
-                    elif scan_mode == 'mass':
-                        print("\n⚡ Mode en masse sélectionné - Scan complet rapide")
-                        checker.notify_media_servers(deleted_files)
-                elif scan_mode == 'none':
-                    print("\n⏭️ Notification des serveurs média désactivée pour cette session")
+                if scan_mode and not args.no_media_scan:
+                    checker.notify_deleted_files(deleted_files, scan_mode)
             else:
                 print("❌ Suppression annulée")
                 mode = 'dry-run'  # Traiter comme un dry-run
         
-        # 9. Sauvegarde des rapports
-        checker.save_full_report(all_problems, mode)
-        
-        # 10. Scan des serveurs média (optionnel) - seulement si pas déjà fait
+        # 9. Scan des serveurs média (optionnel) - seulement si pas déjà fait
         if not args.no_media_scan and mode == 'dry-run':
-            checker.trigger_media_scans()
+            (engine or checker).trigger_media_scans()
         elif args.no_media_scan:
             print("\n⏭️ Scans des serveurs média ignorés (--no-media-scan)")
         
+        # 10. Sauvegarde des rapports (suivi des commandes média inclus)
+        checker.save_full_report(mode)
+        
+        # Scan allé jusqu'au bout: le point de reprise n'a plus d'utilité
+        if checker.checkpoint and not checker.interrupted:
+            checker.checkpoint.clear()
+            checker.checkpoint = None
+        
         # 11. Résumé final
         elapsed = time.time() - start_time
         checker.print_final_summary(mode)
@@ -1748,6 +5274,17 @@ def main():
         logger.error(f"Erreur fatale: {e}")
         print(f"❌ Erreur fatale: {e}")
         return 1
+    finally:
+        if checker.report:
+            # Arrêt avant la fin: le rapport garde les problèmes déjà trouvés, sans pied
+            print(f"📄 Rapport partiel: {checker.report.report_file}")
+            checker.report.close()
+        if checker.checkpoint:
+            checker.checkpoint.close()
+            print(f"💾 Point de reprise enregistré: relancez avec --resume pour continuer")
+        if inotify is not None:
+            inotify.close()
+        checker.verification_cache.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,10 +7,19 @@ Vérifie que les fonctions principales fonctionnent sans erreur
 
 import sys
 import os
+import time
+import atexit
+import shutil
+import tempfile
 
 # Ajouter le répertoire du script au path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Cache de vérification des tests (et des scripts lancés par eux) hors de ~/.symguard_cache.db
+_TEST_CACHE_DIR = tempfile.mkdtemp(prefix='symguard_tests_')
+os.environ['SYMGUARD_CACHE_FILE'] = os.path.join(_TEST_CACHE_DIR, 'cache.db')
+atexit.register(shutil.rmtree, _TEST_CACHE_DIR, ignore_errors=True)
+
 def test_imports():
     """Test des imports principaux"""
     print("🧪 Test des imports...")
@@ -76,6 +85,1640 @@ def test_help():
         print(f"❌ Erreur lors du test d'aide: {e}")
         return False
 
+def _build_media_tree(base):
+    """Crée une arborescence média de test avec des liens valides et cassés"""
+    storage = os.path.join(base, 'storage')
+    os.makedirs(storage)
+    for name in ['Show.S01E01.mkv', 'Show.S01E02.mkv', 'Film.2020.mp4']:
+        with open(os.path.join(storage, name), 'wb') as f:
+            f.write(b'\x00' * 4096)
+    
+    medias = os.path.join(base, 'Medias')
+    season = os.path.join(medias, 'series', 'Show', 'Season 01')
+    films = os.path.join(medias, 'films')
+    os.makedirs(season)
+    os.makedirs(films)
+    os.symlink(os.path.join(storage, 'Show.S01E01.mkv'), os.path.join(season, 'Show.S01E01.mkv'))
+    os.symlink(os.path.join(storage, 'Show.S01E02.mkv'), os.path.join(season, 'Show.S01E02.mkv'))
+    os.symlink(os.path.join(storage, 'absent.mkv'), os.path.join(season, 'Show.S01E03.mkv'))
+    os.symlink(os.path.join(storage, 'Film.2020.mp4'), os.path.join(films, 'Film.2020.mp4'))
+    os.symlink(storage, os.path.join(films, 'dossier_lie'))
+    return medias
+
+class _FakeArrResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+    
+    def json(self):
+        return self._payload
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}")
+
+class _FakeArrSession:
+    """Session HTTP simulant Sonarr/Radarr: bibliothèques fixes, commandes enregistrées
+    
+    Une commande est 'started' au premier relevé (liste /api/v3/command ou
+    /api/v3/command/{id}), puis 'completed' ('failed' si son nom est dans failing).
+    Les identifiants de pruned ont été purgés: absents de la liste, 404 à l'unité.
+    bulk=False imite Sonarr v3: la liste seriesIds/movieIds est acceptée (201)
+    mais absente du corps renvoyé, la commande porterait sur toute la bibliothèque.
+    """
+    
+    def __init__(self, libraries=None, bulk=True, latency=0.0, failing=(), version='4.0.0'):
+        self.libraries = libraries or {}
+        self.bulk = bulk
+        self.latency = latency
+        self.failing = set(failing)
+        self.version = version
+        self.deleted = []
+        self.pruned = set()
+        self.gets = []
+        self.commands = []
+        self.polls = {}
+        self.log = []  # Requêtes dans l'ordre: ('get', url) ou ('post', nom de la commande)
+    
+    def _command_status(self, command_id):
+        self.polls[command_id] = self.polls.get(command_id, 0) + 1
+        if self.polls[command_id] == 1:
+            return {'id': command_id, 'status': 'started'}
+        failed = self.commands[command_id - 1]['name'] in self.failing
+        return {'id': command_id, 'status': 'failed' if failed else 'completed'}
+    
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        self.gets.append(url)
+        self.log.append(('get', url))
+        if url.endswith('/api/v3/command'):
+            return _FakeArrResponse(200, [self._command_status(command_id)
+                                          for command_id in range(1, len(self.commands) + 1)
+                                          if command_id not in self.pruned])
+        if '/api/v3/command/' in url:
+            command_id = int(url.rsplit('/', 1)[-1])
+            if command_id in self.pruned:
+                return _FakeArrResponse(404)
+            return _FakeArrResponse(200, self._command_status(command_id))
+        if url.endswith('/system/status'):
+            return _FakeArrResponse(200, {'version': self.version})
+        return _FakeArrResponse(200, self.libraries[url.rsplit('/', 1)[-1]])
+    
+    def post(self, url, json=None, headers=None, timeout=None, **kwargs):
+        time.sleep(self.latency)
+        self.log.append(('post', json['name']))
+        self.commands.append(json)
+        body = {key: value for key, value in json.items() if self.bulk or not key.endswith('Ids')}
+        return _FakeArrResponse(201, {'id': len(self.commands), 'name': json['name'], 'status': 'queued',
+                                      'body': body})
+    
+    def delete(self, url, headers=None, timeout=None, **kwargs):
+        self.deleted.append(int(url.rsplit('/', 1)[-1]))
+        return _FakeArrResponse(200)
+
+def test_symlink_walk():
+    """Test du parcours unique des liens symboliques"""
+    print("\n🧪 Test du parcours des liens...")
+    
+    try:
+        import tempfile
+        import script
+        checker = script.AdvancedSymlinkChecker(max_workers=2)
+        
+        with tempfile.TemporaryDirectory() as base:
+            medias = _build_media_tree(base)
+            
+            # films/dossier_lie (lien vers un répertoire) n'est ni vérifié par la phase 1, ni compté
+            counts = checker.list_directories_with_counts(medias)
+            if counts != {'series': 3, 'films': 1}:
+                print(f"❌ Comptage inattendu: {counts}")
+                return False
+            
+            # Le comptage alimente l'index: la phase 1 ne reparcourt pas l'arborescence
+            series_path = os.path.join(medias, 'series')
+            if checker.collect_symlinks(series_path) is not checker._symlink_index[series_path]:
+                print("❌ Index des liens non réutilisé")
+                return False
+            
+            ok_files, problems = checker.phase1_scan([series_path, os.path.join(medias, 'films')])
+            if len(ok_files) != 3 or [p['status'] for p in problems] != ['BROKEN']:
+                print(f"❌ Résultats phase 1 inattendus: {len(ok_files)} OK, {problems}")
+                return False
+            if len(ok_files) + len(problems) != sum(counts.values()):
+                print(f"❌ Comptes du menu différents des liens vérifiés: {counts}")
+                return False
+        
+        print("✅ Parcours et phase 1 corrects")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur parcours: {e}")
+        return False
+
+def test_iter_symlinks():
+    """Test du parcours diffusé des arborescences (iter_symlinks)"""
+    print("\n🧪 Test du parcours diffusé des liens...")
+    
+    try:
+        import tempfile
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            target = os.path.join(base, 'cible.mkv')
+            with open(target, 'wb') as f:
+                f.write(b'\x01' * 2048)
+            root = os.path.join(base, 'Medias')
+            for directory in ('a', 'illisible', os.path.join('c', 'd')):
+                os.makedirs(os.path.join(root, directory))
+            expected = set()
+            for directory in ('a', 'illisible', os.path.join('c', 'd')):
+                link = os.path.join(root, directory, 'lien.mkv')
+                os.symlink(target, link)
+                if directory != 'illisible':
+                    expected.add(link)
+            # Liens vers des répertoires: jamais suivis (dont une boucle vers la racine)
+            os.symlink(os.path.join(root, 'a'), os.path.join(root, 'c', 'vers_a'))
+            os.symlink(root, os.path.join(root, 'a', 'boucle'))
+            
+            checker = script.AdvancedSymlinkChecker(max_workers=2, cache_path=os.path.join(base, 'cache.db'))
+            list_directory = checker._list_directory
+            listed = []
+            def failing_list(dir_path):
+                listed.append(dir_path)
+                if dir_path.endswith('illisible'):
+                    raise PermissionError(13, 'Permission denied', dir_path)
+                return list_directory(dir_path)
+            checker._list_directory = failing_list
+            
+            walked = list(checker.iter_symlinks([root]))
+            links = {link for _, _, dir_links in walked for link in dir_links}
+            followed = [path for path in listed + sorted(links)
+                        if os.sep + 'vers_a' + os.sep in path or os.sep + 'boucle' + os.sep in path]
+            if followed:
+                print(f"❌ Lien vers un répertoire suivi: {followed}")
+                return False
+            if not expected <= links or any('illisible' in link for link in links):
+                print(f"❌ Liens parcourus inattendus: {sorted(links)}")
+                return False
+            if {root_path for root_path, _, _ in walked} != {root} or len(listed) != 5:
+                print(f"❌ Répertoires listés inattendus: {listed}")
+                return False
+            if list(checker.unreadable_dirs) != [os.path.join(root, 'illisible')]:
+                print(f"❌ Répertoire illisible non signalé: {checker.unreadable_dirs}")
+                return False
+            
+            # Fermeture anticipée: le reste de l'arborescence n'est pas listé
+            wide = os.path.join(base, 'Large')
+            for n in range(60):
+                os.makedirs(os.path.join(wide, f'dossier{n:02d}'))
+            checker._list_directory = lambda dir_path: listed.append(dir_path) or time.sleep(0.02) or list_directory(dir_path)
+            listed.clear()
+            walk = checker.iter_symlinks([wide])
+            next(walk)
+            next(walk)
+            walk.close()
+            listed_at_close = len(listed)
+            time.sleep(0.2)
+            if listed_at_close > 10 or len(listed) != listed_at_close:
+                print(f"❌ Parcours poursuivi après fermeture: {len(listed)} répertoires listés")
+                return False
+            checker.verification_cache.close()
+        
+        print("✅ Parcours diffusé correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur parcours diffusé: {e}")
+        return False
+
+def test_target_listing():
+    """Test de la résolution des cibles par listings groupés"""
+    print("\n🧪 Test des listings des répertoires cibles...")
+    
+    try:
+        import tempfile
+        import threading
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            cibles, liens = os.path.join(base, 'cibles'), os.path.join(base, 'liens')
+            for directory in (cibles, os.path.join(cibles, 'sub'), os.path.join(cibles, 'autre'), liens):
+                os.makedirs(directory)
+            def media(name):
+                with open(os.path.join(cibles, name), 'wb') as f:
+                    f.write(b'\x01' * 2048)
+            def link(name, target):
+                os.symlink(target, os.path.join(liens, name))
+                return os.path.join(liens, name)
+            
+            # Un listing par répertoire, partagé entre threads ; le moins récent évincé
+            index = script.TargetDirectoryIndex(2)
+            listings = []
+            threads = [threading.Thread(target=lambda: listings.append(index.listing(cibles))) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if any(listing is not listings[0] for listing in listings):
+                print("❌ Listing du répertoire cible non partagé")
+                return False
+            index.listing(os.path.join(cibles, 'sub'))
+            index.listing(cibles)
+            index.listing(os.path.join(cibles, 'autre'))
+            if list(index._listings) != [cibles, os.path.join(cibles, 'autre')]:
+                print(f"❌ Éviction LRU incorrecte: {list(index._listings)}")
+                return False
+            
+            checker = script.AdvancedSymlinkChecker(max_workers=1, cache_path=os.path.join(base, 'cache.db'))
+            checker.target_index = script.TargetDirectoryIndex(16)
+            media('a.mkv')
+            first = checker.check_symlink_basic(link('a', os.path.join(cibles, 'a.mkv')))
+            
+            # Cible créée après le listing: stat de repli avant de conclure BROKEN
+            media('b.mkv')
+            stale = checker.check_symlink_basic(link('b', os.path.join(cibles, 'b.mkv')))
+            absent = checker.check_symlink_basic(link('c', os.path.join(cibles, 'c.mkv')))
+            # Cibles relatives, '..' traversant un répertoire lié (normpath se tromperait)
+            relative = checker.check_symlink_basic(link('rel', '../cibles/a.mkv'))
+            os.symlink(os.path.join(cibles, 'sub'), os.path.join(liens, 'via'))
+            dotdot = checker.check_symlink_basic(link('dotdot', 'via/../a.mkv'))
+            statuses = [result['status'] for result in (first, stale, absent, relative, dotdot)]
+            if statuses != ['OK', 'OK', 'BROKEN', 'OK', 'OK']:
+                print(f"❌ Résolution des cibles incorrecte: {statuses}")
+                return False
+            
+            # Verdict en cache: lecture confirmée par access() ; refus des bits de mode vérifié par access()
+            checker.verification_cache.flush()
+            checked = []
+            original_access = script.os.access
+            script.os.access = lambda path, mode: checked.append(path) or original_access(path, mode)
+            try:
+                cached = checker.check_symlink_basic(os.path.join(liens, 'a'))
+                os.chmod(os.path.join(cibles, 'b.mkv'), 0)
+                checker._euid, checker._groups = 54321, set()  # Autre utilisateur: bits de mode refusés
+                checker.rescan_all = True
+                granted = checker.check_symlink_basic(os.path.join(liens, 'b'))
+            finally:
+                script.os.access = original_access
+            if cached['status'] != 'OK' or checked[:1] != [os.path.join(liens, 'a')]:
+                print(f"❌ Verdict en cache non confirmé par access(): {checked}")
+                return False
+            if granted['status'] != 'OK' or os.path.join(liens, 'b') not in checked:
+                print(f"❌ Refus des bits de mode non vérifié par access(): {granted}")
+                return False
+            checker.verification_cache.close()
+        
+        print("✅ Listings des répertoires cibles corrects")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur listings des cibles: {e}")
+        return False
+
+def test_phase1_pipeline():
+    """Test du pipeline producteur/consommateur de la phase 1"""
+    print("\n🧪 Test du pipeline de la phase 1...")
+    
+    try:
+        import tempfile
+        import threading
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            target = os.path.join(base, 'cible.mkv')
+            with open(target, 'wb') as f:
+                f.write(b'\x01' * 2048)
+            medias = os.path.join(base, 'Medias')
+            for directory in ('a', 'b', 'c', 'illisible'):
+                os.makedirs(os.path.join(medias, directory))
+                for n in range(40):
+                    os.symlink(target, os.path.join(medias, directory, f'lien{n}.mkv'))
+            
+            def slow_check(link):
+                time.sleep(0.002)
+                return {'path': link, 'target': target, 'status': 'OK', 'phase': 1, 'size': 2048}
+            
+            def make_checker():
+                checker = script.AdvancedSymlinkChecker(max_workers=2, adaptive=False,
+                                                        cache_path=os.path.join(base, 'cache.db'))
+                checker.check_symlink_basic = slow_check
+                list_directory = checker._list_directory
+                def failing_list(dir_path):
+                    if dir_path.endswith('illisible'):
+                        raise PermissionError(13, 'Permission denied', dir_path)
+                    return list_directory(dir_path)
+                checker._list_directory = failing_list
+                return checker
+            
+            # Vérifications en vol bornées: soumises moins enregistrées <= limite x in_flight_per_worker
+            saved = {key: script.SERVER_CONFIG[key] for key in ('discovery_queue_size', 'in_flight_per_worker')}
+            script.SERVER_CONFIG.update({'discovery_queue_size': 8, 'in_flight_per_worker': 3})
+            original_submit = script.DeadlineExecutor.submit
+            counters = {'submitted': 0, 'recorded': 0, 'peak': 0}
+            def counting_submit(executor, fn, *args, **kwargs):
+                counters['submitted'] += 1
+                counters['peak'] = max(counters['peak'], counters['submitted'] - counters['recorded'])
+                return original_submit(executor, fn, *args, **kwargs)
+            script.DeadlineExecutor.submit = counting_submit
+            try:
+                checker = make_checker()
+                record = checker._record_phase1_result
+                def counting_record(*args, **kwargs):
+                    counters['recorded'] += 1
+                    return record(*args, **kwargs)
+                checker._record_phase1_result = counting_record
+                ok_files, problems = checker.phase1_scan([medias])
+                
+                # Consommateur interrompu: le producteur, bloqué sur la file pleine, s'arrête
+                aborting = make_checker()
+                def abort(*args, **kwargs):
+                    raise RuntimeError("consommateur interrompu")
+                aborting._record_phase1_result = abort
+                try:
+                    aborting.phase1_scan([medias])
+                    print("❌ Interruption du consommateur non propagée")
+                    return False
+                except RuntimeError:
+                    pass
+            finally:
+                script.DeadlineExecutor.submit = original_submit
+                script.SERVER_CONFIG.update(saved)
+            
+            if len(ok_files) != 120 or len(problems):
+                print(f"❌ Liens vérifiés inattendus: {len(ok_files)} OK, {len(problems)} problèmes")
+                return False
+            if counters['peak'] > 2 * 3:
+                print(f"❌ Vérifications en vol au-delà de la limite: {counters['peak']}")
+                return False
+            if checker.stats['phase1_unreadable_dirs'] != 1:
+                print(f"❌ Répertoire illisible non signalé: {checker.unreadable_dirs}")
+                return False
+            
+            deadline = time.monotonic() + 3
+            while any(thread.name == 'symguard-discovery' for thread in threading.enumerate()):
+                if time.monotonic() > deadline:
+                    print("❌ Producteur toujours actif après l'arrêt du consommateur")
+                    return False
+                time.sleep(0.05)
+            checker.verification_cache.close()
+            aborting.verification_cache.close()
+        
+        print("✅ Pipeline de la phase 1 correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur pipeline phase 1: {e}")
+        return False
+
+def test_phase2_parallel():
+    """Test de la phase 2 parallèle (ffprobe simulé)"""
+    print("\n🧪 Test de la phase 2 parallèle...")
+    
+    try:
+        import script
+        checker = script.AdvancedSymlinkChecker(max_workers=1, ffprobe_workers=3, ffprobe_batch=1)
+        # ffprobe simulé: les fichiers "bad" sont corrompus
+        checker.check_ffprobe_validity = lambda path: 'bad' not in path
+        
+        ok_files = [{'path': f'/media/{name}.mkv', 'target': '', 'status': 'OK', 'phase': 1, 'size': 2048}
+                    for name in ['a', 'bad1', 'b', 'c', 'bad2', 'd', 'e']]
+        ok_files.append({'path': '/media/notes.txt', 'target': '', 'status': 'OK', 'phase': 1, 'size': 2048})
+        
+        corrupted = checker.phase2_scan(ok_files)
+        if sorted(f['path'] for f in corrupted) != ['/media/bad1.mkv', '/media/bad2.mkv']:
+            print(f"❌ Fichiers corrompus inattendus: {corrupted}")
+            return False
+        if checker.stats['phase2_analyzed'] != 7:
+            print(f"❌ Nombre analysé inattendu: {checker.stats['phase2_analyzed']}")
+            return False
+        
+        print("✅ Phase 2 parallèle correcte")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur phase 2: {e}")
+        return False
+
+def test_verification_cache():
+    """Test du cache persistant des verdicts"""
+    print("\n🧪 Test du cache de vérification...")
+    
+    try:
+        import tempfile
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            db_path = os.path.join(base, 'cache.db')
+            cache = script.VerificationCache(db_path, max_entries=2)
+            cache.put((1, 11, 4096, 100), 'phase1', 'OK')
+            cache.flush()
+            time.sleep(0.01)
+            cache.put((1, 10, 2048, 100), 'phase1', 'OK')
+            cache.put((1, 10, 2048, 100), 'phase2', 'VALID')
+            cache.put((1, 12, 4096, 100), 'phase1', 'OK')
+            cache.close()
+            
+            # Nouvelle instance: relecture depuis le disque
+            cache = script.VerificationCache(db_path, max_entries=2)
+            if cache.get((1, 10, 2048, 100), 'phase2') != 'VALID':
+                print("❌ Verdict phase 2 non relu")
+                return False
+            if cache.get((1, 10, 2048, 101), 'phase1') is not None:
+                print("❌ Une cible modifiée ne doit pas être en cache")
+                return False
+            if cache.get((1, 11, 4096, 100), 'phase1') is not None:
+                print("❌ L'entrée la plus ancienne aurait dû être évincée")
+                return False
+            cache.close()
+        
+        print("✅ Cache de vérification correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur cache: {e}")
+        return False
+
+def test_incremental_scan():
+    """Test du mode incrémental basé sur le mtime des répertoires"""
+    print("\n🧪 Test du mode incrémental...")
+    
+    try:
+        import tempfile
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            medias = _build_media_tree(base)
+            # mtimes anciens: les répertoires sont mémorisables
+            for root, dirs, files in os.walk(medias):
+                os.utime(root, (1000000000, 1000000000))
+            db_path = os.path.join(base, 'cache.db')
+            
+            def run_scan():
+                checker = script.AdvancedSymlinkChecker(max_workers=2, incremental=True)
+                checker.verification_cache = script.VerificationCache(db_path, 1000)
+                ok_files, problems = checker.phase1_scan([medias])
+                checker.verification_cache.close()
+                return checker, ok_files, problems
+            
+            run_scan()
+            # Une cible disparaît sans que le répertoire du lien ne change
+            os.remove(os.path.join(base, 'storage', 'Film.2020.mp4'))
+            checker, ok_files, problems = run_scan()
+            
+            if checker.verification_cache.hits['directories'] < 5:
+                print(f"❌ Répertoires relistés: {checker.verification_cache.hits}")
+                return False
+            if len(ok_files) != 2 or sorted(p['status'] for p in problems) != ['BROKEN', 'BROKEN']:
+                print(f"❌ Résultats incrémentaux inattendus: {len(ok_files)} OK, {problems}")
+                return False
+        
+        print("✅ Mode incrémental correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur mode incrémental: {e}")
+        return False
+
+def test_mount_down():
+    """Test de la protection des liens vers un montage tombé"""
+    print("\n🧪 Test des montages indisponibles...")
+    
+    try:
+        import tempfile
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            medias = _build_media_tree(base)
+            storage = os.path.join(base, 'storage')
+            
+            # Montage rclone vu lors d'un scan précédent, absent de /proc/mounts
+            cache = script.VerificationCache(os.path.join(base, 'cache.db'), 1000)
+            cache.put_mount(storage, 'fuse.rclone')
+            checker = script.AdvancedSymlinkChecker(max_workers=2)
+            checker.verification_cache = cache
+            checker.mount_health = script.MountHealthChecker(cache, timeout=1, memory_days=7)
+            
+            ok_files, problems = checker.phase1_scan([medias])
+            if ok_files or {p['status'] for p in problems} != {'MOUNT_DOWN'}:
+                print(f"❌ Statuts inattendus: {len(ok_files)} OK, {problems}")
+                return False
+            
+            if checker.delete_files(problems) or len(checker.collect_symlinks(medias)) != 5:
+                print("❌ Des liens vers un montage tombé ont été supprimés")
+                return False
+            
+            # Montage sain au premier sondage puis tombé avant la suppression
+            checker = script.AdvancedSymlinkChecker(max_workers=2)
+            health = script.MountHealthChecker(cache, timeout=1, memory_days=7)
+            health.read_mount_table = lambda: {'/': 'ext4', storage: 'fuse.rclone'}
+            mount_up = [True]
+            health._probe = lambda mount_point: (True, 'ok') if mount_up[0] else (False, 'Transport endpoint is not connected')
+            checker.mount_health = health
+            ok_files, problems = checker.phase1_scan([medias])
+            if [p['status'] for p in problems] != ['BROKEN']:
+                print(f"❌ Statuts inattendus avec montage sain: {list(problems)}")
+                return False
+            
+            mount_up[0] = False
+            problems = list(problems)
+            if checker.delete_files(problems) or problems[0]['status'] != 'MOUNT_DOWN':
+                print(f"❌ Lien d'un montage tombé en cours de scan supprimé: {problems}")
+                return False
+            if checker.stats['phase1_broken'] != 0 or checker.stats['phase1_mount_down'] != 1:
+                print(f"❌ Statistiques non corrigées: {checker.stats['phase1_broken']} BROKEN")
+                return False
+            cache.close()
+        
+        print("✅ Liens vers un montage tombé protégés")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur montages: {e}")
+        return False
+
+def test_check_timeout():
+    """Test du délai par vérification et du remplacement des workers bloqués"""
+    print("\n🧪 Test des vérifications hors délai...")
+    
+    try:
+        import threading
+        import script
+        
+        release = threading.Event()
+        executor = script.DeadlineExecutor(max_workers=1, timeout=0.2)
+        stuck = executor.submit(release.wait)  # Lecture bloquée simulée
+        time.sleep(0.3)
+        executor.expire()
+        
+        try:
+            stuck.result(timeout=1)
+            print("❌ La tâche bloquée aurait dû expirer")
+            return False
+        except script.CheckTimeout:
+            pass
+        
+        # Le worker remplaçant traite la suite malgré le thread toujours bloqué
+        if executor.submit(lambda: 42).result(timeout=1) != 42 or executor.replaced != 1:
+            print("❌ Worker bloqué non remplacé")
+            return False
+        release.set()
+        executor.shutdown()
+        
+        # Exception dans la boucle pendant qu'un worker est bloqué: la sortie n'attend ni lui ni la file
+        blocked = threading.Event()
+        started = time.monotonic()
+        try:
+            with script.DeadlineExecutor(max_workers=1, timeout=30) as executor:
+                queued = [executor.submit(blocked.wait)] + [executor.submit(lambda: 42) for _ in range(5)]
+                time.sleep(0.1)
+                raise KeyboardInterrupt
+        except KeyboardInterrupt:
+            pass
+        if time.monotonic() - started > 2 or not all(future.cancelled() for future in queued[1:]):
+            print("❌ Sortie bloquée par un worker figé ou tâches en file non annulées")
+            return False
+        
+        checker = script.AdvancedSymlinkChecker(max_workers=2, check_timeout=30)
+        checker.check_symlink_basic = lambda link: (blocked.wait() if link == 'figé' else None) or {
+            'path': link, 'target': link, 'status': 'OK', 'phase': 1, 'size': 2048}
+        started = time.monotonic()
+        results = checker.check_links_with_deadline(['figé'] + [f'lien{n}' for n in range(200)])
+        try:
+            for _ in results:
+                raise RuntimeError("consommateur interrompu")
+        except RuntimeError:
+            results.close()
+        if time.monotonic() - started > 2:
+            print("❌ Fermeture du générateur bloquée par un worker figé")
+            return False
+        
+        # --watch: lecture des en-têtes bloquée sur un montage figé -> TIMEOUT en phase 2, lot non bloqué
+        import tempfile
+        with tempfile.TemporaryDirectory() as base:
+            medias = _build_media_tree(base)
+            checker = script.AdvancedSymlinkChecker(max_workers=2, check_timeout=0.3)
+            probe = checker._probe_media_file
+            checker._probe_media_file = lambda path, *args, **kwargs: (
+                blocked.wait() if path.endswith('Film.2020.mp4') else None) or probe(path, *args, **kwargs)
+            daemon = script.WatchDaemon(checker, None, [medias], 'dry-run', 'fast', 'none')
+            links = [os.path.join(medias, 'films', 'Film.2020.mp4'),
+                     os.path.join(medias, 'series', 'Show', 'Season 01', 'Show.S01E01.mkv')]
+            started = time.monotonic()
+            problems = daemon.check_links(links)
+            elapsed = time.monotonic() - started
+        blocked.set()
+        if elapsed > 3:
+            print(f"❌ Lot --watch bloqué par la phase 2 ({elapsed:.1f}s)")
+            return False
+        statuses = {os.path.basename(p['path']): (p['status'], p['phase']) for p in problems}
+        if statuses.get('Film.2020.mp4') != ('TIMEOUT', 2) or checker.stats['phase2_analyzed'] != 2:
+            print(f"❌ Lecture bloquée non signalée en TIMEOUT: {statuses}")
+            return False
+        
+        breaker = script.CircuitBreaker(threshold=2, depth=3)
+        prefix = breaker.prefix('/mnt/rclone/Films/Titre (2020)/titre.mkv')
+        breaker.record_timeout(prefix)
+        if prefix != '/mnt/rclone/Films' or breaker.is_open(prefix) or not breaker.record_timeout(prefix):
+            print(f"❌ Coupe-circuit incorrect pour {prefix}")
+            return False
+        
+        print("✅ Délais et coupe-circuit corrects")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur délais: {e}")
+        return False
+
+def test_container_headers():
+    """Test de la validation native des en-têtes de conteneur"""
+    print("\n🧪 Test de la validation des en-têtes...")
+    
+    try:
+        import io
+        import tempfile
+        import wave
+        import script
+        
+        checker = script.AdvancedSymlinkChecker(max_workers=1)
+        with tempfile.TemporaryDirectory() as base:
+            def write(name, data):
+                path = os.path.join(base, name)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                return checker.check_container_header(path)[0]
+            
+            # EBML minimal (DocType webm) puis Segment de 100 octets
+            ebml = b'\x1a\x45\xdf\xa3\x84\x42\x82\x81\x77'
+            segment = b'\x18\x53\x80\x67\x01' + (100).to_bytes(7, 'big')
+            ftyp = (16).to_bytes(4, 'big') + b'ftypisom' + b'\x00' * 4
+            moov = (16).to_bytes(4, 'big') + b'moov' + b'\x01' * 8
+            riff = b'RIFF' + (1000).to_bytes(4, 'little') + b'AVI ' + b'\x01' * 100
+            # WAV valide terminé par 0,5 s de silence (PCM 16 bits mono 44,1 kHz)
+            buffer = io.BytesIO()
+            with wave.open(buffer, 'wb') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(44100)
+                wav_file.writeframes(b'\x10\x20' * 4410 + b'\x00\x00' * 22050)
+            wav = buffer.getvalue()
+            
+            checks = [
+                ('complet.mkv', ebml + segment + b'\x01' * 100, True),
+                ('tronque.mkv', ebml + segment + b'\x01' * 50, False),
+                ('complet.mp4', ftyp + moov, True),
+                ('sans_moov.mp4', ftyp + (16).to_bytes(4, 'big') + b'mdat' + b'\x01' * 8, False),
+                ('tronque.avi', riff, False),
+                ('zeros.mkv', b'\x00' * 4096, False),
+                ('silence.wav', wav, True),
+                ('padding.ts', b'\x47' * 4096 + b'\x00' * 65536, None),
+                ('inconnu.ts', b'\x47' * 4096, None),
+            ]
+            for name, data, expected in checks:
+                if write(name, data) is not expected:
+                    print(f"❌ Verdict incorrect pour {name} (attendu {expected})")
+                    return False
+        
+        print("✅ En-têtes de conteneur validés correctement")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur en-têtes: {e}")
+        return False
+
+def test_ffprobe_batch():
+    """Test de la phase 2 groupée (ffmpeg multi-entrées simulé)"""
+    print("\n🧪 Test de ffprobe groupé...")
+    
+    try:
+        import sys
+        import tempfile
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            # ffmpeg simulé: décrit les entrées "bon", s'arrête sur la première illisible, reste bloqué sur "bloque"
+            fake_ffmpeg = os.path.join(base, 'ffmpeg')
+            with open(fake_ffmpeg, 'w') as f:
+                f.write(f"""#!{sys.executable}
+import sys, time
+inputs = [arg[5:] for prev, arg in zip(sys.argv, sys.argv[1:]) if prev == '-i']
+for index, path in enumerate(inputs):
+    if 'bloque' in path:
+        sys.stderr.flush()
+        time.sleep(60)
+    if 'mauvais' in path:
+        sys.stderr.write(f"file:{{path}}: Invalid data found when processing input\\n")
+        sys.exit(1)
+    sys.stderr.write(f"Input #{{index}}, matroska,webm, from 'file:{{path}}':\\n")
+    sys.stderr.write(f"  Stream #{{index}}:0(fre): Video: h264 (High), yuv420p\\n")
+sys.stderr.write("At least one output file must be specified\\n")
+sys.exit(1)
+""")
+            os.chmod(fake_ffmpeg, 0o755)
+            
+            checker = script.AdvancedSymlinkChecker(max_workers=1, ffprobe_workers=2, ffprobe_batch=3)
+            checker.ffmpeg_path = fake_ffmpeg
+            checker.check_ffprobe_validity = lambda path: 'mauvais' not in path
+            
+            names = ['bon1', 'mauvais1', 'bon2', 'bon3', 'bon4', 'mauvais2', 'bon5']
+            ok_files = [{'path': os.path.join(base, f'{name}.mkv'), 'target': '', 'status': 'OK',
+                         'phase': 1, 'size': 2048} for name in names]
+            
+            corrupted = checker.phase2_scan(ok_files)
+            if sorted(os.path.basename(f['path']) for f in corrupted) != ['mauvais1.mkv', 'mauvais2.mkv']:
+                print(f"❌ Fichiers corrompus inattendus: {corrupted}")
+                return False
+            if checker.stats['phase2_tiers'].get('ffprobe') != len(names):
+                print(f"❌ Répartition inattendue: {checker.stats['phase2_tiers']}")
+                return False
+            
+            # Lot hors délai: verdicts déjà obtenus conservés, entrée bloquée en TIMEOUT, reprise après elle
+            saved_timeout = script.SERVER_CONFIG['ffprobe_file_timeout']
+            script.SERVER_CONFIG['ffprobe_file_timeout'] = 0.5
+            try:
+                probed = []
+                checker.check_ffprobe_validity = lambda path: probed.append(path) or 'mauvais' not in path
+                names = ['bon1', 'bon2', 'bloque', 'bon3', 'mauvais3']
+                verdicts = checker.check_ffprobe_batch([os.path.join(base, f'{name}.mkv') for name in names])
+                verdicts = {os.path.basename(path)[:-4]: valid for path, valid in verdicts.items()}
+                if verdicts != {'bon1': True, 'bon2': True, 'bloque': None, 'bon3': True, 'mauvais3': False}:
+                    print(f"❌ Verdicts du lot hors délai incorrects: {verdicts}")
+                    return False
+                if probed:
+                    print(f"❌ Fichiers du lot revérifiés un par un: {probed}")
+                    return False
+                
+                checker = script.AdvancedSymlinkChecker(max_workers=1, ffprobe_workers=2, ffprobe_batch=3)
+                checker.ffmpeg_path = fake_ffmpeg
+                checker.check_ffprobe_validity = lambda path: 'mauvais' not in path
+                ok_files = [{'path': os.path.join(base, f'{name}.mkv'), 'target': '', 'status': 'OK',
+                             'phase': 1, 'size': 2048} for name in ('bon1', 'bloque', 'bon2')]
+                problems = checker.phase2_scan(ok_files)
+            finally:
+                script.SERVER_CONFIG['ffprobe_file_timeout'] = saved_timeout
+            if [(os.path.basename(p['path']), p['status']) for p in problems] != [('bloque.mkv', 'TIMEOUT')]:
+                print(f"❌ Fichier bloqué non signalé en TIMEOUT: {problems}")
+                return False
+            if checker.stats['phase2_corrupted'] or checker.stats['phase2_timeout'] != 1:
+                print(f"❌ Fichier bloqué compté comme corrompu: {checker.stats['phase2_corrupted']}")
+                return False
+        
+        opened, media = script._parse_ffmpeg_inputs(
+            "Input #0, mp3, from 'a':\n  Stream #0:0: Audio: mp3\n"
+            "Input #1, mov, from 'b':\n  Stream #1:0[0x1](und): Data: none\n")
+        if opened != {0, 1} or media != {0}:
+            print(f"❌ Analyse de la sortie ffmpeg incorrecte: {opened}, {media}")
+            return False
+        
+        print("✅ ffprobe groupé correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur ffprobe groupé: {e}")
+        return False
+
+def test_asyncio_engine():
+    """Test du moteur asyncio (phases 1 et 2 dans une seule boucle)"""
+    print("\n🧪 Test du moteur asyncio...")
+    
+    try:
+        import tempfile
+        import script
+        checker = script.AdvancedSymlinkChecker(max_workers=2, ffprobe_workers=2)
+        
+        with tempfile.TemporaryDirectory() as base:
+            medias = _build_media_tree(base)
+            engine = script.AsyncScanEngine(checker)
+            
+            # Cibles remplies de zéros: corrompues dès la validation des en-têtes
+            ok_files, problems, corrupted = engine.scan([medias], 'fast')
+            if len(ok_files) != 3 or [p['status'] for p in problems] != ['BROKEN']:
+                print(f"❌ Résultats phase 1 inattendus: {len(ok_files)} OK, {problems}")
+                return False
+            if len(corrupted) != 3 or checker.stats['phase2_tiers'].get('header') != 3:
+                print(f"❌ Résultats phase 2 inattendus: {corrupted}")
+                return False
+        
+        print("✅ Moteur asyncio correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur moteur asyncio: {e}")
+        return False
+
+def test_concurrency_controller():
+    """Test de l'ajustement de la concurrence selon la latence et la charge"""
+    print("\n🧪 Test de la concurrence adaptative...")
+    
+    try:
+        import script
+        interval = script.SERVER_CONFIG['adjust_interval']
+        script.SERVER_CONFIG['adjust_interval'] = 0
+        try:
+            controller = script.ConcurrencyController('test', initial=4, minimum=2, maximum=6, latency_floor=0.01)
+            load = {'value': 0.1}
+            controller._load_per_cpu = lambda: load['value']
+            controller._iowait = lambda: 0.0
+            
+            # Machine au repos, latence stable: un worker de plus par intervalle jusqu'au plafond
+            for _ in range(5):
+                for _ in range(controller.limit):
+                    controller.record(0.02)
+                controller.adjust()
+            if controller.limit != 6:
+                print(f"❌ Limite attendue au plafond: {controller.limit}")
+                return False
+            
+            # Latence doublée: réduction d'un quart
+            for _ in range(6):
+                controller.record(0.05)
+            if controller.adjust() != 4:
+                print(f"❌ Réduction sur latence attendue: {controller.limit}")
+                return False
+            
+            # Charge élevée (Plex qui transcode): réduction jusqu'au plancher
+            load['value'] = 3.0
+            controller.adjust()
+            controller.adjust()
+            if controller.limit != 2:
+                print(f"❌ Réduction sur charge attendue: {controller.limit}")
+                return False
+        finally:
+            script.SERVER_CONFIG['adjust_interval'] = interval
+        
+        print("✅ Concurrence adaptative correcte")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur concurrence adaptative: {e}")
+        return False
+
+def test_result_store():
+    """Test du stockage compact des résultats de phase 1"""
+    print("\n🧪 Test du stockage compact des résultats...")
+    
+    try:
+        import script
+        records = [
+            {'path': '/medias/films/Film.mkv', 'target': '/mnt/films/Film.mkv', 'status': 'OK', 'phase': 1, 'size': 4096},
+            {'path': '/medias/films/Autre.mkv', 'target': '../stock/autre.mkv', 'status': 'BROKEN', 'phase': 1, 'size': 0},
+            {'path': '/medias/films/Lent.mkv', 'target': '', 'status': 'TIMEOUT', 'phase': 1, 'size': 0,
+             'error': 'délai de 30s dépassé'},
+            {'path': '/medias/series/E01.mkv', 'target': '/mnt/series/E01.mkv', 'status': 'MOUNT_DOWN', 'phase': 1,
+             'size': 0, 'mount': '/mnt/series'},
+        ]
+        store = script.ResultStore.from_records(records)
+        
+        if list(store) != records or store[2] != records[2]:
+            print(f"❌ Enregistrements reconstruits incorrects: {list(store)}")
+            return False
+        if store.path(3) != '/medias/series/E01.mkv' or store.status(1) != 'BROKEN':
+            print("❌ Accès par colonne incorrect")
+            return False
+        if store.status_counts() != {'OK': 1, 'BROKEN': 1, 'TIMEOUT': 1, 'MOUNT_DOWN': 1}:
+            print(f"❌ Comptage par statut incorrect: {store.status_counts()}")
+            return False
+        # Le répertoire commun n'est stocké qu'une fois
+        if store._dirs.count('/medias/films') != 1:
+            print("❌ Répertoires non internés")
+            return False
+        
+        print("✅ Stockage compact correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur stockage compact: {e}")
+        return False
+
+def test_streaming_report():
+    """Test du rapport NDJSON écrit au fil du scan"""
+    print("\n🧪 Test du rapport en flux...")
+    
+    try:
+        import tempfile
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            report_file = os.path.join(base, 'symlink_report_test.ndjson')
+            report = script.ReportWriter(report_file, 'real')
+            report.problem({'path': '/medias/a.mkv', 'target': '/mnt/a.mkv', 'status': 'BROKEN', 'phase': 1, 'size': 0})
+            
+            # Lisible avant la fin (arrêt brutal): en-tête + problème, sans pied
+            entries = list(script.read_report(report_file))
+            if [e['type'] for e in entries] != ['header', 'problem']:
+                print(f"❌ Rapport partiel incorrect: {entries}")
+                return False
+            
+            report.deleted({'path': '/medias/a.mkv', 'target': '/mnt/a.mkv', 'status': 'BROKEN', 'size': 0})
+            report.close('real', {'total_analyzed': 1})
+            
+            # Une ligne tronquée en fin de fichier est ignorée
+            with open(report_file, 'a') as f:
+                f.write('{"type": "problem", "path": "/med')
+            entries = list(script.read_report(report_file))
+            if [e['type'] for e in entries] != ['header', 'problem', 'deleted', 'footer']:
+                print(f"❌ Rapport complet incorrect: {entries}")
+                return False
+            if entries[-1]['statistics'] != {'total_analyzed': 1} or entries[-1]['problems'] != 1:
+                print(f"❌ Pied de rapport incorrect: {entries[-1]}")
+                return False
+        
+        print("✅ Rapport en flux correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur rapport en flux: {e}")
+        return False
+
+def test_checkpoint_resume():
+    """Test du point de reprise et de --resume"""
+    print("\n🧪 Test du point de reprise...")
+    
+    try:
+        import sqlite3
+        import tempfile
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            medias = _build_media_tree(base)
+            db_path = os.path.join(base, 'checkpoint.db')
+            repaired_target = os.path.join(base, 'storage', 'Repare.2021.mkv')
+            os.symlink(repaired_target, os.path.join(medias, 'films', 'Repare.2021.mkv'))
+            
+            checker = script.AdvancedSymlinkChecker(max_workers=2)
+            checker.checkpoint = script.ScanCheckpoint(db_path, interval=0)
+            checker.checkpoint.start({'paths': [medias], 'depth': 'fast', 'phase': 'phase1', 'mode': 'dry-run',
+                                      'started': script.datetime.now().isoformat()})
+            checker.phase1_scan([medias])
+            checker.checkpoint.close()
+            
+            # Cible rétablie après l'interruption: le BROKEN enregistré ne doit pas être supprimé
+            with open(repaired_target, 'wb') as f:
+                f.write(b'\x01' * 4096)
+            
+            # Interruption simulée pendant la phase 1, avant la fin du répertoire de la saison
+            season = os.path.join(medias, 'series', 'Show', 'Season 01')
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("DELETE FROM done_dirs WHERE path = ?", (season,))
+                conn.execute("""UPDATE meta SET value = '"phase1"' WHERE key = 'phase'""")
+            
+            checkpoint = script.ScanCheckpoint(db_path, interval=0)
+            resumed = script.AdvancedSymlinkChecker(max_workers=2)
+            resumed.checkpoint = checkpoint
+            resumed.resume_meta = checkpoint.load()
+            checked = []
+            original_check = resumed.check_symlink_basic
+            resumed.check_symlink_basic = lambda path: checked.append(path) or original_check(path)
+            
+            ok_files, problems = resumed.phase1_scan(resumed.resume_meta['paths'])
+            films = os.path.join(medias, 'films')
+            if sorted(os.path.dirname(path) for path in checked) != [films] + [season] * 3:
+                print(f"❌ Liens revérifiés inattendus: {checked}")
+                return False
+            if len(ok_files) != 4 or [p['status'] for p in problems] != ['BROKEN']:
+                print(f"❌ Résultats repris incorrects: {len(ok_files)} OK, {list(problems)}")
+                return False
+            
+            # Phase 2: un verdict valide enregistré est repris, un verdict CORRUPTED est resondé
+            film = os.path.join(medias, 'films', 'Film.2020.mp4')
+            repaired = os.path.join(films, 'Repare.2021.mkv')
+            checkpoint.add_phase2(film, None)
+            checkpoint.add_phase2(repaired, {'path': repaired, 'status': 'CORRUPTED', 'error': 'ancien verdict'})
+            checkpoint.flush()
+            corrupted = resumed.phase2_scan(ok_files, use_ffprobe=False)
+            tiers = resumed.stats['phase2_tiers']
+            if tiers.get('resumed') != 1 or tiers.get('undecided') != 1 or resumed.stats['phase2_analyzed'] != 4:
+                print(f"❌ Reprise de la phase 2 incorrecte: {tiers}")
+                return False
+            if repaired in [c['path'] for c in corrupted]:
+                print("❌ Verdict CORRUPTED enregistré repris sans nouvelle vérification")
+                return False
+            
+            # Point de reprise en dry-run refusé en mode réel ; trop ancien refusé
+            if resumed.validate_resume('real') or not resumed.validate_resume('dry-run'):
+                print("❌ Mode du point de reprise non contrôlé")
+                return False
+            resumed.resume_meta['updated'] = '2020-01-01T00:00:00'
+            if resumed.validate_resume('dry-run'):
+                print("❌ Point de reprise trop ancien accepté")
+                return False
+            
+            checkpoint.clear()
+            if os.path.exists(db_path):
+                print("❌ Point de reprise non supprimé")
+                return False
+        
+        print("✅ Point de reprise correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur point de reprise: {e}")
+        return False
+
+def test_watch_mode():
+    """Test du mode --watch (inotify)"""
+    print("\n🧪 Test du mode --watch...")
+    
+    try:
+        import glob
+        import tempfile
+        import script
+        
+        existing_logs = set(glob.glob('deleted_files_*.log'))
+        try:
+            inotify = script.InotifyWatcher()
+        except OSError as e:
+            print(f"⚠️ inotify indisponible, test ignoré: {e}")
+            return True
+        
+        with tempfile.TemporaryDirectory() as base:
+            medias = _build_media_tree(base)
+            checker = script.AdvancedSymlinkChecker(max_workers=2)
+            daemon = script.WatchDaemon(checker, inotify, [medias], 'real', 'basic', 'none')
+            daemon.batch_seconds = 0
+            
+            # Cible encore trop petite au scan initial
+            growing = os.path.join(base, 'storage', 'Show.S01E05.mkv')
+            with open(growing, 'wb') as f:
+                f.write(b'\x01' * 100)
+            os.symlink(growing, os.path.join(medias, 'series', 'Show', 'Season 01', 'Show.S01E05.mkv'))
+            
+            try:
+                # Scan initial: le lien cassé existant est supprimé sans confirmation
+                daemon.start()
+                season = os.path.join(medias, 'series', 'Show', 'Season 01')
+                if os.path.lexists(os.path.join(season, 'Show.S01E03.mkv')):
+                    print("❌ Lien cassé du scan initial non supprimé")
+                    return False
+                
+                # Nouveaux liens cassés, dont un dans un répertoire créé après le démarrage
+                os.symlink(os.path.join(base, 'absent2.mkv'), os.path.join(season, 'Show.S01E04.mkv'))
+                season2 = os.path.join(medias, 'series', 'Show', 'Season 02')
+                os.makedirs(season2)
+                os.symlink(os.path.join(base, 'absent3.mkv'), os.path.join(season2, 'Show.S02E01.mkv'))
+                os.symlink(os.path.join(base, 'storage', 'Film.2020.mp4'), os.path.join(season2, 'Show.S02E02.mkv'))
+                
+                deadline = time.time() + 5
+                while time.time() < deadline and (os.path.lexists(os.path.join(season, 'Show.S01E04.mkv'))
+                                                  or os.path.lexists(os.path.join(season2, 'Show.S02E01.mkv'))):
+                    daemon.poll(timeout=0.2)
+                
+                if os.path.lexists(os.path.join(season, 'Show.S01E04.mkv')) or \
+                   os.path.lexists(os.path.join(season2, 'Show.S02E01.mkv')):
+                    print("❌ Nouveaux liens cassés non traités")
+                    return False
+                if not os.path.lexists(os.path.join(season2, 'Show.S02E02.mkv')):
+                    print("❌ Lien valide supprimé")
+                    return False
+                if checker.stats['files_deleted'] != 4:
+                    print(f"❌ Suppressions comptées: {checker.stats['files_deleted']}")
+                    return False
+                
+                # Cible complétée après le scan initial: le nouveau lien voit sa taille actuelle
+                with open(growing, 'ab') as f:
+                    f.write(b'\x01' * 200000)
+                relinked = os.path.join(season, 'Show.S01E06.mkv')
+                os.symlink(growing, relinked)
+                batches = daemon.batches
+                deadline = time.time() + 5
+                while time.time() < deadline and daemon.batches == batches:
+                    daemon.poll(timeout=0.2)
+                if daemon.batches == batches or not os.path.lexists(relinked):
+                    print("❌ Cible agrandie vue avec sa taille du scan initial")
+                    return False
+            finally:
+                inotify.close()
+                for log in set(glob.glob('deleted_files_*.log')) - existing_logs:
+                    os.remove(log)
+        
+        print("✅ Mode --watch correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur mode --watch: {e}")
+        return False
+
+def test_non_interactive():
+    """Test du mode non interactif (--yes, --select, --depth)"""
+    print("\n🧪 Test du mode non interactif...")
+    
+    try:
+        import subprocess
+        import tempfile
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            medias = _build_media_tree(base)
+            checker = script.AdvancedSymlinkChecker(max_workers=2)
+            
+            # 'all' ne compte pas les liens
+            def no_counting(path):
+                raise AssertionError("comptage des liens inattendu")
+            checker.list_directories_with_counts = no_counting
+            selected = checker.select_directories(medias, 'all')
+            if selected != [os.path.join(medias, 'films'), os.path.join(medias, 'series')]:
+                print(f"❌ Sélection 'all' incorrecte: {selected}")
+                return False
+            
+            # Sélections par numéro ou par taille: menu trié par nombre de liens
+            del checker.list_directories_with_counts
+            if checker.select_directories(medias, '1') != [os.path.join(medias, 'series')]:
+                print("❌ Sélection par numéro incorrecte")
+                return False
+            if checker.select_directories(medias, 'big') or checker.select_directories(medias, 'x,y'):
+                print("❌ Sélection vide ou invalide acceptée")
+                return False
+            
+            # Exécution complète sans aucune entrée (stdin fermé)
+            env = dict(os.environ, HOME=base)
+            result = subprocess.run(
+                [sys.executable, os.path.abspath('script.py'), medias, '--yes', '--real', '--select', 'all',
+                 '--depth', 'basic', '--no-media-scan', '--no-update-check'],
+                cwd=base, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, timeout=60)
+            output = result.stdout.decode('utf-8', 'replace')
+            if result.returncode != 0:
+                print(f"❌ Code retour {result.returncode}:\n{output[-500:]}")
+                return False
+            if os.path.lexists(os.path.join(medias, 'series', 'Show', 'Season 01', 'Show.S01E03.mkv')):
+                print("❌ Lien cassé non supprimé avec --yes --real")
+                return False
+            if 'Analyse des répertoires' in output:
+                print("❌ Comptage des liens effectué malgré --select all")
+                return False
+        
+        print("✅ Mode non interactif correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur mode non interactif: {e}")
+        return False
+
+def test_cached_link_counts():
+    """Test des comptes de liens mémorisés pour le menu de sélection"""
+    print("\n🧪 Test des comptes de liens mémorisés...")
+    
+    try:
+        import tempfile
+        import script
+        
+        with tempfile.TemporaryDirectory() as base:
+            cache_path = os.path.join(base, 'cache.db')
+            medias = _build_media_tree(base)
+            
+            # Un scan mémorise les comptes de ses racines et de leurs sous-répertoires directs
+            checker = script.AdvancedSymlinkChecker(max_workers=2, cache_path=cache_path)
+            checker.phase1_scan([medias])
+            checker.verification_cache.close()
+            if not os.path.exists(cache_path):
+                print(f"❌ Cache écrit ailleurs que dans {cache_path}")
+                return False
+            
+            checker = script.AdvancedSymlinkChecker(max_workers=2, cache_path=cache_path)
+            walked = []
+            original_index = checker.index_symlinks
+            checker.index_symlinks = lambda paths: walked.extend(paths) or original_index(paths)
+            counts = checker.list_directories_with_counts(medias)
+            if counts != {'series': 3, 'films': 1} or walked:
+                print(f"❌ Comptes mémorisés non utilisés: {counts}, parcours {walked}")
+                return False
+            if set(checker.link_count_ages) != {'series', 'films'}:
+                print(f"❌ Âge des comptes absent: {checker.link_count_ages}")
+                return False
+            
+            # Rafraîchissement en arrière-plan pour le prochain affichage
+            checker._count_refresh.join(10)
+            os.symlink(os.path.join(base, 'absent.mkv'), os.path.join(medias, 'films', 'Nouveau.mkv'))
+            checker.start_count_refresh([os.path.join(medias, 'films')])
+            checker._count_refresh.join(10)
+            films = os.path.join(medias, 'films')
+            if checker.verification_cache.get_link_counts([films])[films][0] != 2:
+                print("❌ Comptes non rafraîchis en arrière-plan")
+                return False
+            
+            # Nouveau répertoire: compté avant l'affichage
+            os.makedirs(os.path.join(medias, 'docs'))
+            counts = checker.list_directories_with_counts(medias)
+            if counts.get('docs') != 0 or set(walked) != {os.path.join(medias, 'docs')} or 'docs' in checker.link_count_ages:
+                print(f"❌ Nouveau répertoire mal compté: {counts}, parcours {walked}")
+                return False
+            checker.stop_count_refresh()
+            checker.verification_cache.close()
+        
+        print("✅ Comptes de liens mémorisés corrects")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur comptes de liens: {e}")
+        return False
+
+def test_arr_refresh_batched():
+    """Test du rafraîchissement Sonarr/Radarr indexé et groupé"""
+    print("\n🧪 Test du rafraîchissement groupé Sonarr/Radarr...")
+    
+    try:
+        import script
+        
+        libraries = {
+            'series': [{'id': 1, 'title': 'Breaking Bad', 'year': 2008, 'path': '/tv/Breaking Bad'},
+                       {'id': 2, 'title': 'The Office (US)', 'year': 2005, 'path': '/tv/The Office (US)'},
+                       {'id': 3, 'title': 'Dark', 'year': 2017, 'path': '/tv/Dark'}],
+            'movie': [{'id': 7, 'title': 'Dune', 'year': 1984, 'path': '/films/Dune (1984)'},
+                      {'id': 8, 'title': 'Dune', 'year': 2021, 'path': '/films/Dune (2021)'}],
+        }
+        checker = script.AdvancedSymlinkChecker(max_workers=2)
+        checker.get_service_url_and_key = lambda service: (f'http://{service}', 'key')
+        checker.session = _FakeArrSession(libraries)
+        
+        deleted = [{'path': f'/m/series/Breaking.Bad.S01E0{n}.mkv'} for n in range(1, 4)]
+        deleted += [{'path': '/m/series/The.Office.S02E01.mkv'},
+                    {'path': '/m/films/Dune.2021.1080p.mkv'},
+                    {'path': '/m/films/Inconnu.1999.720p.mkv'}]
+        results = checker.notify_media_servers_individual(deleted)
+        
+        commands = checker.session.commands
+        if commands != [{'name': 'RefreshSeries', 'seriesIds': [1, 2]}, {'name': 'RefreshMovie', 'movieIds': [8]}]:
+            print(f"❌ Commandes inattendues: {commands}")
+            return False
+        if results['sonarr_series_refreshed'] != 2 or results['radarr_movies_refreshed'] != 1:
+            print(f"❌ Résultats inattendus: {results}")
+            return False
+        
+        # Bibliothèques indexées une seule fois ; liste ignorée par le serveur: commande annulée, un par commande
+        checker.session = _FakeArrSession(libraries, bulk=False)
+        checker.notify_media_servers_individual(deleted[:4])
+        library_gets = [url for url in checker.session.gets if '/api/v3/command' not in url]
+        if library_gets or checker.session.commands != [{'name': 'RefreshSeries', 'seriesIds': [1, 2]},
+                                                         {'name': 'RefreshSeries', 'seriesId': 1},
+                                                         {'name': 'RefreshSeries', 'seriesId': 2}]:
+            print(f"❌ Repli unitaire incorrect: {library_gets} {checker.session.commands}")
+            return False
+        if checker.session.deleted != [1]:
+            print(f"❌ Commande globale non annulée: {checker.session.deleted}")
+            return False
+        
+        # Sonarr v3: forme groupée jamais envoyée
+        checker = script.AdvancedSymlinkChecker(max_workers=2)
+        checker.get_service_url_and_key = lambda service: (f'http://{service}', 'key')
+        checker.session = _FakeArrSession(libraries, bulk=False, version='3.0.10.1567')
+        checker.notify_media_servers_individual(deleted[:4])
+        if checker.session.commands != [{'name': 'RefreshSeries', 'seriesId': 1},
+                                        {'name': 'RefreshSeries', 'seriesId': 2}]:
+            print(f"❌ Forme groupée envoyée à Sonarr v3: {checker.session.commands}")
+            return False
+        
+        print("✅ Rafraîchissement groupé correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur rafraîchissement groupé: {e}")
+        return False
+
+def test_arr_path_matching():
+    """Test du rattachement des fichiers supprimés aux dossiers Sonarr/Radarr"""
+    print("\n🧪 Test du rattachement par chemin...")
+    
+    try:
+        import script
+        
+        index = script.ArrLibraryIndex([
+            {'id': 1, 'title': 'Show', 'path': '/tv/Show'},
+            {'id': 2, 'title': 'Show 2', 'path': '/tv/Show 2'},
+            {'id': 3, 'title': 'Show.Extra', 'path': '/tv/Show.Extra'},
+            {'id': 4, 'title': 'Other', 'path': '/tv/Other/'},
+        ])
+        cases = {
+            '/tv/Show/Season 01/Show.S01E01.mkv': 1,
+            '/tv/Show 2/Season 01/x.mkv': 2,
+            '/tv/Show.Extra/x.mkv': 3,
+            '/tv/Other/x.mkv': 4,
+            '/tv/Sho/x.mkv': None,
+            '/films/Show/x.mkv': None,
+        }
+        for path, expected in cases.items():
+            if index.find_path(path) != expected:
+                print(f"❌ {path}: {index.find_path(path)} au lieu de {expected}")
+                return False
+        
+        # Notification: le dossier désigne le bon élément, même si le nom du fichier est trompeur
+        libraries = {
+            'series': [{'id': 1, 'title': 'Dark', 'path': '/tv/Dark'},
+                       {'id': 2, 'title': 'Dark Matter', 'path': '/tv/Dark Matter'}],
+            'movie': [{'id': 7, 'title': 'Dune', 'year': 2021, 'path': '/films/Dune (2021)'}],
+        }
+        checker = script.AdvancedSymlinkChecker(max_workers=2)
+        checker.get_service_url_and_key = lambda service: (f'http://{service}', 'key')
+        checker.media_config['radarr']['path_mappings'] = {'/home/user/Medias/films': '/films'}
+        checker.session = _FakeArrSession(libraries)
+        deleted = [{'path': '/tv/Dark Matter/Season 1/Dark.S01E01.mkv'},
+                   {'path': '/tv/Dark Matter/Season 1/Dark.S01E02.mkv'},
+                   {'path': '/home/user/Medias/films/Dune (2021)/film.mkv'}]
+        checker.notify_media_servers_individual(deleted)
+        if checker.session.commands != [{'name': 'RefreshSeries', 'seriesIds': [2]},
+                                        {'name': 'RefreshMovie', 'movieIds': [7]}]:
+            print(f"❌ Commandes inattendues: {checker.session.commands}")
+            return False
+        
+        print("✅ Rattachement par chemin correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur rattachement par chemin: {e}")
+        return False
+
+def test_media_scans_concurrent():
+    """Test des scans des serveurs média simultanés avec suivi des commandes"""
+    print("\n🧪 Test des scans serveurs média simultanés...")
+    
+    try:
+        import script
+        
+        limiter = script.RateLimiter(20)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.wait()
+        if time.monotonic() - start < 0.19:
+            print("❌ Limiteur de débit sans effet")
+            return False
+        
+        saved = {key: script.SERVER_CONFIG[key] for key in ('arr_poll_interval', 'arr_requests_per_second')}
+        script.SERVER_CONFIG.update({'arr_poll_interval': 0.01, 'arr_requests_per_second': 1000})
+        try:
+            checker = script.AdvancedSymlinkChecker(max_workers=2)
+            lookups = []
+            
+            def credentials(service):
+                lookups.append(service)
+                if service in ('sonarr', 'radarr'):
+                    return f'http://{service}', 'key'
+                return f'http://{service}', None
+            
+            checker.get_service_url_and_key = credentials
+            checker.session = _FakeArrSession(latency=0.2)
+            start = time.monotonic()
+            results = checker.trigger_media_scans()
+            elapsed = time.monotonic() - start
+        finally:
+            script.SERVER_CONFIG.update(saved)
+        
+        if sorted(lookups) != sorted(script.MEDIA_SCAN_COMMANDS):
+            print(f"❌ Configuration résolue plusieurs fois: {lookups}")
+            return False
+        if elapsed > 0.7:
+            print(f"❌ Services traités l'un après l'autre ({elapsed:.2f}s)")
+            return False
+        states = results['sonarr']['command_states']
+        if results['sonarr']['status'] != 'success' or set(states.values()) != {'completed'} or len(states) != 2:
+            print(f"❌ Suivi des commandes incorrect: {results['sonarr']}")
+            return False
+        if results['bazarr']['status'] != 'no_api_key':
+            print(f"❌ Service sans clé mal traité: {results['bazarr']}")
+            return False
+        
+        print("✅ Scans simultanés corrects")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur scans simultanés: {e}")
+        return False
+
+def test_media_config_store():
+    """Test de la configuration des serveurs média mémorisée"""
+    print("\n🧪 Test de la configuration mémorisée...")
+    
+    try:
+        import json
+        import tempfile
+        import script
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = os.path.join(tmp, '.symguard_config.json')
+            with open(config_file, 'w') as f:
+                json.dump({'sonarr': {'url': 'http://sonarr:8989', 'api_key': 'sonarr-key-123'},
+                           'radarr': {'url': 'http://radarr:7878'}}, f)
+            os.chmod(config_file, 0o640)
+            
+            checker = script.AdvancedSymlinkChecker(max_workers=1)
+            checker.config_store = script.MediaConfigStore(config_file, check_interval=0)
+            checker.media_config = checker.load_media_config()
+            
+            opened = []
+            detections = []
+            
+            def counting_open(path, *args, **kwargs):
+                opened.append(path)
+                return open(path, *args, **kwargs)
+            
+            def read_api_key(service):
+                detections.append(service)
+                return 'radarr-detected-key' if service == 'radarr' else None
+            
+            checker._read_api_key = read_api_key
+            script.open = counting_open
+            try:
+                for _ in range(3):
+                    lookups = {service: checker.get_service_url_and_key(service)
+                               for service in script.MEDIA_SCAN_COMMANDS}
+            finally:
+                del script.open
+            
+            if lookups['sonarr'] != ('http://sonarr:8989', 'sonarr-key-123'):
+                print(f"❌ Configuration mal fusionnée: {lookups['sonarr']}")
+                return False
+            if lookups['radarr'] != ('http://radarr:7878', 'radarr-detected-key'):
+                print(f"❌ Clé détectée non utilisée: {lookups['radarr']}")
+                return False
+            if opened:
+                print(f"❌ Fichiers relus à chaque recherche: {opened}")
+                return False
+            if sorted(detections) != ['bazarr', 'prowlarr', 'radarr']:
+                print(f"❌ Détection des clés répétée: {detections}")
+                return False
+            
+            # Clé détectée écrite de façon atomique, droits conservés, sans fichier temporaire
+            with open(config_file) as f:
+                saved = json.load(f)
+            if saved['radarr']['api_key'] != 'radarr-detected-key' or saved['sonarr']['api_key'] != 'sonarr-key-123':
+                print(f"❌ Sauvegarde incorrecte: {saved}")
+                return False
+            if os.listdir(tmp) != ['.symguard_config.json'] or os.stat(config_file).st_mode & 0o777 != 0o640:
+                print(f"❌ Écriture non atomique: {os.listdir(tmp)}")
+                return False
+            
+            # Fichier modifié par l'utilisateur: rechargé dans le même dictionnaire
+            saved['sonarr']['url'] = 'http://sonarr.local:8989'
+            with open(config_file, 'w') as f:
+                json.dump(saved, f, indent=4)
+            config = checker.load_media_config()
+            if config is not checker.media_config or checker.media_config['sonarr']['url'] != 'http://sonarr.local:8989':
+                print("❌ Modification du fichier ignorée")
+                return False
+            if checker.config_store.detected_keys:
+                print("❌ Clés détectées conservées après rechargement")
+                return False
+        
+        print("✅ Configuration mémorisée correcte")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur configuration mémorisée: {e}")
+        return False
+
+def test_command_tracking():
+    """Test du suivi des commandes envoyées aux serveurs média"""
+    print("\n🧪 Test du suivi des commandes média...")
+    
+    try:
+        import tempfile
+        import script
+        
+        saved = {key: script.SERVER_CONFIG[key]
+                 for key in ('arr_poll_interval', 'arr_poll_max_interval', 'arr_requests_per_second')}
+        script.SERVER_CONFIG.update({'arr_poll_interval': 0.01, 'arr_poll_max_interval': 0.04,
+                                     'arr_requests_per_second': 1000})
+        try:
+            checker = script.AdvancedSymlinkChecker(max_workers=2)
+            checker.get_service_url_and_key = lambda service: (
+                (f'http://{service}', 'key') if service in ('sonarr', 'radarr') else (f'http://{service}', None))
+            checker.session = _FakeArrSession(failing={'RescanMovie'})
+            checker.trigger_media_scans()
+            
+            # Commande qui n'aboutit pas avant le délai: comptée en cours, pas en échec
+            checker.command_tracker.record('sonarr', 'http://sonarr', {}, 99, 'Commande lente')
+            checker.session.commands += [{'name': 'Pad'}] * (99 - len(checker.session.commands))
+            checker._wait_for_commands('sonarr', timeout=0)
+        finally:
+            script.SERVER_CONFIG.update(saved)
+        
+        per_command = [url for url in checker.session.gets if '/api/v3/command/' in url]
+        if per_command:
+            print(f"❌ Relevés commande par commande au lieu de groupés: {per_command}")
+            return False
+        
+        summary = checker.command_tracker.summary()
+        sonarr, radarr = summary['sonarr'], summary['radarr']
+        if (sonarr['commands'], sonarr['completed'], sonarr['pending'], sonarr['failed']) != (3, 2, 1, []):
+            print(f"❌ Suivi Sonarr incorrect: {sonarr}")
+            return False
+        if radarr['completed'] != 1 or [f['state'] for f in radarr['failed']] != ['failed']:
+            print(f"❌ Échec Radarr non signalé: {radarr}")
+            return False
+        if radarr['latency_max'] is None or radarr['latency_avg'] > radarr['latency_max']:
+            print(f"❌ Latences incorrectes: {radarr}")
+            return False
+        
+        # Latences et échecs repris dans le pied du rapport
+        with tempfile.TemporaryDirectory() as tmp:
+            checker.report = script.ReportWriter(os.path.join(tmp, 'report.ndjson'), 'dry-run')
+            report_file = checker.save_full_report('dry-run')
+            footer = [entry for entry in script.read_report(report_file) if entry['type'] == 'footer'][0]
+        if footer['statistics'].get('media_commands') != summary:
+            print(f"❌ Suivi absent du rapport: {footer['statistics'].get('media_commands')}")
+            return False
+        
+        # --watch: relevé sans attente à chaque lot, commandes terminées oubliées, purgées non comptées en échec
+        checker = script.AdvancedSymlinkChecker(max_workers=2)
+        checker.session = _FakeArrSession()
+        checker._rate_limiters['sonarr'] = script.RateLimiter(1000)
+        daemon = script.WatchDaemon(checker, None, [], 'dry-run', 'basic', 'none')
+        tracker = checker.command_tracker
+        for batch in range(3):
+            for _ in range(2):
+                checker.session.commands.append({'name': 'RescanSeries'})
+                tracker.record('sonarr', 'http://sonarr', {}, len(checker.session.commands), f'Lot {batch}')
+            checker.session.pruned.add(len(checker.session.commands))  # Purgée avant tout relevé
+            started = time.monotonic()
+            daemon.poll_commands()
+            daemon.poll_commands()
+            if time.monotonic() - started > 1:
+                print("❌ Relevé des commandes bloquant en mode --watch")
+                return False
+        sonarr = tracker.summary()['sonarr']
+        if tracker.commands or (sonarr['commands'], sonarr['completed'], sonarr['failed']) != (6, 6, []):
+            print(f"❌ Commandes terminées non oubliées ou purgées en échec: {len(tracker.commands)} {sonarr}")
+            return False
+        if sonarr['latency_max'] is None:
+            print(f"❌ Latences perdues en oubliant les commandes: {sonarr}")
+            return False
+        
+        print("✅ Suivi des commandes correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur suivi des commandes: {e}")
+        return False
+
+def test_scoped_rescan():
+    """Test du rescan ciblé des dossiers touchés"""
+    print("\n🧪 Test du rescan ciblé...")
+    
+    try:
+        import script
+        
+        libraries = {
+            'series': [{'id': n, 'title': f'Show {n}', 'path': f'/tv/Show {n}'} for n in range(1, 4)],
+            'movie': [{'id': 8, 'title': 'Dune', 'year': 2021, 'path': '/films/Dune (2021)'}],
+        }
+        saved = {key: script.SERVER_CONFIG[key]
+                 for key in ('arr_poll_interval', 'arr_requests_per_second', 'arr_rescan_batch')}
+        script.SERVER_CONFIG.update({'arr_poll_interval': 0.01, 'arr_requests_per_second': 1000,
+                                     'arr_rescan_batch': 2})
+        try:
+            checker = script.AdvancedSymlinkChecker(max_workers=2)
+            checker.get_service_url_and_key = lambda service: (f'http://{service}', 'key')
+            checker.session = _FakeArrSession(libraries)
+            
+            deleted = [{'path': f'/tv/Show 1/Season 0{season}/Show.1.S0{season}E0{n}.mkv'}
+                       for season in (1, 2) for n in range(1, 4)]
+            deleted += [{'path': '/tv/Show 1/Show.1.S00E01.mkv'},
+                        {'path': '/tv/Show 2/Season 01/Show.2.S01E01.mkv'},
+                        {'path': '/tv/Show 3/Season 05/Show.3.S05E01.mkv'},
+                        {'path': '/films/Dune (2021)/Dune.2021.mkv'}]
+            results = checker.notify_media_servers_scoped(deleted)
+            
+            # Sans attente (--watch): tous les lots partent sans relever les commandes
+            background = script.AdvancedSymlinkChecker(max_workers=2)
+            background.get_service_url_and_key = lambda service: (f'http://{service}', 'key')
+            background.session = _FakeArrSession(libraries)
+            background_results = background.notify_media_servers_scoped(deleted, wait=False)
+        finally:
+            script.SERVER_CONFIG.update(saved)
+        
+        sonarr_posts = [entry for entry in checker.session.commands if entry['name'] == 'RescanSeries']
+        if sorted(entry['seriesId'] for entry in sonarr_posts) != [1, 2, 3]:
+            print(f"❌ Rescans inattendus: {checker.session.commands}")
+            return False
+        if [entry for entry in checker.session.commands if entry['name'] not in ('RescanSeries', 'RescanMovie')]:
+            print(f"❌ Rafraîchissement ou scan global envoyé: {checker.session.commands}")
+            return False
+        if results != {'sonarr': 3, 'radarr': 1}:
+            print(f"❌ Résultats inattendus: {results}")
+            return False
+        
+        # Lot de 2: le troisième rescan Sonarr part après un relevé des deux premiers
+        sonarr_log = [entry for entry in checker.session.log if 'radarr' not in entry[1] and entry[1] != 'RescanMovie']
+        third = [index for index, entry in enumerate(sonarr_log) if entry == ('post', 'RescanSeries')][2]
+        if ('get', 'http://sonarr/api/v3/command') not in sonarr_log[:third]:
+            print(f"❌ Rescans envoyés sans attendre le lot précédent: {sonarr_log}")
+            return False
+        if checker.command_tracker.pending('sonarr') or checker.command_tracker.pending('radarr'):
+            print("❌ Commandes de rescan non suivies jusqu'à leur fin")
+            return False
+        
+        polls = [entry for entry in background.session.log if '/api/v3/command' in entry[1]]
+        if background_results != results or polls:
+            print(f"❌ Rescans sans attente bloqués entre les lots: {background_results} {polls}")
+            return False
+        if len(background.command_tracker.pending('sonarr')) != 3:
+            print("❌ Rescans sans attente non suivis")
+            return False
+        
+        print("✅ Rescan ciblé correct")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erreur rescan ciblé: {e}")
+        return False
+
 def main():
     """Fonction principale de test"""
     print("🚀 Tests de validation SymGuard")
@@ -84,7 +1727,32 @@ def main():
     tests = [
         test_imports,
         test_config,
-        test_help
+        test_help,
+        test_symlink_walk,
+        test_iter_symlinks,
+        test_target_listing,
+        test_phase1_pipeline,
+        test_phase2_parallel,
+        test_verification_cache,
+        test_incremental_scan,
+        test_mount_down,
+        test_check_timeout,
+        test_container_headers,
+        test_ffprobe_batch,
+        test_asyncio_engine,
+        test_concurrency_controller,
+        test_result_store,
+        test_streaming_report,
+        test_checkpoint_resume,
+        test_watch_mode,
+        test_non_interactive,
+        test_cached_link_counts,
+        test_arr_refresh_batched,
+        test_arr_path_matching,
+        test_media_scans_concurrent,
+        test_media_config_store,
+        test_command_tracking,
+        test_scoped_rescan
     ]
     
     passed = 0